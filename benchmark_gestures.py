@@ -0,0 +1,1213 @@
+#!/usr/bin/env python3
+"""
+Hand Gesture Detection Benchmarks
+Headless benchmarks for HandGestureDetector - no camera or display required
+
+Usage:
+    python3 benchmark_gestures.py stages --synthetic --frames 300 --json before.json
+    python3 benchmark_gestures.py stages --video clip.mp4 --json after.json
+    python3 benchmark_gestures.py compare before.json after.json
+    python3 benchmark_gestures.py running-modes --video clip.mp4
+    python3 benchmark_gestures.py classifier --csv thumbs_up_training_data.csv
+    python3 benchmark_gestures.py headless --video clip.mp4
+    python3 benchmark_gestures.py debounce --video clip.mp4
+    python3 benchmark_gestures.py alloc --synthetic --inference-size 640x360
+    python3 benchmark_gestures.py idle --seconds 10 --video clip.mp4
+    python3 benchmark_gestures.py startup --runs 5
+    python3 benchmark_gestures.py quality --seconds 30 --budget-ms 40
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import Counter, namedtuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def iter_video_frames(video_path, max_frames=None):
+    """
+    Yield (frame_index, timestamp_ms, frame) from a recorded clip
+
+    Timestamps come from the clip's frame rate so VIDEO/LIVE_STREAM modes see
+    the same timeline on every run.
+    """
+    import cv2
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise FileNotFoundError(f"Could not open video: {video_path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    index = 0
+    try:
+        while max_frames is None or index < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield index, int(index * 1000 / fps), frame
+            index += 1
+    finally:
+        cap.release()
+
+
+class SyntheticFrames:
+    """
+    Deterministic camera stand-in producing BGR frames with a cv2.VideoCapture-like read()
+
+    Frames come from a small pre-generated pool (noise plus a moving
+    skin-coloured blob) and are copied on read, like a driver handing over a
+    fresh buffer (or filling the one passed to read()).
+    """
+
+    def __init__(self, width=1920, height=1080, count=None, pool_size=8, seed=0):
+        import numpy as np
+        import cv2
+
+        rng = np.random.default_rng(seed)
+        self.count = count
+        self.index = 0
+        self.pool = []
+        for i in range(pool_size):
+            frame = rng.integers(0, 64, (height, width, 3), dtype=np.uint8)
+            center = (int(width * (0.3 + 0.4 * i / pool_size)), height // 2)
+            cv2.circle(frame, center, height // 6, (120, 160, 220), -1)
+            self.pool.append(frame)
+
+    def isOpened(self):
+        return True
+
+    def read(self, image=None):
+        if self.count is not None and self.index >= self.count:
+            return False, None
+        source = self.pool[self.index % len(self.pool)]
+        self.index += 1
+        if image is not None and image.shape == source.shape:
+            image[:] = source
+            return True, image
+        return True, source.copy()
+
+    def release(self):
+        pass
+
+
+def open_frame_source(args):
+    """Recorded video (--video) or SyntheticFrames (--synthetic) as a cv2.VideoCapture-like object"""
+    if args.video:
+        import cv2
+
+        cap = cv2.VideoCapture(args.video)
+        if not cap.isOpened():
+            raise FileNotFoundError(f"Could not open video: {args.video}")
+        return cap
+    return SyntheticFrames(*args.synthetic_size)
+
+
+def summarize_ms(seconds):
+    """Latency summary in milliseconds (rounded so JSON diffs stay readable)"""
+    import numpy as np
+
+    if not seconds:
+        return {}
+    ms = np.asarray(seconds) * 1000
+    return {
+        'p50_ms': round(float(np.percentile(ms, 50)), 3),
+        'p95_ms': round(float(np.percentile(ms, 95)), 3),
+        'p99_ms': round(float(np.percentile(ms, 99)), 3),
+        'mean_ms': round(float(ms.mean()), 3),
+        'max_ms': round(float(ms.max()), 3),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def print_table(rows, columns):
+    """Print a list of dicts as a fixed-width table"""
+    widths = {c: max(len(c), *(len(str(r.get(c, ''))) for r in rows)) for c in columns}
+    print("  ".join(f"{c:>{widths[c]}}" for c in columns))
+    for row in rows:
+        print("  ".join(f"{str(row.get(c, '')):>{widths[c]}}" for c in columns))
+
+
+def write_json(path, results):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"\nResults written to: {path}")
+
+
+def bench_running_modes(args):
+    """Compare IMAGE, VIDEO and LIVE_STREAM landmarker fps on the same clip"""
+    from test_hand_gestures import HandGestureDetector, RUNNING_MODES
+
+    rows = []
+    for mode in args.modes or list(RUNNING_MODES):
+        detector = HandGestureDetector(running_mode=mode)
+        frames = 0
+        frames_with_hand = 0
+        elapsed = 0.0
+        try:
+            for index, timestamp_ms, frame in iter_video_frames(args.video, args.max_frames):
+                start = time.perf_counter()
+                _, result = detector.process_frame(frame, timestamp_ms=timestamp_ms)
+                elapsed += time.perf_counter() - start
+                frames += 1
+                if result.hand_landmarks:
+                    frames_with_hand += 1
+        finally:
+            # close() drains pending LIVE_STREAM work, so it counts towards the run time
+            start = time.perf_counter()
+            detector.hand_landmarker.close()
+            elapsed += time.perf_counter() - start
+
+        rows.append({
+            'mode': mode,
+            'frames': frames,
+            'frames_with_hand': frames_with_hand,
+            'seconds': round(elapsed, 3),
+            'fps': round(frames / elapsed, 1) if elapsed > 0 else 0.0,
+            'ms_per_frame': round(elapsed * 1000 / frames, 2) if frames else 0.0,
+        })
+
+    print(f"\nRunning mode benchmark: {args.video}")
+    print_table(rows, ['mode', 'frames', 'frames_with_hand', 'seconds', 'fps', 'ms_per_frame'])
+    if args.json:
+        write_json(args.json, {'benchmark': 'running-modes', 'video': args.video, 'results': rows})
+
+
+Point = namedtuple('Point', 'x y z')
+
+
+def synthetic_hands(count, seed=0, base=None):
+    """
+    Random (count, 21, 3) float32 hands
+
+    With base hands given, samples are jittered copies of them (realistic
+    poses near the rule thresholds); otherwise coordinates are uniform in [0, 1).
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    if base is None or len(base) == 0:
+        return rng.random((count, 21, 3), dtype=np.float32)
+    picks = base[rng.integers(0, len(base), count)]
+    return (picks + rng.normal(0, 0.04, picks.shape)).astype(np.float32)
+
+
+def bench_classifier(args):
+    """Check the vectorized classifier against detect_gesture and compare throughput"""
+    import numpy as np
+    from gesture_classifier import classify_batch
+    from gesture_dataset import read_csv
+    from test_hand_gestures import HandGestureDetector
+
+    # The rules don't touch the landmarker, so skip building one
+    rules = HandGestureDetector.__new__(HandGestureDetector)
+
+    recorded = [read_csv(path)[1] for path in args.csv]
+    recorded = np.concatenate(recorded) if recorded else None
+    hands = np.concatenate([
+        synthetic_hands(args.synthetic // 2, seed=1),
+        synthetic_hands(args.synthetic - args.synthetic // 2, seed=2, base=recorded),
+    ] + ([recorded] if recorded is not None else []))
+
+    start = time.perf_counter()
+    expected = [rules.detect_gesture([Point(*lm) for lm in hand.tolist()]) for hand in hands]
+    scalar_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = []
+    for offset in range(0, len(hands), args.batch_size):
+        actual.extend(classify_batch(hands[offset:offset + args.batch_size]))
+    vector_seconds = time.perf_counter() - start
+
+    mismatches = [i for i, (a, b) in enumerate(zip(expected, actual)) if a != b]
+    counts = Counter(expected)
+
+    print(f"\nClassifier equivalence: {len(hands)} hands, batch size {args.batch_size}")
+    print("Labels: " + ", ".join(f"{label}={counts[label]}" for label in sorted(counts, key=str)))
+    print(f"detect_gesture (scalar): {len(hands) / scalar_seconds:12,.0f} hands/sec")
+    print(f"classify_batch (NumPy):  {len(hands) / vector_seconds:12,.0f} hands/sec")
+    print(f"Mismatches: {len(mismatches)}")
+    for i in mismatches[:10]:
+        print(f"  hand {i}: detect_gesture={expected[i]} classify_batch={actual[i]}")
+
+    if args.json:
+        write_json(args.json, {
+            'benchmark': 'classifier',
+            'hands': len(hands),
+            'label_counts': {str(k): v for k, v in counts.items()},
+            'scalar_hands_per_sec': len(hands) / scalar_seconds,
+            'vector_hands_per_sec': len(hands) / vector_seconds,
+            'mismatches': len(mismatches),
+        })
+    return 1 if mismatches else 0
+
+
+# Stages of the HandGestureDetector.run loop, in order
+STAGES = ['capture', 'preprocess', 'mp_image', 'detect', 'mirror', 'classify', 'display', 'draw', 'imshow']
+
+
+def bench_stages(args):
+    """Replay frames through the run() loop stages and report per-stage latency percentiles"""
+    import cv2
+    import mediapipe as mp
+    from mediapipe import ImageFormat
+    from gesture_renderer import OverlayRenderer
+    from test_hand_gestures import HandGestureDetector
+
+    detector = HandGestureDetector(running_mode=args.running_mode, inference_size=args.inference_size)
+    renderer = OverlayRenderer(args.preview_width or None, display_fps=None, mirror=detector.mirror)
+    source = open_frame_source(args)
+    samples = {stage: [] for stage in STAGES}
+    frame_times = []
+    frames_with_hand = 0
+
+    clock = time.perf_counter
+    frame = None
+    try:
+        for index in range(args.warmup + args.frames):
+            t0 = clock()
+            ret, frame = source.read(frame)
+            t1 = clock()
+            if not ret:
+                break
+            rgb_frame = detector.preprocess(frame)
+            t2 = clock()
+            mp_image = mp.Image(image_format=ImageFormat.SRGB, data=rgb_frame)
+            t3 = clock()
+            detection_result = detector.detect(mp_image, timestamp_ms=index * 33)
+            t4 = clock()
+            if detector.mirror and detector.running_mode != 'live_stream':
+                detector._mirror_result(detection_result)
+            t5 = clock()
+            gestures = detector.classify_hands(detection_result.hand_landmarks)
+            t6 = clock()
+            shown = renderer.preview(frame)
+            t7 = clock()
+            detector.draw_hands(shown, detection_result.hand_landmarks, gestures)
+            t8 = clock()
+            if args.display:
+                cv2.imshow('Benchmark', shown)
+                cv2.waitKey(1)
+            t9 = clock()
+
+            if index < args.warmup:
+                continue
+            for stage, start, end in zip(STAGES, (t0, t1, t2, t3, t4, t5, t6, t7, t8), (t1, t2, t3, t4, t5, t6, t7, t8, t9)):
+                samples[stage].append(end - start)
+            frame_times.append(t9 - t0)
+            frames_with_hand += bool(detection_result.hand_landmarks)
+    finally:
+        source.release()
+        detector.hand_landmarker.close()
+        if args.display:
+            cv2.destroyAllWindows()
+
+    if not args.display:
+        del samples['imshow']
+
+    total = sum(frame_times)
+    results = {
+        'benchmark': 'stages',
+        'git_revision': git_revision(),
+        'config': {
+            'source': args.video or 'synthetic {}x{}'.format(*args.synthetic_size),
+            'frames': len(frame_times),
+            'warmup': args.warmup,
+            'running_mode': args.running_mode,
+            'inference_size': list(args.inference_size) if args.inference_size else None,
+            'preview_width': args.preview_width or None,
+            'display': args.display,
+        },
+        'stages': {stage: summarize_ms(values) for stage, values in samples.items()},
+        'end_to_end': dict(summarize_ms(frame_times), fps=round(len(frame_times) / total, 2) if total else 0.0),
+        'frames_with_hand': frames_with_hand,
+    }
+
+    rows = [dict(stage=stage, **stats) for stage, stats in results['stages'].items()]
+    rows.append(dict(stage='end_to_end', **results['end_to_end']))
+    print(f"\nStage latency: {results['config']['source']}, {len(frame_times)} frames "
+          f"({frames_with_hand} with a hand)")
+    print_table(rows, ['stage', 'p50_ms', 'p95_ms', 'p99_ms', 'mean_ms', 'max_ms'])
+    print(f"End-to-end: {results['end_to_end']['fps']} fps")
+    if args.json:
+        write_json(args.json, results)
+
+
+def bench_headless(args):
+    """Frames per second of the GUI loop vs headless mode, both driven through _run_serial"""
+    import contextlib
+    from gesture_renderer import OverlayRenderer
+    from gesture_sinks import CallbackSink
+    from test_hand_gestures import HandGestureDetector
+
+    rows = []
+    for mode in ('gui', 'headless'):
+        detector = HandGestureDetector(running_mode=args.running_mode, inference_size=args.inference_size)
+        detector.renderer = OverlayRenderer(mirror=detector.mirror)
+        events = []
+        if mode == 'headless':
+            detector.sink = CallbackSink(events.append)
+            handle = detector._emit_frame
+        elif args.display:
+            handle = detector._show_frame
+        else:
+            # _show_frame without imshow/waitKey
+            def handle(frame, detection_result, frame_count):
+                shown = detector.renderer.preview(frame) if detector.renderer.due() else None
+                detector._last_gesture = detector.render_detection(shown, detection_result,
+                                                                   frame_count, detector._last_gesture)
+                return True
+
+        handled = []
+
+        def handle_frame(frame, detection_result, frame_count):
+            keep_running = handle(frame, detection_result, frame_count)
+            handled.append(time.perf_counter())
+            return keep_running and frame_count < args.warmup + args.frames
+
+        source = open_frame_source(args)
+        try:
+            # Landmark printing goes to /dev/null so a slow terminal does not skew the GUI numbers;
+            # the real gain on a console is larger than reported here
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                detector._run_serial(source, handle_frame, mode)
+        finally:
+            source.release()
+            detector.hand_landmarker.close()
+            if args.display:
+                import cv2
+                cv2.destroyAllWindows()
+
+        measured = handled[args.warmup:]
+        elapsed = measured[-1] - measured[0] if len(measured) > 1 else 0.0
+        rows.append({
+            'mode': mode,
+            'frames': len(measured),
+            'events': len(events) if mode == 'headless' else '',
+            'fps': round((len(measured) - 1) / elapsed, 1) if elapsed > 0 else 0.0,
+            'ms_per_frame': round(elapsed * 1000 / (len(measured) - 1), 2) if elapsed > 0 else 0.0,
+        })
+
+    gui, headless = rows
+    gain = (headless['fps'] / gui['fps'] - 1) * 100 if gui['fps'] else 0.0
+    print(f"\nHeadless benchmark: {args.video or 'synthetic {}x{}'.format(*args.synthetic_size)}"
+          f"{' (GUI with imshow)' if args.display else ''}")
+    print_table(rows, ['mode', 'frames', 'events', 'fps', 'ms_per_frame'])
+    print(f"Headless fps gain: {gain:+.1f}%")
+    if args.json:
+        write_json(args.json, {'benchmark': 'headless', 'git_revision': git_revision(),
+                               'display': args.display, 'results': rows,
+                               'fps_gain_percent': round(gain, 1)})
+
+
+def synthetic_session(frames, flicker=0.15, seed=0):
+    """
+    Per-frame (label, confidence) pairs imitating a live session
+
+    Alternates held gestures and empty stretches of 1-4 seconds at 30 fps;
+    each frame has a `flicker` chance of being misread as another label or
+    no gesture, with lower confidence, like classifier output near a threshold.
+    """
+    import numpy as np
+    from gesture_classifier import GESTURE_LABELS
+
+    rng = np.random.default_rng(seed)
+    choices = list(GESTURE_LABELS) + [None]
+    session = []
+    holding = False
+    while len(session) < frames:
+        gesture = choices[rng.integers(len(GESTURE_LABELS))] if holding else None
+        for _ in range(int(rng.integers(30, 120))):
+            if rng.random() < flicker:
+                session.append((choices[rng.integers(len(choices))], float(rng.uniform(0.3, 0.8))))
+            else:
+                session.append((gesture, float(rng.uniform(0.75, 1.0))))
+        holding = not holding
+    return session[:frames]
+
+
+def recorded_labels(path):
+    """Read a label log: one frame per line, 'LABEL' or 'LABEL,CONFIDENCE' (empty or None: no gesture)"""
+    session = []
+    with open(path) as f:
+        for line in f:
+            label, _, confidence = line.strip().partition(',')
+            session.append((label if label not in ('', 'None') else None,
+                            float(confidence) if confidence else 1.0))
+    return session
+
+
+def video_labels(args):
+    """Classify every frame of a clip with HandGestureDetector (first hand only)"""
+    from test_hand_gestures import HandGestureDetector
+
+    detector = HandGestureDetector(running_mode=args.running_mode, classifier=args.classifier)
+    session = []
+    try:
+        for index, timestamp_ms, frame in iter_video_frames(args.video):
+            _, result = detector.process_frame(frame, timestamp_ms=timestamp_ms)
+            if result.hand_landmarks:
+                gestures, confidences = detector.classify_hands(result.hand_landmarks, with_confidence=True)
+                session.append((gestures[0], confidences[0]))
+            else:
+                session.append((None, 1.0))
+    finally:
+        detector.hand_landmarker.close()
+    return session
+
+
+def bench_debounce(args):
+    """Replay a session through GestureDebouncer and count the downstream calls it saves"""
+    from gesture_debounce import GestureDebouncer, replay
+
+    if args.video:
+        source = args.video
+        session = video_labels(args)
+    elif args.labels:
+        source = args.labels
+        session = recorded_labels(args.labels)
+    else:
+        source = f"synthetic ({args.synthetic} frames, flicker {args.flicker})"
+        session = synthetic_session(args.synthetic, args.flicker)
+    if args.save_labels:
+        with open(args.save_labels, 'w') as f:
+            f.writelines(f"{label or ''},{confidence:.3f}\n" for label, confidence in session)
+
+    debouncer = GestureDebouncer(window=args.window, enter_frames=args.enter_frames,
+                                 exit_frames=args.exit_frames, cooldown=args.cooldown,
+                                 hold_interval=args.hold_interval or None)
+    raw_changes, events, seconds = replay(session, debouncer, fps=args.fps)
+    kinds = Counter(event.kind for event in events)
+    saved = (1 - len(events) / raw_changes) * 100 if raw_changes else 0.0
+    per_update_us = seconds / len(session) * 1e6 if session else 0.0
+
+    print(f"\nDebounce replay: {source}, {len(session)} frames at {args.fps:g} fps")
+    print(f"Raw label changes (undebounced calls): {raw_changes}")
+    print(f"Debounced events: {len(events)} (start={kinds['start']} hold={kinds['hold']} end={kinds['end']})")
+    print(f"Downstream calls saved: {saved:.1f}%")
+    print(f"update(): {per_update_us:.2f} us/frame")
+    if args.verbose:
+        for event in events:
+            print(f"  {event.frame_index:>7} {event.kind:<5} {event.gesture} ({event.duration:.2f}s)")
+
+    if args.json:
+        write_json(args.json, {
+            'benchmark': 'debounce',
+            'source': source,
+            'frames': len(session),
+            'raw_changes': raw_changes,
+            'events': len(events),
+            'event_kinds': dict(kinds),
+            'calls_saved_percent': round(saved, 1),
+            'update_us': round(per_update_us, 3),
+        })
+
+
+def bench_alloc(args):
+    """Bytes allocated per frame by the old flip/cvtColor preprocessing vs the buffered path"""
+    import tracemalloc
+    import cv2
+    from test_hand_gestures import HandGestureDetector
+
+    detector = HandGestureDetector(inference_size=args.inference_size)
+    detector.hand_landmarker.close()
+
+    def legacy(source, frame):
+        # Preprocessing as it was: fresh capture buffer, flipped copy, resized and RGB copies,
+        # and the overlay drawn on the flipped copy
+        ret, frame = source.read()
+        frame = cv2.flip(frame, 1)
+        region = frame
+        if args.inference_size:
+            h, w = frame.shape[:2]
+            scale = min(args.inference_size[0] / w, args.inference_size[1] / h)
+            if scale < 1.0:
+                region = cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(region, cv2.COLOR_BGR2RGB)
+        return frame
+
+    def buffered(source, frame):
+        ret, frame = source.read(frame)
+        detector.preprocess(frame)
+        return frame
+
+    def buffered_display(source, frame):
+        frame = buffered(source, frame)
+        detector.display_frame(frame)
+        return frame
+
+    variants = [('legacy', legacy), ('buffered (headless)', buffered), ('buffered + display mirror', buffered_display)]
+    rows = []
+    for name, step in variants:
+        source = open_frame_source(args)
+        frame = None
+        allocated = []
+        elapsed = 0.0
+        tracemalloc.start()
+        try:
+            for index in range(args.warmup + args.frames):
+                baseline = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                start = time.perf_counter()
+                frame = step(source, frame)
+                seconds = time.perf_counter() - start
+                if index >= args.warmup:
+                    # Peak above the starting level: memory the frame needed beyond reused buffers
+                    allocated.append(tracemalloc.get_traced_memory()[1] - baseline)
+                    elapsed += seconds
+        finally:
+            tracemalloc.stop()
+            source.release()
+        per_frame = sum(allocated) / len(allocated) if allocated else 0.0
+        rows.append({
+            'variant': name,
+            'frames': len(allocated),
+            'kb_per_frame': round(per_frame / 1024, 1),
+            'mb_per_sec_at_fps': round(per_frame * args.fps / 1e6, 1),
+            'ms_per_frame': round(elapsed * 1000 / len(allocated), 3) if allocated else 0.0,
+        })
+
+    print(f"\nPreprocessing allocations: {args.video or 'synthetic {}x{}'.format(*args.synthetic_size)}, "
+          f"inference size {args.inference_size or 'full'}, at {args.fps:g} fps")
+    print_table(rows, ['variant', 'frames', 'kb_per_frame', 'mb_per_sec_at_fps', 'ms_per_frame'])
+    print("(mp.Image copies the RGB frame inside MediaPipe; that copy is untracked and the same for every variant)")
+    if args.json:
+        write_json(args.json, {'benchmark': 'alloc', 'git_revision': git_revision(), 'results': rows})
+
+
+def bench_idle(args):
+    """CPU use and detections with and without the inference scheduler, paced like a live camera"""
+    from gesture_scheduler import InferenceScheduler
+    from test_hand_gestures import HandGestureDetector
+
+    scenarios = [
+        ('static', lambda: SyntheticFrames(*args.synthetic_size, count=int(args.seconds * args.fps), pool_size=1)),
+        ('motion', lambda: SyntheticFrames(*args.synthetic_size, count=int(args.seconds * args.fps))),
+    ]
+    if args.video:
+        scenarios.append(('clip', lambda: open_frame_source(args)))
+
+    rows = []
+    for scenario, make_source in scenarios:
+        for gated in (False, True):
+            scheduler = None
+            if gated:
+                scheduler = InferenceScheduler(idle_after=args.idle_after, idle_interval=args.idle_interval,
+                                               motion_threshold=args.motion_threshold)
+            detector = HandGestureDetector(running_mode=args.running_mode, inference_size=args.inference_size,
+                                           scheduler=scheduler)
+            source = make_source()
+            frames = 0
+            first_hand = None
+            frame = None
+            wall_start = time.perf_counter()
+            cpu_start = time.process_time()
+            try:
+                while True:
+                    ret, frame = source.read(frame)
+                    if not ret:
+                        break
+                    _, result = detector.process_frame(frame, timestamp_ms=frames * 1000 / args.fps)
+                    if first_hand is None and result.hand_landmarks:
+                        first_hand = frames / args.fps
+                    frames += 1
+                    # Pace like a camera delivering args.fps frames per second
+                    delay = wall_start + frames / args.fps - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+            finally:
+                source.release()
+                detector.hand_landmarker.close()
+            cpu = time.process_time() - cpu_start
+            wall = time.perf_counter() - wall_start
+            rows.append({
+                'scenario': scenario,
+                'scheduler': 'on' if gated else 'off',
+                'frames': frames,
+                'detections': scheduler.detections if gated else frames,
+                'cpu_percent': round(cpu / wall * 100, 1) if wall else 0.0,
+                'cpu_ms_per_frame': round(cpu * 1000 / frames, 2) if frames else 0.0,
+                'first_hand_s': round(first_hand, 2) if first_hand is not None else '',
+            })
+
+    print(f"\nInference scheduler: {args.seconds:g}s per run at {args.fps:g} fps, "
+          f"idle_after={args.idle_after}s idle_interval={args.idle_interval}s")
+    print_table(rows, ['scenario', 'scheduler', 'frames', 'detections', 'cpu_percent', 'cpu_ms_per_frame',
+                       'first_hand_s'])
+    if args.json:
+        write_json(args.json, {'benchmark': 'idle', 'git_revision': git_revision(), 'results': rows})
+
+
+def busy_load(stop, size=512):
+    """Keep one core busy (numpy releases the GIL) until stop is set, like an encoder sharing the host"""
+    import numpy as np
+
+    a = np.random.default_rng(0).random((size, size), dtype=np.float32)
+    while not stop.is_set():
+        a = np.tanh(a @ a)
+
+
+def bench_quality(args):
+    """Per-frame latency against a budget, with and without the adaptive quality controller, under host load"""
+    import threading
+    import numpy as np
+    from gesture_quality import QualityController
+    from gesture_sinks import CallbackSink
+    from test_hand_gestures import HandGestureDetector
+
+    frames = int(args.seconds * args.fps)
+    # The host is loaded during the middle third of every run
+    load_start, load_end = frames // 3, 2 * frames // 3
+    load_threads = args.load_threads if args.load_threads is not None else os.cpu_count()
+
+    rows = []
+    for adaptive in (False, True):
+        quality = QualityController(budget_ms=args.budget_ms) if adaptive else None
+        detector = HandGestureDetector(running_mode=args.running_mode, inference_size=args.inference_size,
+                                       quality=quality)
+        detector.configure_events(CallbackSink(lambda event: None))
+        source = open_frame_source(args)
+        latencies = []
+        tiers = []
+        stop = threading.Event()
+        workers = []
+        frame = None
+        wall_start = time.perf_counter()
+        try:
+            for index in range(frames):
+                if index == load_start:
+                    workers = [threading.Thread(target=busy_load, args=(stop,), daemon=True)
+                               for _ in range(load_threads)]
+                    for worker in workers:
+                        worker.start()
+                elif index == load_end:
+                    stop.set()
+                    for worker in workers:
+                        worker.join()
+                ret, frame = source.read(frame)
+                if not ret:
+                    break
+                start = time.perf_counter()
+                _, result = detector.process_frame(frame, timestamp_ms=index * 1000 / args.fps)
+                detector.emit_detection(result, index)
+                latency = time.perf_counter() - start
+                latencies.append(latency)
+                tiers.append(quality.tier.name if adaptive else 'full')
+                if adaptive:
+                    quality.observe(latency)
+                # Pace like a camera delivering args.fps frames per second
+                delay = wall_start + (index + 1) / args.fps - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+        finally:
+            stop.set()
+            for worker in workers:
+                worker.join()
+            source.release()
+            detector.hand_landmarker.close()
+
+        latencies = np.array(latencies) * 1000
+        for phase, (start, end) in [('before', (0, load_start)), ('load', (load_start, load_end)),
+                                    ('after', (load_end, len(latencies)))]:
+            window = latencies[start:end]
+            if not len(window):
+                continue
+            rows.append({
+                'controller': 'on' if adaptive else 'off',
+                'phase': phase,
+                'frames': len(window),
+                'mean_ms': round(float(window.mean()), 2),
+                'p95_ms': round(float(np.percentile(window, 95)), 2),
+                'over_budget_pct': round(float((window > args.budget_ms).mean() * 100), 1),
+                'tier': Counter(tiers[start:end]).most_common(1)[0][0],
+            })
+        if adaptive:
+            for decision in quality.stats()['decisions']:
+                print(f"  {decision['from']} -> {decision['to']}: {decision['reason']}")
+
+    print(f"\nAdaptive quality: {args.seconds:g}s at {args.fps:g} fps, {args.budget_ms:g} ms budget, "
+          f"{load_threads} load threads during the middle third")
+    print_table(rows, ['controller', 'phase', 'frames', 'mean_ms', 'p95_ms', 'over_budget_pct', 'tier'])
+    print("(over_budget_pct: frames whose processing exceeded the budget; tier: most used tier in the phase)")
+    if args.json:
+        write_json(args.json, {'benchmark': 'quality', 'git_revision': git_revision(), 'results': rows})
+
+
+# Runs in a fresh interpreter for each startup measurement; prints one JSON line
+STARTUP_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+import test_hand_gestures
+from test_hand_gestures import HandGestureDetector
+imported = time.perf_counter()
+from landmarker_model import resolve_model
+resolve_model(offline=True)
+resolved = time.perf_counter()
+detector = HandGestureDetector(running_mode={running_mode!r}, warmup={warmup!r}, offline=True)
+built = time.perf_counter()
+import numpy as np
+frame = np.zeros(({height}, {width}, 3), dtype=np.uint8)
+frame_times = []
+for _ in range(3):
+    t = time.perf_counter()
+    detector.process_frame(frame)
+    frame_times.append(time.perf_counter() - t)
+detector.hand_landmarker.close()
+print(json.dumps({{
+    'import_module': imported - start,
+    'resolve_model': resolved - imported,
+    'detector_init': built - resolved,
+    'first_frame': frame_times[0],
+    'steady_frame': min(frame_times[1:]),
+    'ready_to_first_result': frame_times[0] + built - start,
+}}))
+"""
+
+
+def bench_startup(args):
+    """Cold-start timings in fresh interpreters, with and without warm-up"""
+    import numpy as np
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    width, height = args.frame_size
+    rows = []
+    for warmup in (False, True):
+        runs = []
+        for _ in range(args.runs):
+            code = STARTUP_PROBE.format(root=root, running_mode=args.running_mode, warmup=warmup,
+                                        width=width, height=height)
+            completed = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+            if completed.returncode != 0:
+                print(completed.stdout + completed.stderr)
+                print("Startup probe failed (is hand_landmarker.task available? try: "
+                      "python3 landmarker_model.py fetch)")
+                return 1
+            runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+        row = {'warmup': 'on' if warmup else 'off'}
+        for key in ('import_module', 'resolve_model', 'detector_init', 'first_frame', 'steady_frame',
+                    'ready_to_first_result'):
+            row[key + '_ms'] = round(float(np.median([run[key] for run in runs])) * 1000, 1)
+        rows.append(row)
+
+    print(f"\nStartup (median of {args.runs} fresh interpreters, {args.running_mode} mode, "
+          f"{width}x{height} frames)")
+    columns = ['warmup', 'import_module_ms', 'resolve_model_ms', 'detector_init_ms', 'first_frame_ms',
+               'steady_frame_ms', 'ready_to_first_result_ms']
+    print_table(rows, columns)
+    if args.json:
+        write_json(args.json, {'benchmark': 'startup', 'git_revision': git_revision(), 'results': rows})
+
+
+def legacy_draw_hands(frame, hands, gestures):
+    """HandGestureDetector.draw_hands before gesture_renderer: one cv2 call per joint and per bone"""
+    import cv2
+
+    h, w, _ = frame.shape
+    for hand_landmarks, gesture in zip(hands, gestures):
+        landmark_points = []
+        for landmark in hand_landmarks:
+            x = int(landmark.x * w)
+            y = int(landmark.y * h)
+            landmark_points.append((x, y))
+            cv2.circle(frame, (x, y), 5, (0, 255, 0), -1)
+        connections = [
+            (0, 1), (1, 2), (2, 3), (3, 4),
+            (0, 5), (5, 6), (6, 7), (7, 8),
+            (0, 9), (9, 10), (10, 11), (11, 12),
+            (0, 13), (13, 14), (14, 15), (15, 16),
+            (0, 17), (17, 18), (18, 19), (19, 20),
+            (5, 9), (9, 13), (13, 17)
+        ]
+        for start_idx, end_idx in connections:
+            if start_idx < len(landmark_points) and end_idx < len(landmark_points):
+                cv2.line(frame, landmark_points[start_idx], landmark_points[end_idx], (255, 0, 0), 2)
+        if gesture:
+            cv2.putText(frame, f"GESTURE: {gesture}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+
+
+def bench_render(args):
+    """GUI overlay cost per captured frame: per-call drawing on the full frame vs the batched, downscaled, throttled renderer"""
+    import cv2
+    from gesture_classifier import classify_batch, hands_to_array
+    from gesture_renderer import OverlayRenderer
+
+    hands = synthetic_hands(args.hands, seed=4)
+    gestures = classify_batch(hands)
+    # Landmark objects, as they come out of the landmarker
+    landmark_lists = [[Point(*lm) for lm in hand] for hand in hands.tolist()]
+
+    def legacy(frame, now):
+        shown = cv2.flip(frame, 1)
+        legacy_draw_hands(shown, landmark_lists, gestures)
+        return shown
+
+    def renderer_variant(renderer):
+        def step(frame, now):
+            if not renderer.due(now):
+                return None
+            return renderer.render(frame, hands_to_array(landmark_lists), gestures)
+        return step
+
+    variants = [
+        ('legacy (full size, per-call)', legacy),
+        ('batched, full size', renderer_variant(OverlayRenderer(None, display_fps=None))),
+        (f'batched, {args.preview_width}px preview', renderer_variant(OverlayRenderer(args.preview_width, display_fps=None))),
+        (f'batched, preview, {args.display_fps:g} fps', renderer_variant(OverlayRenderer(args.preview_width, args.display_fps))),
+    ]
+    budget_ms = 1000.0 / args.capture_fps
+    rows = []
+    for name, step in variants:
+        source = SyntheticFrames(*args.synthetic_size)
+        frame = None
+        times = []
+        shown_count = 0
+        try:
+            for index in range(args.warmup + args.frames):
+                ret, frame = source.read(frame)
+                # Simulated camera clock, so throttling sees the capture rate and not the loop speed
+                now = index / args.capture_fps
+                start = time.perf_counter()
+                shown = step(frame, now)
+                if shown is not None and args.display:
+                    cv2.imshow('Benchmark', shown)
+                    cv2.waitKey(1)
+                seconds = time.perf_counter() - start
+                if index >= args.warmup:
+                    times.append(seconds)
+                    shown_count += shown is not None
+        finally:
+            source.release()
+        stats = summarize_ms(times)
+        rows.append({
+            'variant': name,
+            'shown': shown_count,
+            'mean_ms': stats['mean_ms'],
+            'p95_ms': stats['p95_ms'],
+            'budget_percent': round(stats['mean_ms'] / budget_ms * 100, 1),
+        })
+    if args.display:
+        cv2.destroyAllWindows()
+
+    print(f"\nOverlay rendering: synthetic {args.synthetic_size[0]}x{args.synthetic_size[1]}, "
+          f"{args.hands} hand(s), {args.frames} frames captured at {args.capture_fps:g} fps"
+          f"{' (with imshow)' if args.display else ''}")
+    print_table(rows, ['variant', 'shown', 'mean_ms', 'p95_ms', 'budget_percent'])
+    print("(mean_ms is per captured frame; budget_percent is its share of the frame interval)")
+    if args.json:
+        write_json(args.json, {'benchmark': 'render', 'git_revision': git_revision(), 'results': rows})
+
+
+def synthetic_hand_streams(hands, frames, seed=0):
+    """
+    (frames, hands, 21, 3) landmark stream: each hand holds one pose and drifts
+    along its own path across the frame with per-frame jitter
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    poses = synthetic_hands(hands, seed=seed)
+    # Centre the poses, shrink them and spread the hands out across the frame
+    poses = (poses - poses.mean(axis=1, keepdims=True)) * 0.5
+    centers = np.stack([np.linspace(0.1, 0.9, hands) if hands > 1 else [0.5], np.full(hands, 0.5)], axis=1)
+    phase = rng.uniform(0, 2 * np.pi, hands)
+    t = np.arange(frames)[:, np.newaxis]
+    drift = 0.3 / hands * np.stack([np.sin(t / 30 + phase), np.cos(t / 45 + phase)], axis=2)
+    stream = np.repeat(poses[np.newaxis], frames, axis=0)
+    stream[:, :, :, :2] += (centers + drift)[:, :, np.newaxis, :]
+    stream += rng.normal(0, 0.002, stream.shape)
+    return stream.astype(np.float32)
+
+
+def bench_hands(args):
+    """Per-frame classification, tracking and event cost as the number of hands grows"""
+    from types import SimpleNamespace
+    import numpy as np
+    from gesture_classifier import hands_to_array
+    from gesture_sinks import CallbackSink
+    from gesture_tracking import HandTracker
+    from test_hand_gestures import HandGestureDetector
+
+    # Only the classification and event path is measured, but the detector
+    # still loads the landmarker model; it is closed again right away
+    try:
+        detector = HandGestureDetector()
+    except (FileNotFoundError, ValueError) as e:
+        print(f"ERROR: {e}")
+        print("Could not create the detector (is hand_landmarker.task available? try: "
+              "python3 landmarker_model.py fetch)")
+        return 1
+    detector.hand_landmarker.close()
+
+    rows = []
+    for count in args.hands:
+        stream = synthetic_hand_streams(count, args.warmup + args.frames, seed=count)
+        # The landmarker returns hands in no particular order, so shuffle them every frame
+        order = np.random.default_rng(count).permuted(np.tile(np.arange(count), (len(stream), 1)), axis=1)
+        results = [SimpleNamespace(hand_landmarks=[[Point(*lm) for lm in frame[i].tolist()] for i in frame_order],
+                                   handedness=[])
+                   for frame, frame_order in zip(stream, order)]
+
+        def timed(step):
+            times = []
+            for index, result in enumerate(results):
+                start = time.perf_counter()
+                step(index, result)
+                if index >= args.warmup:
+                    times.append(time.perf_counter() - start)
+            return sum(times) / len(times) * 1e6
+
+        # One classifier call per hand, as the old per-hand loop did
+        per_hand_us = timed(lambda index, result: [detector.classify_hands([hand]) for hand in result.hand_landmarks])
+        batched_us = timed(lambda index, result: detector.classify_hands(hands_to_array(result.hand_landmarks)))
+
+        events = []
+        detector.configure_events(CallbackSink(events.append), debounce=True)
+        emit_us = timed(lambda index, result: detector.emit_detection(result, index, timestamp=index / 30))
+
+        # Track ID stability: every synthetic hand should keep the first ID it got
+        tracker = HandTracker()
+        first_ids = {}
+        switches = 0
+        for frame_order, result in zip(order, results):
+            for hand, track_id in zip(frame_order, tracker.update(hands_to_array(result.hand_landmarks))):
+                if first_ids.setdefault(hand, track_id) != track_id:
+                    switches += 1
+
+        rows.append({
+            'hands': count,
+            'classify_per_hand_us': round(per_hand_us, 1),
+            'classify_batched_us': round(batched_us, 1),
+            'emit_us': round(emit_us, 1),
+            'emit_us_per_hand': round(emit_us / count, 1),
+            'id_switches': switches,
+            'events': len(events),
+        })
+
+    base = rows[0]['emit_us'] / rows[0]['hands']
+    for row in rows:
+        # 1.0 = linear in the hand count, below 1.0 = sub-linear
+        row['scaling'] = round(row['emit_us'] / (base * row['hands']), 2)
+
+    print(f"\nMulti-hand: {args.frames} synthetic frames per hand count, hands reordered every frame")
+    print_table(rows, ['hands', 'classify_per_hand_us', 'classify_batched_us', 'emit_us', 'emit_us_per_hand',
+                       'scaling', 'id_switches', 'events'])
+    print("(emit_us: tracking, batched classification and debounced events per frame; "
+          "scaling: emit cost relative to linear growth from the first row)")
+    if args.json:
+        write_json(args.json, {'benchmark': 'hands', 'git_revision': git_revision(), 'results': rows})
+
+
+def flatten_numbers(data, prefix=''):
+    """{'a': {'b': 1}} -> {'a.b': 1} for every numeric leaf"""
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten_numbers(value, name + '.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def bench_compare(args):
+    """Print numeric differences between two benchmark JSON files"""
+    with open(args.base) as f:
+        base = flatten_numbers(json.load(f))
+    with open(args.new) as f:
+        new = flatten_numbers(json.load(f))
+
+    rows = []
+    for key in sorted(base.keys() & new.keys()):
+        if base[key] == new[key] and not args.all:
+            continue
+        change = f"{(new[key] - base[key]) / base[key] * 100:+.1f}%" if base[key] else ''
+        rows.append({'metric': key, 'base': base[key], 'new': new[key], 'change': change})
+    print(f"\n{args.base} -> {args.new}")
+    if rows:
+        print_table(rows, ['metric', 'base', 'new', 'change'])
+    else:
+        print("No differences")
+
+
+def parse_size(value):
+    """WIDTHxHEIGHT -> (width, height); same format as test_hand_gestures --inference-size"""
+    width, _, height = value.lower().partition('x')
+    return int(width), int(height)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Headless hand gesture detection benchmarks')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    p = subparsers.add_parser('stages', help='Per-stage latency percentiles of the detector loop')
+    source = p.add_mutually_exclusive_group(required=True)
+    source.add_argument('--video', help='Recorded clip to replay')
+    source.add_argument('--synthetic', action='store_true', help='Use generated frames instead of a clip')
+    p.add_argument('--synthetic-size', type=parse_size, default=(1920, 1080),
+                   help='Synthetic frame size WIDTHxHEIGHT (default: 1920x1080)')
+    p.add_argument('--frames', type=int, default=300, help='Frames to measure (default: 300)')
+    p.add_argument('--warmup', type=int, default=10, help='Frames to run before measuring (default: 10)')
+    p.add_argument('--running-mode', default='image', choices=['image', 'video', 'live_stream'],
+                   help='Landmarker running mode (default: image)')
+    p.add_argument('--inference-size', type=parse_size, default=None,
+                   help='Downscale frames to fit WIDTHxHEIGHT before detection')
+    p.add_argument('--preview-width', type=int, default=960,
+                   help='GUI preview width for the display/draw stages (default: 960, 0: full size)')
+    p.add_argument('--display', action='store_true', help='Include cv2.imshow (needs a display)')
+    p.add_argument('--json', help='Write results to this JSON file')
+    p.set_defaults(func=bench_stages)
+
+    p = subparsers.add_parser('compare', help='Diff two benchmark JSON result files')
+    p.add_argument('base', help='Baseline results JSON')
+    p.add_argument('new', help='New results JSON')
+    p.add_argument('--all', action='store_true', help='Also list unchanged metrics')
+    p.set_defaults(func=bench_compare)
+
+    p = subparsers.add_parser('running-modes', help='Compare landmarker fps in image/video/live_stream modes')
+    p.add_argument('--video', required=True, help='Recorded clip to replay')
+    p.add_argument('--max-frames', type=int, default=None, help='Stop after this many frames')
+    p.add_argument('--modes', nargs='+', choices=['image', 'video', 'live_stream'],
+                   help='Modes to compare (default: all)')
+    p.add_argument('--json', help='Write results to this JSON file')
+    p.set_defaults(func=bench_running_modes)
+
+    p = subparsers.add_parser('classifier', help='Check vectorized classifier equivalence and throughput')
+    p.add_argument('--csv', nargs='*', default=[], help='Labelled landmark CSVs to include')
+    p.add_argument('--synthetic', type=int, default=50000, help='Number of synthetic hands (default: 50000)')
+    p.add_argument('--batch-size', type=int, default=4096, help='Hands per classify_batch call (default: 4096)')
+    p.add_argument('--json', help='Write results to this JSON file')
+    p.set_defaults(func=bench_classifier)
+
+    p = subparsers.add_parser('headless', help='Compare GUI loop fps with headless event mode')
+    source = p.add_mutually_exclusive_group(required=True)
+    source.add_argument('--video', help='Recorded clip to replay')
+    source.add_argument('--synthetic', action='store_true', help='Use generated frames instead of a clip')
+    p.add_argument('--synthetic-size', type=parse_size, default=(1920, 1080),
+                   help='Synthetic frame size WIDTHxHEIGHT (default: 1920x1080)')
+    p.add_argument('--frames', type=int, default=300, help='Frames to measure (default: 300)')
+    p.add_argument('--warmup', type=int, default=10, help='Frames to run before measuring (default: 10)')
+    p.add_argument('--running-mode', default='image', choices=['image', 'video', 'live_stream'],
+                   help='Landmarker running mode (default: image)')
+    p.add_argument('--inference-size', type=parse_size, default=None,
+                   help='Downscale frames to fit WIDTHxHEIGHT before detection')
+    p.add_argument('--display', action='store_true',
+                   help='Include cv2.imshow/waitKey in the GUI loop (needs a display)')
+    p.add_argument('--json', help='Write results to this JSON file')
+    p.set_defaults(func=bench_headless)
+
+    p = subparsers.add_parser('debounce', help='Replay a session through the gesture debouncer')
+    source = p.add_mutually_exclusive_group()
+    source.add_argument('--video', help='Recorded clip to classify frame by frame')
+    source.add_argument('--labels', help='Label log: one LABEL[,CONFIDENCE] line per frame')
+    source.add_argument('--synthetic', type=int, default=18000,
+                        help='Frames of generated flickering session (default: 18000, 10 minutes at 30 fps)')
+    p.add_argument('--flicker', type=float, default=0.15,
+                   help='Synthetic per-frame misread probability (default: 0.15)')
+    p.add_argument('--running-mode', default='video', choices=['image', 'video', 'live_stream'],
+                   help='Landmarker running mode for --video (default: video)')
+    p.add_argument('--classifier', default='rules', choices=['rules', 'model'],
+                   help='Gesture classifier for --video (default: rules)')
+    p.add_argument('--save-labels', help='Write the per-frame labels to this label log for later replays')
+    p.add_argument('--fps', type=float, default=30.0, help='Frame rate of the session (default: 30)')
+    p.add_argument('--window', type=int, default=8, help='Debounce ring buffer size (default: 8)')
+    p.add_argument('--enter-frames', type=int, default=5, help='Frames needed to start (default: 5)')
+    p.add_argument('--exit-frames', type=int, default=6, help='Missing frames needed to end (default: 6)')
+    p.add_argument('--cooldown', type=float, default=0.5, help='Seconds between end and next start (default: 0.5)')
+    p.add_argument('--hold-interval', type=float, default=1.0,
+                   help='Seconds between hold events, 0 to disable (default: 1.0)')
+    p.add_argument('--verbose', action='store_true', help='List every debounced event')
+    p.add_argument('--json', help='Write results to this JSON file')
+    p.set_defaults(func=bench_debounce)
+
+    p = subparsers.add_parser('alloc', help='Per-frame allocations of frame preprocessing')
+    source = p.add_mutually_exclusive_group(required=True)
+    source.add_argument('--video', help='Recorded clip to replay')
+    source.add_argument('--synthetic', action='store_true', help='Use generated frames instead of a clip')
+    p.add_argument('--synthetic-size', type=parse_size, default=(1920, 1080),
+                   help='Synthetic frame size WIDTHxHEIGHT (default: 1920x1080)')
+    p.add_argument('--frames', type=int, default=100, help='Frames to measure (default: 100)')
+    p.add_argument('--warmup', type=int, default=5, help='Frames to run before measuring (default: 5)')
+    p.add_argument('--inference-size', type=parse_size, default=None,
+                   help='Downscale frames to fit WIDTHxHEIGHT before detection')
+    p.add_argument('--fps', type=float, default=30.0, help='Frame rate for the MB/s column (default: 30)')
+    p.add_argument('--json', help='Write results to this JSON file')
+    p.set_defaults(func=bench_alloc)
+
+    p = subparsers.add_parser('idle', help='CPU use with and without the motion/presence inference scheduler')
+    p.add_argument('--video', help='Also replay this clip and report time to first detection')
+    p.add_argument('--synthetic-size', type=parse_size, default=(1920, 1080),
+                   help='Synthetic frame size WIDTHxHEIGHT (default: 1920x1080)')
+    p.add_argument('--seconds', type=float, default=10.0, help='Length of each synthetic run (default: 10)')
+    p.add_argument('--fps', type=float, default=30.0, help='Camera frame rate to pace at (default: 30)')
+    p.add_argument('--running-mode', default='image', choices=['image', 'video', 'live_stream'],
+                   help='Landmarker running mode (default: image)')
+    p.add_argument('--inference-size', type=parse_size, default=None,
+                   help='Downscale frames to fit WIDTHxHEIGHT before detection')
+    p.add_argument('--idle-after', type=float, default=1.0, help='Scheduler idle_after (default: 1.0)')
+    p.add_argument('--idle-interval', type=float, default=0.5, help='Scheduler idle_interval (default: 0.5)')
+    p.add_argument('--motion-threshold', type=float, default=6.0, help='Scheduler motion threshold (default: 6)')
+    p.add_argument('--json', help='Write results to this JSON file')
+    p.set_defaults(func=bench_idle)
+
+    p = subparsers.add_parser('startup', help='Import, model resolution, detector init and first-frame timings')
+    p.add_argument('--runs', type=int, default=5, help='Fresh interpreters per variant (default: 5)')
+    p.add_argument('--running-mode', default='image', choices=['image', 'video', 'live_stream'],
+                   help='Landmarker running mode (default: image)')
+    p.add_argument('--frame-size', type=parse_size, default=(1920, 1080),
+                   help='Frame size for the first-frame timing WIDTHxHEIGHT (default: 1920x1080)')
+    p.add_argument('--json', help='Write results to this JSON file')
+    p.set_defaults(func=bench_startup)
+
+    p = subparsers.add_parser('quality', help='Latency against a budget with and without the adaptive quality controller')
+    p.add_argument('--video', help='Replay this clip instead of synthetic frames')
+    p.add_argument('--synthetic-size', type=parse_size, default=(1920, 1080),
+                   help='Synthetic frame size WIDTHxHEIGHT (default: 1920x1080)')
+    p.add_argument('--seconds', type=float, default=30.0, help='Length of each run (default: 30)')
+    p.add_argument('--fps', type=float, default=30.0, help='Camera frame rate to pace at (default: 30)')
+    p.add_argument('--budget-ms', type=float, default=40.0, help='Per-frame latency budget (default: 40)')
+    p.add_argument('--load-threads', type=int, default=None,
+                   help='Busy threads during the middle third of each run (default: one per core)')
+    p.add_argument('--running-mode', default='video', choices=['image', 'video', 'live_stream'],
+                   help='Landmarker running mode (default: video)')
+    p.add_argument('--inference-size', type=parse_size, default=None,
+                   help='Downscale frames to fit WIDTHxHEIGHT before detection')
+    p.add_argument('--json', help='Write results to this JSON file')
+    p.set_defaults(func=bench_quality)
+
+    p = subparsers.add_parser('render', help='GUI overlay cost: per-call drawing vs the batched, throttled renderer')
+    p.add_argument('--synthetic-size', type=parse_size, default=(1920, 1080),
+                   help='Synthetic frame size WIDTHxHEIGHT (default: 1920x1080)')
+    p.add_argument('--hands', type=int, default=1, help='Hands drawn per frame (default: 1)')
+    p.add_argument('--frames', type=int, default=300, help='Frames to measure (default: 300)')
+    p.add_argument('--warmup', type=int, default=10, help='Frames to run before measuring (default: 10)')
+    p.add_argument('--capture-fps', type=float, default=60.0, help='Simulated capture rate (default: 60)')
+    p.add_argument('--preview-width', type=int, default=960, help='Preview width (default: 960)')
+    p.add_argument('--display-fps', type=float, default=30.0, help='Preview refresh rate (default: 30)')
+    p.add_argument('--display', action='store_true', help='Include cv2.imshow/waitKey (needs a display)')
+    p.add_argument('--json', help='Write results to this JSON file')
+    p.set_defaults(func=bench_render)
+
+    p = subparsers.add_parser('hands', help='Per-frame cost and track stability as the number of hands grows')
+    p.add_argument('--hands', type=int, nargs='+', default=[1, 2, 4, 8],
+                   help='Hand counts to measure (default: 1 2 4 8)')
+    p.add_argument('--frames', type=int, default=1000, help='Frames per hand count (default: 1000)')
+    p.add_argument('--warmup', type=int, default=20, help='Frames to run before measuring (default: 20)')
+    p.add_argument('--json', help='Write results to this JSON file')
+    p.set_defaults(func=bench_hands)
+
+    args = parser.parse_args(argv)
+    return args.func(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Camera Discovery
+Finds a working camera for HandGestureDetector quickly: candidate devices are
+deduplicated (paths, /dev/elp_* symlinks and indices that name the same
+device are probed once), probed concurrently with a per-device timeout, and
+the winner's negotiated resolution and frame rate are cached so the next
+start opens it directly. The cache is only bypassed when the cached device
+no longer matches (symlink retargeted, node gone) or fails to deliver a frame.
+
+Usage:
+    python3 camera_discovery.py --camera /dev/elp_1
+    python3 camera_discovery.py --camera 0 --clear-cache
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from landmarker_model import cache_dir
+
+DEFAULT_TIMEOUT = 3.0
+CACHE_FILE = 'camera_cache.json'
+
+
+def cache_path():
+    return os.path.join(cache_dir(), CACHE_FILE)
+
+
+def canonical_device(device):
+    """
+    Reduce a device spec to what cv2.VideoCapture should open
+
+    Numeric strings and /dev/videoN paths become the index N, symlinks such
+    as /dev/elp_1 are resolved once; other existing paths (video files) are
+    kept. Returns None for a path that does not exist.
+    """
+    if isinstance(device, int):
+        return device
+    device = str(device)
+    if device.isdigit():
+        return int(device)
+    if not os.path.exists(device):
+        return None
+    target = os.path.realpath(device)
+    match = re.fullmatch(r'/dev/video(\d+)', target)
+    if match:
+        return int(match.group(1))
+    return target
+
+
+def candidate_devices(requested):
+    """
+    Devices to try for a requested camera, in preference order, without duplicates
+
+    Same fallbacks as the original serial search: the requested device, the
+    usual Linux nodes, the number in the requested name, then index 0.
+    """
+    candidates = [requested]
+    if sys.platform == 'linux':
+        candidates.extend(['/dev/video0', '/dev/video2', '/dev/video1'])
+    if isinstance(requested, str) and ('video' in requested or 'elp' in requested.lower()):
+        numbers = re.findall(r'\d+', requested)
+        if numbers:
+            candidates.append(int(numbers[0]))
+    candidates.append(0)
+
+    seen = set()
+    unique = []
+    for candidate in candidates:
+        device = canonical_device(candidate)
+        if device is None or device in seen:
+            continue
+        seen.add(device)
+        unique.append(device)
+    return unique
+
+
+def _apply_properties(cap, properties):
+    import cv2
+
+    if not properties:
+        return
+    width, height, fps = properties
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    cap.set(cv2.CAP_PROP_FPS, fps)
+
+
+class _Probe:
+    """Open one device on a daemon thread; a hung driver call cannot block the caller"""
+
+    def __init__(self, device, properties):
+        self.device = device
+        self.properties = properties
+        self.cap = None
+        self.info = None
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+        self._abandoned = False
+        threading.Thread(target=self._run, name=f'camera-probe-{device}', daemon=True).start()
+
+    def _run(self):
+        import cv2
+
+        cap = None
+        try:
+            cap = cv2.VideoCapture(self.device)
+            if cap.isOpened():
+                _apply_properties(cap, self.properties)
+                ret, frame = cap.read()
+                if ret and frame is not None:
+                    self.info = {
+                        'device': self.device,
+                        'width': frame.shape[1],
+                        'height': frame.shape[0],
+                        'fps': cap.get(cv2.CAP_PROP_FPS) or None,
+                    }
+        except Exception:
+            self.info = None
+        with self._lock:
+            if self.info is not None and not self._abandoned:
+                self.cap = cap
+            elif cap is not None:
+                cap.release()
+            self.done.set()
+
+    def abandon(self):
+        """Release the capture now, or as soon as the probe finishes"""
+        with self._lock:
+            self._abandoned = True
+            if self.cap is not None:
+                self.cap.release()
+                self.cap = None
+
+
+def probe_devices(devices, properties=None, timeout=DEFAULT_TIMEOUT):
+    """
+    Probe devices concurrently and return the first working one in preference order
+
+    Returns:
+        (cv2.VideoCapture, info dict) or (None, None)
+    """
+    probes = [_Probe(device, properties) for device in devices]
+    deadline = time.monotonic() + timeout
+    winner = None
+    for probe in probes:
+        # Every probe started at the same time, so they all share one deadline
+        probe.done.wait(max(0.0, deadline - time.monotonic()))
+        if probe.done.is_set() and probe.cap is not None:
+            winner = probe
+            break
+    for probe in probes:
+        if probe is not winner:
+            probe.abandon()
+    if winner is None:
+        return None, None
+    return winner.cap, winner.info
+
+
+def _device_fingerprint(requested):
+    """What the requested name points at right now (detects retargeted symlinks)"""
+    if isinstance(requested, str) and os.path.exists(requested):
+        return os.path.realpath(requested)
+    return None
+
+
+def load_cache():
+    try:
+        with open(cache_path()) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache):
+    path = cache_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def clear_cache():
+    try:
+        os.unlink(cache_path())
+    except FileNotFoundError:
+        pass
+
+
+def _open_cached(entry, properties):
+    """Open the cached device directly; returns (cap, info) or (None, None) if it no longer works"""
+    import cv2
+
+    cap = cv2.VideoCapture(entry['device'])
+    if cap.isOpened():
+        # Ask for the resolution/fps the camera settled on last time
+        _apply_properties(cap, (entry['width'], entry['height'], entry['fps'] or properties[2])
+                          if properties else None)
+        ret, frame = cap.read()
+        if ret and frame is not None:
+            return cap, dict(entry, width=frame.shape[1], height=frame.shape[0])
+    cap.release()
+    return None, None
+
+
+def discover_camera(requested, properties=None, timeout=DEFAULT_TIMEOUT, use_cache=True):
+    """
+    Open the camera for a requested device
+
+    Args:
+        requested: Device path or index as given on the command line
+        properties: (width, height, fps) to request from the camera
+        timeout: Seconds to wait for the probes
+        use_cache: Try the cached device first and record the result
+
+    Returns:
+        (cv2.VideoCapture, info dict with device/width/height/fps/cached), or
+        (None, None) if no device delivered a frame
+    """
+    key = str(requested)
+    cache = load_cache() if use_cache else {}
+    entry = cache.get(key)
+    if entry and entry.get('fingerprint') == _device_fingerprint(requested) \
+            and entry.get('properties') == (list(properties) if properties else None):
+        cap, info = _open_cached(entry, properties)
+        if cap is not None:
+            info['cached'] = True
+            return cap, info
+
+    cap, info = probe_devices(candidate_devices(requested), properties, timeout)
+    if use_cache:
+        if cap is None:
+            cache.pop(key, None)
+        else:
+            cache[key] = dict(info, fingerprint=_device_fingerprint(requested),
+                              properties=list(properties) if properties else None, probed_at=time.time())
+        save_cache(cache)
+    if info is not None:
+        info['cached'] = False
+    return cap, info
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Find a working camera and cache it for the next start')
+    parser.add_argument('--camera', default='/dev/elp_1', help='Requested device path or index')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f'Seconds to wait for device probes (default: {DEFAULT_TIMEOUT})')
+    parser.add_argument('--size', default='1920x1080', help='Requested resolution (default: 1920x1080)')
+    parser.add_argument('--fps', type=float, default=30, help='Requested frame rate (default: 30)')
+    parser.add_argument('--clear-cache', action='store_true', help='Forget cached devices first')
+    parser.add_argument('--no-cache', action='store_true', help='Probe without reading or writing the cache')
+
+    args = parser.parse_args()
+
+    if args.clear_cache:
+        clear_cache()
+    width, _, height = args.size.lower().partition('x')
+    print(f"Candidates: {candidate_devices(args.camera)}")
+    start = time.perf_counter()
+    cap, info = discover_camera(args.camera, (int(width), int(height), args.fps), args.timeout,
+                                use_cache=not args.no_cache)
+    elapsed = (time.perf_counter() - start) * 1000
+    if cap is None:
+        print(f"No working camera found ({elapsed:.0f} ms)")
+        sys.exit(1)
+    cap.release()
+    source = 'cache' if info['cached'] else 'probe'
+    print(f"Camera {info['device']}: {info['width']}x{info['height']} @ {info['fps']} fps "
+          f"(from {source}, {elapsed:.0f} ms)")
+    print(f"Cache: {cache_path()}")
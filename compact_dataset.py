@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Landmark Dataset Compaction
+Streams any number of training CSVs and sample stores into one compact,
+indexed dataset: every sample normalized (wrist-relative, scale-invariant),
+near-duplicates dropped, rows grouped by label
+
+The output is a sample store directory (see sample_store.py), so training
+and evaluation memory-map it instead of parsing text:
+
+    meta.json       label vocabulary, per-label offset/count index, summary statistics
+    landmarks.f32   normalized landmarks, all samples of a label contiguous
+    labels.u16      label code per sample
+    stats.npz       per-label mean and std of the normalized landmarks
+
+Input is read in chunks and kept samples are spilled to one temporary file
+per label, so memory use is bounded by the chunk size plus the duplicate
+filter's hash set (one key per kept sample), not by the dataset size.
+Timestamps are not carried over.
+
+Usage:
+    python3 compact_dataset.py build dataset/ thumbs_up_training_data.csv more_samples/
+    python3 compact_dataset.py info dataset/
+    python3 gesture_model.py train dataset/
+"""
+
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from gesture_dataset import (DEFAULT_CHUNK_SIZE, MIDDLE_FINGER_MCP, NUM_LANDMARKS, WRIST, NearDuplicateFilter,
+                             normalize_landmarks)
+import sample_store
+from sample_store import LABEL_DTYPE, LABELS_FILE, LANDMARK_DTYPE, LANDMARKS_FILE
+
+STATS_FILE = 'stats.npz'
+
+# Wrist to middle finger MCP distance below which a sample cannot be normalized
+MIN_HAND_SCALE = 1e-6
+
+
+def _path_size(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    return os.path.getsize(path)
+
+
+class LabelSpill:
+    """Kept samples of one label, appended to a temporary file, with running sums for the statistics"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'wb')
+        self.count = 0
+        self.duplicates = 0
+        self.sum = np.zeros((NUM_LANDMARKS, 3))
+        self.sum_squares = np.zeros((NUM_LANDMARKS, 3))
+
+    def append(self, landmarks):
+        self.file.write(np.ascontiguousarray(landmarks, dtype=LANDMARK_DTYPE).tobytes())
+        self.count += len(landmarks)
+        values = landmarks.astype(np.float64)
+        self.sum += values.sum(axis=0)
+        self.sum_squares += np.square(values).sum(axis=0)
+
+    def mean_std(self):
+        if not self.count:
+            return np.zeros((NUM_LANDMARKS, 3)), np.zeros((NUM_LANDMARKS, 3))
+        mean = self.sum / self.count
+        return mean, np.sqrt(np.maximum(self.sum_squares / self.count - np.square(mean), 0.0))
+
+
+def compact(paths, output, resolution=0.25, normalize=True, chunk_size=DEFAULT_CHUNK_SIZE, overwrite=False):
+    """
+    Build a compacted dataset from training CSVs and/or sample stores
+
+    Args:
+        paths: Training CSV files and sample store directories
+        output: Directory to create
+        resolution: NearDuplicateFilter grid size (None or 0: keep every valid sample)
+        normalize: Store normalized landmarks; with False the original image
+                   coordinates are kept (e.g. for evaluating the rule-based
+                   classifier) and only duplicate detection uses normalized ones
+        chunk_size: Rows read per chunk
+        overwrite: Replace output if it is an existing sample store
+
+    Returns:
+        Summary dict (also stored under 'stats' in meta.json)
+    """
+    from evaluate_gestures import iter_sources
+
+    if os.path.exists(output):
+        if not (overwrite and sample_store.is_sample_store(output)):
+            raise FileExistsError(f"{output} already exists (a sample store can be replaced with --force)")
+    if os.path.abspath(output) in {os.path.abspath(path) for path in paths}:
+        raise ValueError("Output must not be one of the inputs")
+
+    # Built next to the output and moved into place at the end, so an
+    # interrupted run never leaves a half-written dataset behind
+    tmp_output = output.rstrip(os.sep) + '.tmp'
+    shutil.rmtree(tmp_output, ignore_errors=True)
+    spill_dir = os.path.join(tmp_output, 'spill')
+    os.makedirs(spill_dir)
+
+    dedupe = NearDuplicateFilter(resolution) if resolution else None
+    spills = {}
+    sources = []
+    start = time.perf_counter()
+    try:
+        for path in paths:
+            source = {'path': path, 'rows': 0, 'kept': 0, 'duplicates': 0, 'invalid': 0}
+            for labels, landmarks in iter_sources([path], chunk_size):
+                landmarks = np.asarray(landmarks, dtype=np.float32)
+                labels = np.array(labels, dtype=object)
+                source['rows'] += len(labels)
+
+                scale = np.linalg.norm(landmarks[:, MIDDLE_FINGER_MCP, :2] - landmarks[:, WRIST, :2], axis=1)
+                valid = np.isfinite(landmarks).all(axis=(1, 2)) & (scale > MIN_HAND_SCALE)
+                source['invalid'] += int((~valid).sum())
+                landmarks, labels = landmarks[valid], labels[valid]
+                if not len(labels):
+                    continue
+
+                normalized = normalize_landmarks(landmarks)
+                keep = np.ones(len(labels), dtype=bool)
+                if dedupe is not None:
+                    # Normalization is idempotent, so hashing normalized samples
+                    # gives the same keys as hashing the originals
+                    keep = dedupe.add_batch(normalized, labels)
+                stored = normalized if normalize else landmarks
+
+                for label in set(labels):
+                    is_label = labels == label
+                    spill = spills.get(label)
+                    if spill is None:
+                        spill = spills[label] = LabelSpill(os.path.join(spill_dir, f"{len(spills)}.f32"))
+                    kept = is_label & keep
+                    spill.append(stored[kept])
+                    spill.duplicates += int(is_label.sum() - kept.sum())
+                source['kept'] += int(keep.sum())
+                source['duplicates'] += int((~keep).sum())
+            sources.append(source)
+
+        # Concatenate the spills in label order and write the label column
+        label_names = sorted(spills)
+        index = {}
+        offset = 0
+        with open(os.path.join(tmp_output, LANDMARKS_FILE), 'wb') as landmarks_file, \
+                open(os.path.join(tmp_output, LABELS_FILE), 'wb') as labels_file:
+            for code, label in enumerate(label_names):
+                spill = spills[label]
+                spill.file.close()
+                with open(spill.path, 'rb') as f:
+                    shutil.copyfileobj(f, landmarks_file, 1 << 20)
+                labels_file.write(np.full(spill.count, code, dtype=LABEL_DTYPE).tobytes())
+                index[label] = {'offset': offset, 'count': spill.count}
+                offset += spill.count
+        shutil.rmtree(spill_dir)
+
+        means, stds = zip(*(spills[label].mean_std() for label in label_names)) if label_names else ((), ())
+        np.savez(os.path.join(tmp_output, STATS_FILE), labels=np.array(label_names, dtype=str),
+                 mean=np.array(means, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3),
+                 std=np.array(stds, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3))
+
+        summary = {
+            'rows': sum(source['rows'] for source in sources),
+            'kept': offset,
+            'duplicates': sum(source['duplicates'] for source in sources),
+            'invalid': sum(source['invalid'] for source in sources),
+            'dedupe_resolution': resolution or None,
+            'input_bytes': sum(_path_size(path) for path in paths),
+            'seconds': round(time.perf_counter() - start, 3),
+            'labels': {label: {'count': spills[label].count, 'duplicates': spills[label].duplicates}
+                       for label in label_names},
+            'sources': sources,
+        }
+        meta = {'format': sample_store.FORMAT_NAME, 'version': sample_store.FORMAT_VERSION,
+                'num_landmarks': NUM_LANDMARKS, 'labels': label_names,
+                'normalized': bool(normalize), 'index': index, 'stats': summary}
+        with open(os.path.join(tmp_output, sample_store.META_FILE), 'w') as f:
+            json.dump(meta, f, indent=2)
+    except BaseException:
+        for spill in spills.values():
+            spill.file.close()
+        shutil.rmtree(tmp_output, ignore_errors=True)
+        raise
+
+    if os.path.exists(output):
+        shutil.rmtree(output)
+    os.replace(tmp_output, output)
+    return summary
+
+
+def load_stats(path):
+    """Per-label statistics of a compacted dataset: {label: (mean, std)} as (21, 3) arrays"""
+    with np.load(os.path.join(path, STATS_FILE)) as stats:
+        return {label: (mean, std) for label, mean, std in zip(stats['labels'].tolist(), stats['mean'], stats['std'])}
+
+
+def print_summary(path):
+    with open(os.path.join(path, sample_store.META_FILE)) as f:
+        meta = json.load(f)
+    stats = meta.get('stats')
+    if stats is None:
+        raise ValueError(f"{path} is a sample store but not a compacted dataset")
+    size = _path_size(path)
+    print(f"{path}: {stats['kept']} samples ({'normalized' if meta['normalized'] else 'image coordinates'}), "
+          f"{size / 2**20:.2f} MiB")
+    print(f"  from {stats['rows']} rows: {stats['duplicates']} near-duplicates "
+          f"(resolution {stats['dedupe_resolution']}), {stats['invalid']} invalid")
+    if stats['input_bytes']:
+        print(f"  input {stats['input_bytes'] / 2**20:.2f} MiB -> {size / stats['input_bytes']:.1%} of input size")
+    print(f"  {'label':>12} {'offset':>10} {'count':>10} {'duplicates':>11}")
+    for label in meta['labels']:
+        entry = meta['index'][label]
+        print(f"  {label:>12} {entry['offset']:>10} {entry['count']:>10} "
+              f"{stats['labels'][label]['duplicates']:>11}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Normalize, dedupe and index labelled landmark samples')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    p = subparsers.add_parser('build', help='Compact CSVs and sample stores into one indexed dataset')
+    p.add_argument('output', help='Dataset directory to create')
+    p.add_argument('paths', nargs='+', help='Training CSV files or sample store directories')
+    p.add_argument('--resolution', type=float, default=0.25,
+                   help='Near-duplicate grid size in normalized units (default: 0.25, 0: keep duplicates)')
+    p.add_argument('--no-normalize', action='store_true',
+                   help='Keep image coordinates (needed to evaluate the rule-based classifier)')
+    p.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                   help=f'Rows read per chunk (default: {DEFAULT_CHUNK_SIZE})')
+    p.add_argument('--force', action='store_true', help='Replace output if it is an existing sample store')
+
+    p = subparsers.add_parser('info', help='Show the index and statistics of a compacted dataset')
+    p.add_argument('path', help='Dataset directory')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        try:
+            summary = compact(args.paths, args.output, resolution=args.resolution, normalize=not args.no_normalize,
+                              chunk_size=args.chunk_size, overwrite=args.force)
+        except (FileExistsError, ValueError) as e:
+            parser.error(str(e))
+        print(f"Compacted {summary['rows']} rows into {summary['kept']} samples in {summary['seconds']:.2f}s")
+        print_summary(args.output)
+    else:
+        print_summary(args.path)
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Offline Gesture Evaluation
+Streams labelled landmark CSVs or binary sample stores through the vectorized
+gesture classifier and reports a per-gesture confusion matrix, accuracy and
+throughput - no camera needed
+
+Usage:
+    python3 evaluate_gestures.py thumbs_up_training_data.csv
+    python3 evaluate_gestures.py samples/ --threshold FINGER_EXTENDED_THRESHOLD=0.06 --min-accuracy 0.95
+"""
+
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import gesture_classifier
+from gesture_classifier import GESTURE_LABELS, NO_GESTURE, classify_codes
+from gesture_dataset import DEFAULT_CHUNK_SIZE, iter_csv_chunks
+import sample_store
+
+# Label used in the report (and accepted in CSVs) for "no gesture"
+NONE_LABEL = 'NONE'
+
+
+class EvaluationReport:
+    """Confusion matrix and throughput for one evaluation run"""
+
+    def __init__(self, labels, confusion, seconds):
+        """
+        Args:
+            labels: Label names; row/column i of confusion refers to labels[i]
+            confusion: (K, K) int64 array, confusion[true, predicted]
+            seconds: Wall time spent reading and classifying
+        """
+        self.labels = list(labels)
+        self.confusion = confusion
+        self.seconds = seconds
+
+    @property
+    def rows(self):
+        return int(self.confusion.sum())
+
+    @property
+    def accuracy(self):
+        return float(np.trace(self.confusion) / self.rows) if self.rows else 0.0
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def per_gesture(self):
+        """Precision, recall and support for every label that occurs"""
+        stats = {}
+        true_totals = self.confusion.sum(axis=1)
+        predicted_totals = self.confusion.sum(axis=0)
+        for i, label in enumerate(self.labels):
+            if true_totals[i] == 0 and predicted_totals[i] == 0:
+                continue
+            correct = self.confusion[i, i]
+            stats[label] = {
+                'support': int(true_totals[i]),
+                'predicted': int(predicted_totals[i]),
+                'precision': float(correct / predicted_totals[i]) if predicted_totals[i] else 0.0,
+                'recall': float(correct / true_totals[i]) if true_totals[i] else 0.0,
+            }
+        return stats
+
+    def to_dict(self):
+        return {
+            'labels': self.labels,
+            'confusion': self.confusion.tolist(),
+            'rows': self.rows,
+            'accuracy': self.accuracy,
+            'seconds': self.seconds,
+            'rows_per_sec': self.rows_per_sec,
+            'per_gesture': self.per_gesture(),
+        }
+
+    def print_report(self):
+        # Only show labels that occur as ground truth or prediction
+        shown = [i for i in range(len(self.labels))
+                 if self.confusion[i].any() or self.confusion[:, i].any()]
+        width = max([len(self.labels[i]) for i in shown] + [9])
+
+        print("\nConfusion matrix (rows: true label, columns: predicted)")
+        print(" " * width + "  " + "  ".join(f"{self.labels[i]:>{width}}" for i in shown))
+        for i in shown:
+            print(f"{self.labels[i]:>{width}}  " + "  ".join(f"{self.confusion[i, j]:>{width}}" for j in shown))
+
+        print("\nPer-gesture")
+        for label, stats in self.per_gesture().items():
+            print(f"  {label:>{width}}: support={stats['support']:<8} precision={stats['precision']:.3f} "
+                  f"recall={stats['recall']:.3f}")
+
+        print(f"\nRows: {self.rows}  Accuracy: {self.accuracy:.4f}  "
+              f"Time: {self.seconds:.2f}s  Throughput: {self.rows_per_sec:,.0f} rows/sec")
+
+
+def iter_sources(paths, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield (labels, landmarks) chunks from every CSV file or sample store directory in paths"""
+    for path in paths:
+        if sample_store.is_sample_store(path):
+            yield from sample_store.load(path).iter_chunks(chunk_size)
+        else:
+            yield from iter_csv_chunks(path, chunk_size)
+
+
+def evaluate_chunks(chunks, classify=classify_codes):
+    """
+    Classify labelled landmark chunks and accumulate a confusion matrix
+
+    Args:
+        chunks: Iterable of (labels, (n, 21, 3) landmarks)
+        classify: Function mapping an (n, 21, 3) array to gesture codes
+                  (indices into GESTURE_LABELS, NO_GESTURE for none)
+
+    Returns:
+        EvaluationReport
+    """
+    labels = list(GESTURE_LABELS) + [NONE_LABEL]
+    label_index = {label: i for i, label in enumerate(labels)}
+    label_index[''] = label_index[NONE_LABEL]
+    confusion = np.zeros((len(labels), len(labels)), dtype=np.int64)
+
+    start = time.perf_counter()
+    for chunk_labels, landmarks in chunks:
+        for label in set(chunk_labels) - label_index.keys():
+            # Ground-truth label the rules can never predict (e.g. a new gesture)
+            label_index[label] = len(labels)
+            labels.append(label)
+            confusion = np.pad(confusion, ((0, 1), (0, 1)))
+
+        true_idx = np.fromiter((label_index[label] for label in chunk_labels),
+                               dtype=np.int64, count=len(chunk_labels))
+        codes = np.asarray(classify(landmarks), dtype=np.int64)
+        predicted_idx = np.where(codes == NO_GESTURE, label_index[NONE_LABEL], codes)
+
+        k = len(labels)
+        confusion += np.bincount(true_idx * k + predicted_idx, minlength=k * k).reshape(k, k)
+
+    return EvaluationReport(labels, confusion, time.perf_counter() - start)
+
+
+def evaluate(paths, classify=classify_codes, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Evaluate a classifier on labelled landmark CSV files and/or sample stores"""
+    return evaluate_chunks(iter_sources(paths, chunk_size), classify)
+
+
+def apply_threshold_overrides(overrides):
+    """
+    Override gesture_classifier thresholds from NAME=VALUE strings
+
+    Lets threshold changes be regression-tested without editing code.
+    """
+    for override in overrides:
+        name, _, value = override.partition('=')
+        if not name.isupper() or not hasattr(gesture_classifier, name):
+            raise ValueError(f"Unknown classifier threshold: {name}")
+        current = getattr(gesture_classifier, name)
+        setattr(gesture_classifier, name, type(current)(value))
+        print(f"Override: {name} = {getattr(gesture_classifier, name)} (was {current})")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Evaluate gesture classification against labelled landmark CSVs')
+    parser.add_argument('paths', nargs='+', help='Labelled landmark CSV files or sample store directories')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                       help=f'Rows classified per batch (default: {DEFAULT_CHUNK_SIZE})')
+    parser.add_argument('--threshold', action='append', default=[], metavar='NAME=VALUE',
+                       help='Override a gesture_classifier threshold, e.g. FINGER_EXTENDED_THRESHOLD=0.06')
+    parser.add_argument('--min-accuracy', type=float, default=None,
+                       help='Exit with status 1 if accuracy falls below this value')
+    parser.add_argument('--model', default=None,
+                       help='Evaluate a learned model file (gesture_model.py) instead of the rules')
+    parser.add_argument('--json', help='Write the report to this JSON file')
+
+    args = parser.parse_args()
+
+    classify = classify_codes
+    if args.model:
+        from gesture_model import GestureModel
+        classify = GestureModel.load(args.model).predict_codes
+    else:
+        # Rule thresholds are in image units; normalized samples would all misclassify
+        for path in args.paths:
+            if sample_store.is_sample_store(path) and sample_store.load(path).normalized:
+                parser.error(f"{path} holds normalized landmarks: evaluate it with --model, or build it "
+                             f"with compact_dataset.py --no-normalize for the rules")
+    apply_threshold_overrides(args.threshold)
+    report = evaluate(args.paths, classify=classify, chunk_size=args.chunk_size)
+    report.print_report()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report.to_dict(), f, indent=2)
+        print(f"Report written to: {args.json}")
+
+    if args.min_accuracy is not None and report.accuracy < args.min_accuracy:
+        print(f"FAIL: accuracy {report.accuracy:.4f} below {args.min_accuracy}")
+        sys.exit(1)
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+asyncio Gesture API
+Lets an asyncio application (e.g. the OBS websocket controller) consume
+gesture events without handing the process to HandGestureDetector.run():
+
+    async with detector.gestures(debounce=True) as events:
+        async for event in events:
+            await switch_scene(event)
+
+Capture and inference run on the FramePipeline threads and classification on
+one more thread, so the event loop only ever receives finished events.
+Backpressure is bounded twice: the pipeline drops frames rather than queue
+them, and the event queue drops its oldest event when the consumer falls
+behind. Cancelling the consuming task or leaving the `async with` block
+stops the threads, releases the camera and closes the landmarker.
+
+Usage:
+    python3 gesture_async.py --camera 0 --seconds 30 --consumer-delay 0.5
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from gesture_sinks import AsyncQueueSink
+
+# Marks the end of the stream in the event queue
+_END = object()
+
+
+class _Failure:
+    """Ends the stream in the event queue, carrying the exception that stopped it"""
+
+    def __init__(self, error):
+        self.error = error
+
+
+class GestureStream:
+    """Async iterator of GestureEvents from a HandGestureDetector's camera"""
+
+    def __init__(self, detector, max_pending=32, debounce=None, result_queue_size=2):
+        """
+        Args:
+            detector: HandGestureDetector (owned by the stream from now on:
+                      its camera and landmarker are closed with the stream)
+            max_pending: Events buffered for a slow consumer before the oldest are dropped
+            debounce: As for HandGestureDetector.configure_events
+            result_queue_size: Capacity of the pipeline's inference -> event queue
+        """
+        self.detector = detector
+        self.max_pending = max_pending
+        self.debounce = debounce
+        self.result_queue_size = result_queue_size
+
+        self.sink = None
+        self._queue = None
+        self._cap = None
+        self._pipeline = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._started = False
+        self._closed = False
+        self._closing = None
+
+    @property
+    def dropped_events(self):
+        return self.sink.dropped if self.sink is not None else 0
+
+    def stats(self):
+        """Pipeline counters plus events dropped for a slow consumer"""
+        stats = self._pipeline.stats() if self._pipeline is not None else {}
+        stats['dropped_events'] = self.dropped_events
+        return stats
+
+    async def start(self):
+        """Open the camera and start the capture, inference and event threads"""
+        if self._started:
+            return
+        self._started = True
+        from gesture_pipeline import FramePipeline
+
+        loop = asyncio.get_running_loop()
+        # A bare `async for` is not closed when its task is cancelled between
+        # events, so tie the threads and camera to the consuming task's lifetime
+        consumer = asyncio.current_task()
+        if consumer is not None:
+            consumer.add_done_callback(lambda task: self._begin_close(loop))
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self.sink = AsyncQueueSink(loop, self._queue)
+        self.detector.configure_events(self.sink, self.debounce)
+
+        # Device probing blocks for up to the probe timeout
+        self._cap = await loop.run_in_executor(None, self.detector.open_camera)
+        if self._cap is None:
+            await self.aclose()
+            raise RuntimeError(f"Could not open camera: {self.detector.camera_device}")
+
+        self._pipeline = FramePipeline(self.detector, self._cap, result_queue_size=self.result_queue_size)
+        self._pipeline.start()
+        self._thread = threading.Thread(target=self._event_loop, name='gesture-events', daemon=True)
+        self._thread.start()
+
+    def _event_loop(self):
+        """Classify pipeline results and emit events (runs on its own thread)"""
+        pipeline = self._pipeline
+        try:
+            while not self._stop.is_set():
+                result = pipeline.get_result(timeout=0.1)
+                if result is None:
+                    if not pipeline.is_running():
+                        break
+                    continue
+                self.detector.emit_detection(result.detection_result, result.frame_id)
+        except Exception as e:
+            # Capture, inference or classification failed: end the stream with the error
+            self.sink.emit(_Failure(e))
+            return
+        if not self._stop.is_set():
+            # Camera stopped delivering frames: end held gestures, then the stream
+            self.detector.flush_events()
+            self.sink.emit(_END)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._closed:
+            raise StopAsyncIteration
+        try:
+            await self.start()
+            event = await self._queue.get()
+        except asyncio.CancelledError:
+            await self.aclose()
+            raise
+        if event is _END:
+            await self.aclose()
+            raise StopAsyncIteration
+        if isinstance(event, _Failure):
+            await self.aclose()
+            raise event.error
+        return event
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    def _begin_close(self, loop):
+        if self._closing is None:
+            self._closed = True
+            self._stop.set()
+            # Joining threads and closing MediaPipe can block; keep it off the event loop
+            self._closing = loop.run_in_executor(None, self._shutdown)
+        return self._closing
+
+    async def aclose(self):
+        """Stop all threads, release the camera and close the landmarker (idempotent)"""
+        # Shielded so a second cancellation cannot leave the camera open
+        await asyncio.shield(self._begin_close(asyncio.get_running_loop()))
+
+    def _shutdown(self):
+        stopped = True
+        if self._pipeline is not None:
+            stopped = self._pipeline.stop()
+        if self._thread is not None:
+            self._thread.join(2.0)
+            stopped = stopped and not self._thread.is_alive()
+        if not stopped:
+            # A thread stuck in cap.read() or detect() would crash on a
+            # released camera or closed landmarker; leave both to process exit
+            print("WARNING: Gesture stream threads did not stop; camera and landmarker left open")
+            return
+        if self._cap is not None:
+            self._cap.release()
+        self.detector.hand_landmarker.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Print gesture events from the asyncio API')
+    parser.add_argument('--camera', default='/dev/elp_1', help='Camera device path or index')
+    parser.add_argument('--seconds', type=float, default=None, help='Stop (cancel) after this many seconds')
+    parser.add_argument('--debounce', action='store_true', help='Debounced start/hold/end events')
+    parser.add_argument('--max-pending', type=int, default=32, help='Event queue bound (default: 32)')
+    parser.add_argument('--consumer-delay', type=float, default=0.0,
+                        help='Simulate a slow consumer: seconds to sleep per event')
+
+    args = parser.parse_args()
+
+    from test_hand_gestures import HandGestureDetector
+
+    async def consume(stream):
+        async for event in stream:
+            print(f"{event.kind:>6} {event.gesture} frame={event.frame_index}")
+            if args.consumer_delay:
+                await asyncio.sleep(args.consumer_delay)
+
+    async def main():
+        detector = HandGestureDetector(camera_device=args.camera, running_mode='video')
+        stream = detector.gestures(max_pending=args.max_pending, debounce=args.debounce or None)
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(consume(stream), args.seconds)
+        except asyncio.TimeoutError:
+            print(f"Cancelled after {time.monotonic() - start:.1f}s")
+        finally:
+            await stream.aclose()
+            print(f"Stream closed: {stream.stats()}")
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\nInterrupted by user")
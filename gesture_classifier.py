@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Vectorized Hand Gesture Classifier
+NumPy implementation of the HandGestureDetector.detect_gesture rules that works
+on landmark arrays of shape (21, 3) or batches of shape (N, 21, 3)
+
+Only depends on NumPy, so offline tools can classify landmarks without
+importing OpenCV or MediaPipe.
+"""
+
+import numpy as np
+
+# Labels in rule priority order; the index is the gesture code, -1 means no gesture
+GESTURE_LABELS = ('STOP', '3', '2', '1', 'THUMBS_UP')
+NO_GESTURE = -1
+
+# Landmark indices
+WRIST = 0
+THUMB_MCP = 2
+THUMB_IP = 3
+THUMB_TIP = 4
+# Index, middle, ring, pinky
+FINGER_TIPS = np.array([8, 12, 16, 20])
+FINGER_PIPS = np.array([6, 10, 14, 18])
+
+# Same thresholds as HandGestureDetector.detect_gesture
+FINGER_EXTENDED_THRESHOLD = 0.05  # Finger tip must be this far above PIP
+FINGER_CLOSED_THRESHOLD = 0.03  # Finger tip must be this far below PIP
+THUMB_ABOVE_IP_THRESHOLD = 0.02
+THUMB_ABOVE_MCP_THRESHOLD = 0.01
+THUMB_ABOVE_WRIST_THRESHOLD = -0.02
+THUMB_MAX_X_DIFF = 0.15
+THUMB_MIN_SCORE = 2
+MIN_CLOSED_FINGERS = 3
+
+
+def hand_to_array(hand_landmarks):
+    """Convert one hand's landmarks (objects with .x/.y/.z) to a (21, 3) float32 array"""
+    return np.array([(lm.x, lm.y, lm.z) for lm in hand_landmarks], dtype=np.float32)
+
+
+def hands_to_array(hands):
+    """Convert a list of hands (e.g. HandLandmarkerResult.hand_landmarks) to an (N, 21, 3) float32 array"""
+    if not hands:
+        return np.empty((0, 21, 3), dtype=np.float32)
+    return np.array([[(lm.x, lm.y, lm.z) for lm in hand] for hand in hands], dtype=np.float32)
+
+
+def classify_codes(landmarks):
+    """
+    Classify a batch of hands into gesture codes
+
+    Args:
+        landmarks: Array of shape (N, 21, 3) (or (21, 3) for a single hand)
+                   in normalized image coordinates
+
+    Returns:
+        int8 array of shape (N,) with indices into GESTURE_LABELS, or
+        NO_GESTURE (-1) where no rule matches
+    """
+    landmarks = np.asarray(landmarks)
+    if landmarks.ndim == 2:
+        landmarks = landmarks[np.newaxis]
+    if landmarks.ndim != 3 or landmarks.shape[1:] != (21, 3):
+        raise ValueError(f"Expected landmarks of shape (N, 21, 3), got {landmarks.shape}")
+
+    # Compare in float64 like the scalar rules do, so labels match exactly at the thresholds
+    y = landmarks[:, :, 1].astype(np.float64)
+    tip_y = y[:, FINGER_TIPS]
+    pip_y = y[:, FINGER_PIPS]
+
+    # (N, 4) predicates for index, middle, ring, pinky
+    extended = tip_y < pip_y - FINGER_EXTENDED_THRESHOLD
+    closed = tip_y > pip_y + FINGER_CLOSED_THRESHOLD
+
+    thumb_tip_y = y[:, THUMB_TIP]
+    thumb_x_diff = np.abs(landmarks[:, THUMB_TIP, 0].astype(np.float64) - landmarks[:, THUMB_IP, 0])
+    thumb_up_score = (
+        ((y[:, THUMB_IP] - thumb_tip_y) > THUMB_ABOVE_IP_THRESHOLD).astype(np.int8)
+        + ((y[:, THUMB_MCP] - thumb_tip_y) > THUMB_ABOVE_MCP_THRESHOLD)
+        + ((y[:, WRIST] - thumb_tip_y) > THUMB_ABOVE_WRIST_THRESHOLD)
+        + (thumb_x_diff < THUMB_MAX_X_DIFF)
+    )
+    closed_finger_count = np.count_nonzero(~extended | closed, axis=1)
+
+    index_ext, middle_ext, ring_ext, pinky_ext = extended.T
+    index_closed, middle_closed, ring_closed, pinky_closed = closed.T
+
+    # Same order as detect_gesture: the first matching rule wins
+    conditions = [
+        index_ext & middle_ext & ring_ext & pinky_ext,
+        index_ext & middle_ext & ring_ext & pinky_closed,
+        index_ext & middle_ext & ring_closed & pinky_closed,
+        index_ext & middle_closed & ring_closed & pinky_closed,
+        (thumb_up_score >= THUMB_MIN_SCORE) & (closed_finger_count >= MIN_CLOSED_FINGERS) & ~index_ext,
+    ]
+    return np.select(conditions, np.arange(len(GESTURE_LABELS)), default=NO_GESTURE).astype(np.int8)
+
+
+def codes_to_labels(codes):
+    """Map gesture codes to label strings (None for NO_GESTURE)"""
+    return [GESTURE_LABELS[code] if code >= 0 else None for code in codes]
+
+
+def classify_batch(landmarks):
+    """Classify an (N, 21, 3) batch, returning a list of N labels (None where no gesture)"""
+    return codes_to_labels(classify_codes(landmarks))
+
+
+def classify_landmarks(landmarks):
+    """Classify a single (21, 3) hand, returning a label string or None"""
+    code = classify_codes(landmarks)[0]
+    return GESTURE_LABELS[code] if code >= 0 else None
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Landmark Dataset I/O
+Readers for labelled hand landmark samples in the training CSV layout written
+by ThumbsUpTrainer (gesture, lm_{i}_{x,y,z} for 21 landmarks), plus the
+landmark normalization shared by training and dataset tools
+
+Only depends on NumPy.
+"""
+
+import itertools
+
+import numpy as np
+
+NUM_LANDMARKS = 21
+WRIST = 0
+MIDDLE_FINGER_MCP = 9
+
+# Header: gesture label + 21 landmarks * 3 coordinates (x, y, z) = 63 columns
+CSV_HEADER = ['gesture'] + [f'lm_{i}_{coord}' for i in range(NUM_LANDMARKS) for coord in ['x', 'y', 'z']]
+
+DEFAULT_CHUNK_SIZE = 65536
+
+
+def iter_csv_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream a landmark CSV in chunks
+
+    Args:
+        path: CSV file with the CSV_HEADER layout
+        chunk_size: Maximum rows per chunk
+
+    Yields:
+        (labels, landmarks) where labels is a list of gesture strings and
+        landmarks is a float32 array of shape (n, 21, 3)
+    """
+    with open(path, newline='') as f:
+        header = f.readline().strip().split(',')
+        if header != CSV_HEADER:
+            raise ValueError(f"{path}: unexpected header, expected gesture + lm_{{i}}_{{x,y,z}} columns")
+        while True:
+            lines = [line for line in itertools.islice(f, chunk_size) if line.strip()]
+            if not lines:
+                break
+            labels = [line[:line.index(',')] for line in lines]
+            values = np.loadtxt(lines, delimiter=',', usecols=range(1, len(CSV_HEADER)),
+                                dtype=np.float32, ndmin=2)
+            yield labels, values.reshape(-1, NUM_LANDMARKS, 3)
+
+
+def read_csv(path):
+    """Read a whole landmark CSV into (labels, (N, 21, 3) float32 array)"""
+    labels = []
+    chunks = []
+    for chunk_labels, chunk in iter_csv_chunks(path):
+        labels.extend(chunk_labels)
+        chunks.append(chunk)
+    if not chunks:
+        return labels, np.empty((0, NUM_LANDMARKS, 3), dtype=np.float32)
+    return labels, np.concatenate(chunks)
+
+
+def normalize_landmarks(landmarks):
+    """
+    Make landmarks wrist-relative and scale-invariant
+
+    Translates the wrist to the origin and divides by the wrist to middle
+    finger MCP distance (measured in x/y; z from MediaPipe is noisier), so
+    the same pose gives the same values anywhere in the frame at any distance.
+
+    Args:
+        landmarks: Array of shape (21, 3) or (N, 21, 3)
+
+    Returns:
+        float32 array of the same shape
+    """
+    landmarks = np.asarray(landmarks, dtype=np.float32)
+    relative = landmarks - landmarks[..., WRIST:WRIST + 1, :]
+    scale = np.linalg.norm(relative[..., MIDDLE_FINGER_MCP, :2], axis=-1)
+    scale = np.maximum(scale, 1e-6)
+    return relative / scale[..., np.newaxis, np.newaxis]
+
+
+class NearDuplicateFilter:
+    """
+    Rejects samples that are near-duplicates of one already seen
+
+    Each sample's normalized x/y landmarks are quantized to a grid of
+    `resolution` (in units of the wrist to middle finger MCP distance) and the
+    label plus the grid cells form a hash key, so checking a sample is O(1)
+    regardless of how many have been kept. z is left out: it is the noisiest
+    coordinate and every extra dimension is another cell boundary that jitter
+    can push a held pose across. Two poses closer than `resolution` can still
+    land on either side of a boundary and both be kept; the filter only
+    promises that samples in the same cell are never kept twice.
+    """
+
+    def __init__(self, resolution=0.25):
+        """
+        Args:
+            resolution: Grid cell size in normalized units; larger rejects more
+        """
+        if resolution <= 0:
+            raise ValueError("resolution must be positive")
+        self.resolution = resolution
+        self._seen = set()
+
+    def __len__(self):
+        return len(self._seen)
+
+    def keys(self, landmarks):
+        """Hash keys (bytes) of an (N, 21, 3) batch, ignoring labels"""
+        # The wrist is the origin after normalization, so it carries no information
+        normalized = normalize_landmarks(landmarks).reshape(-1, NUM_LANDMARKS, 3)[:, WRIST + 1:, :2]
+        cells = np.floor(normalized.reshape(len(normalized), -1) / self.resolution)
+        cells = np.clip(cells, np.iinfo(np.int16).min, np.iinfo(np.int16).max).astype(np.int16)
+        return [row.tobytes() for row in cells]
+
+    def add_batch(self, landmarks, labels):
+        """
+        Record a batch of samples
+
+        Returns:
+            Boolean array, True for samples not seen before (duplicates within
+            the batch count too: only the first is True)
+        """
+        keep = np.zeros(len(labels), dtype=bool)
+        seen = self._seen
+        for i, (label, key) in enumerate(zip(labels, self.keys(landmarks))):
+            key = (label, key)
+            if key not in seen:
+                seen.add(key)
+                keep[i] = True
+        return keep
+
+    def add(self, landmarks, label):
+        """Record one (21, 3) sample; returns False if it is a near-duplicate"""
+        return bool(self.add_batch(np.asarray(landmarks)[np.newaxis], [label])[0])
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Gesture Debouncing
+State machine that turns the per-frame gesture labels from the classifier
+into a small stream of start/hold/end events, so a flickering label does not
+become a flood of scene switches downstream
+
+A gesture starts once it fills enter_frames of the last `window` frames with
+enough confidence, ends after exit_frames consecutive frames without it, and
+a new gesture may not start until `cooldown` seconds after the last one ended.
+While a gesture is held, a 'hold' event is repeated every hold_interval seconds.
+
+Every update is O(1): the window is a fixed-size ring buffer and per-label
+counts are adjusted as labels enter and leave it.
+
+Usage:
+    python3 test_hand_gestures.py --headless --debounce
+    python3 benchmark_gestures.py debounce --video clip.mp4
+"""
+
+import time
+
+from gesture_sinks import GestureEvent
+
+
+class GestureDebouncer:
+    """Debounce one hand's gesture labels into start/hold/end events"""
+
+    def __init__(self, window=8, enter_frames=5, exit_frames=6, enter_confidence=0.7,
+                 exit_confidence=0.4, cooldown=0.5, hold_interval=1.0, hand_index=0, track_id=None):
+        """
+        Args:
+            window: Number of recent frames kept in the ring buffer
+            enter_frames: Frames within the window a gesture needs before it starts
+            exit_frames: Consecutive frames without the active gesture before it ends
+            enter_confidence: Minimum classifier confidence for a frame to count
+                              towards starting a gesture
+            exit_confidence: Lower confidence still enough to keep an active
+                             gesture alive (hysteresis)
+            cooldown: Seconds after a gesture ends before another may start
+            hold_interval: Seconds between 'hold' events (None: no hold events)
+            hand_index: Hand index copied into emitted events
+            track_id: Track ID copied into emitted events
+        """
+        if not 0 < enter_frames <= window:
+            raise ValueError(f"enter_frames must be between 1 and window ({window})")
+        if exit_confidence > enter_confidence:
+            raise ValueError("exit_confidence must not exceed enter_confidence")
+        self.window = window
+        self.enter_frames = enter_frames
+        self.exit_frames = exit_frames
+        self.enter_confidence = enter_confidence
+        self.exit_confidence = exit_confidence
+        self.cooldown = cooldown
+        self.hold_interval = hold_interval
+        self.hand_index = hand_index
+        self.track_id = track_id
+        self.reset()
+
+    def reset(self):
+        """Forget all history (the active gesture is dropped without an end event)"""
+        self._ring = [None] * self.window
+        self._pos = 0
+        self._counts = {}
+        self.active = None
+        self._missing = 0
+        self._started_at = None
+        self._next_hold = None
+        self._cooldown_until = float('-inf')
+
+    def update(self, gesture, confidence=1.0, timestamp=None, frame_index=0):
+        """
+        Feed one frame's classification
+
+        Args:
+            gesture: Gesture label for this frame, or None
+            confidence: Classifier confidence in [0, 1] (rule classifier: 1.0)
+            timestamp: Frame time in seconds (default: time.monotonic())
+            frame_index: Frame counter copied into emitted events
+
+        Returns:
+            GestureEvent, or None when nothing changed. When one gesture ends and
+            another starts on the same frame only the end is returned; the
+            start follows on a later frame once the cooldown allows it.
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+
+        # Hysteresis: the active gesture survives on weaker frames than a new one needs
+        threshold = self.exit_confidence if gesture == self.active else self.enter_confidence
+        if confidence < threshold:
+            gesture = None
+
+        # Slide the window: drop the oldest label's count, add the newest
+        ring = self._ring
+        counts = self._counts
+        oldest = ring[self._pos]
+        if oldest is not None:
+            counts[oldest] -= 1
+        ring[self._pos] = gesture
+        self._pos = (self._pos + 1) % self.window
+        if gesture is not None:
+            counts[gesture] = counts.get(gesture, 0) + 1
+
+        if self.active is not None:
+            if gesture == self.active:
+                self._missing = 0
+            else:
+                self._missing += 1
+                if self._missing >= self.exit_frames:
+                    return self._end(timestamp, frame_index)
+            if self._next_hold is not None and timestamp >= self._next_hold:
+                self._next_hold += self.hold_interval
+                return self._event('hold', self.active, timestamp, frame_index)
+            return None
+
+        if (gesture is not None and counts[gesture] >= self.enter_frames
+                and timestamp >= self._cooldown_until):
+            self.active = gesture
+            self._missing = 0
+            self._started_at = timestamp
+            self._next_hold = timestamp + self.hold_interval if self.hold_interval else None
+            return self._event('start', gesture, timestamp, frame_index)
+        return None
+
+    def flush(self, timestamp=None, frame_index=0):
+        """End the active gesture (e.g. when the stream stops); returns the end event or None"""
+        if self.active is None:
+            return None
+        return self._end(time.monotonic() if timestamp is None else timestamp, frame_index)
+
+    def _end(self, timestamp, frame_index):
+        event = self._event('end', self.active, timestamp, frame_index)
+        self.active = None
+        self._next_hold = None
+        self._cooldown_until = timestamp + self.cooldown
+        return event
+
+    def _event(self, kind, gesture, timestamp, frame_index):
+        return GestureEvent(gesture, timestamp, frame_index, self.hand_index, kind=kind,
+                            duration=timestamp - self._started_at, track_id=self.track_id)
+
+
+def replay(labels, debouncer, fps=30.0):
+    """
+    Run a recorded sequence of per-frame labels through a debouncer
+
+    Args:
+        labels: Iterable of gesture labels or (label, confidence) pairs, one per frame
+        debouncer: GestureDebouncer (reset before use)
+        fps: Frame rate used to derive timestamps
+
+    Returns:
+        (raw_changes, events, seconds) where raw_changes counts frames whose
+        label differs from the previous frame's (the calls an undebounced
+        consumer makes), events are the debounced GestureEvents and seconds is
+        the time spent in update()
+    """
+    debouncer.reset()
+    events = []
+    raw_changes = 0
+    previous = None
+    elapsed = 0.0
+    frame_index = -1
+    for frame_index, item in enumerate(labels):
+        gesture, confidence = item if isinstance(item, tuple) else (item, 1.0)
+        if gesture != previous:
+            raw_changes += 1
+            previous = gesture
+        start = time.perf_counter()
+        event = debouncer.update(gesture, confidence, frame_index / fps, frame_index)
+        elapsed += time.perf_counter() - start
+        if event is not None:
+            events.append(event)
+    event = debouncer.flush((frame_index + 1) / fps, frame_index + 1)
+    if event is not None:
+        events.append(event)
+    return raw_changes, events, elapsed
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Gesture Detector Metrics
+Low-overhead counters, gauges and per-stage latency histograms for the detector loop,
+readable in-process with snapshot() or over a local HTTP endpoint in
+Prometheus text format
+
+Instrumented code holds a Metrics instance or None; when metrics are off the
+only cost is an `is not None` check per stage.
+
+Usage:
+    python3 test_hand_gestures.py --metrics-port 9108
+    curl http://127.0.0.1:9108/metrics
+    curl http://127.0.0.1:9108/metrics.json
+"""
+
+import json
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Histogram bucket upper bounds in seconds (a final +Inf bucket is implicit)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.02, 0.033, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Counter descriptions for the Prometheus HELP lines
+COUNTER_HELP = {
+    'frames_captured_total': 'Frames read from the camera',
+    'frames_processed_total': 'Frames that went through landmark detection',
+    'frames_dropped_total': 'Frames discarded before processing, by reason',
+    'frames_skipped_total': 'Frames the inference scheduler did not run detection on',
+    'hands_detected_total': 'Hands found by the landmarker',
+    'gestures_total': 'Hands classified as a gesture, by gesture',
+    'quality_skipped_frames_total': 'Frames the adaptive quality tier skipped inference on',
+    'quality_changes_total': 'Adaptive quality tier changes, by direction',
+}
+
+# Gauge descriptions for the Prometheus HELP lines
+GAUGE_HELP = {
+    'quality_tier': 'Current adaptive quality tier (0 = best)',
+    'latency_budget_seconds': 'Per-frame latency budget of the adaptive quality controller',
+    'quality_window_latency_seconds': 'Mean per-frame latency over the last quality controller window',
+}
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (cumulative buckets are built only when read)"""
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Estimate a quantile by linear interpolation inside its bucket"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.bounds[-1]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.bounds[-1]
+
+
+class Metrics:
+    """Thread-safe counters, gauges and per-stage histograms"""
+
+    def __init__(self, prefix='gesture', buckets=DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._stages = {}
+
+    def inc(self, name, amount=1, **labels):
+        """Add amount to a counter; keyword arguments become Prometheus labels"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        """Set a gauge to value; keyword arguments become Prometheus labels"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, stage, seconds):
+        """Record one latency sample for a stage"""
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def counter(self, name, **labels):
+        with self._lock:
+            return self._counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def snapshot(self):
+        """
+        Current values as plain data
+
+        Returns:
+            {'counters': {'name' or 'name{label="v"}': value},
+             'gauges': {'name' or 'name{label="v"}': value},
+             'stages': {stage: {'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms'}}}
+        """
+        with self._lock:
+            counters = {_format_key(name, labels): value for (name, labels), value in self._counters.items()}
+            gauges = {_format_key(name, labels): value for (name, labels), value in self._gauges.items()}
+            stages = {}
+            for stage, histogram in self._stages.items():
+                stages[stage] = {
+                    'count': histogram.count,
+                    'mean_ms': histogram.sum / histogram.count * 1000 if histogram.count else 0.0,
+                    'p50_ms': histogram.quantile(0.50) * 1000,
+                    'p95_ms': histogram.quantile(0.95) * 1000,
+                    'p99_ms': histogram.quantile(0.99) * 1000,
+                }
+        return {'counters': counters, 'gauges': gauges, 'stages': stages}
+
+    def render_prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            names = sorted({name for name, _ in self._counters})
+            for name in names:
+                metric = f"{self.prefix}_{name}"
+                if name in COUNTER_HELP:
+                    lines.append(f"# HELP {metric} {COUNTER_HELP[name]}")
+                lines.append(f"# TYPE {metric} counter")
+                for (counter_name, labels), value in sorted(self._counters.items()):
+                    if counter_name == name:
+                        lines.append(f"{_format_key(metric, labels)} {value}")
+
+            for name in sorted({name for name, _ in self._gauges}):
+                metric = f"{self.prefix}_{name}"
+                if name in GAUGE_HELP:
+                    lines.append(f"# HELP {metric} {GAUGE_HELP[name]}")
+                lines.append(f"# TYPE {metric} gauge")
+                for (gauge_name, labels), value in sorted(self._gauges.items()):
+                    if gauge_name == name:
+                        lines.append(f"{_format_key(metric, labels)} {value}")
+
+            if self._stages:
+                metric = f"{self.prefix}_stage_seconds"
+                lines.append(f"# HELP {metric} Detector loop stage latency")
+                lines.append(f"# TYPE {metric} histogram")
+                for stage, histogram in sorted(self._stages.items()):
+                    cumulative = 0
+                    for bound, bucket_count in zip(list(histogram.bounds) + ['+Inf'], histogram.counts):
+                        cumulative += bucket_count
+                        lines.append(f'{metric}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                    lines.append(f'{metric}_sum{{stage="{stage}"}} {histogram.sum}')
+                    lines.append(f'{metric}_count{{stage="{stage}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def print_summary(self):
+        snapshot = self.snapshot()
+        print("\nMetrics:")
+        for name, value in sorted(snapshot['counters'].items()):
+            print(f"  {name}: {value}")
+        for name, value in sorted(snapshot['gauges'].items()):
+            print(f"  {name}: {value:g}")
+        for stage, stats in sorted(snapshot['stages'].items()):
+            print(f"  {stage:>10}: n={stats['count']:<7} mean={stats['mean_ms']:.2f}ms "
+                  f"p50={stats['p50_ms']:.2f}ms p95={stats['p95_ms']:.2f}ms p99={stats['p99_ms']:.2f}ms")
+
+
+def _format_key(name, labels):
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+def start_metrics_server(metrics, port=9108, host='127.0.0.1'):
+    """
+    Serve /metrics (Prometheus text) and /metrics.json (snapshot) on a daemon thread
+
+    Binds to localhost by default; the endpoint is meant for a local scraper.
+
+    Returns:
+        The running ThreadingHTTPServer (call shutdown() to stop it)
+    """
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/metrics':
+                body = metrics.render_prometheus().encode()
+                content_type = 'text/plain; version=0.0.4; charset=utf-8'
+            elif self.path == '/metrics.json':
+                body = json.dumps(metrics.snapshot(), indent=2).encode()
+                content_type = 'application/json'
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Keep scrapes out of the detector's console output
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='gesture-metrics', daemon=True).start()
+    print(f"Metrics endpoint: http://{host}:{port}/metrics")
+    return server
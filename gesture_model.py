@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Learned Gesture Classifier
+Softmax (multinomial logistic regression) classifier over normalized hand
+landmarks, trained from the labelled CSVs / sample stores collected with
+train_thumbs_up.py and saved as a small versioned .npz model file
+
+Pure NumPy: prediction is one normalization and one small matrix multiply
+per batch, so per-hand cost stays in the microseconds.
+
+Usage:
+    python3 gesture_model.py train thumbs_up_training_data.csv more_samples/ --output gesture_model.npz
+    python3 test_hand_gestures.py --classifier model --model gesture_model.npz
+"""
+
+import os
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from gesture_classifier import GESTURE_LABELS, NO_GESTURE
+from gesture_dataset import normalize_landmarks
+
+MODEL_FORMAT_VERSION = 1
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gesture_model.npz')
+
+# Training label meaning "no gesture"
+NONE_LABEL = 'NONE'
+
+
+def landmark_features(landmarks):
+    """(N, 21, 3) landmarks -> (N, 60) features (normalized, wrist dropped since it is always 0)"""
+    landmarks = np.asarray(landmarks, dtype=np.float32)
+    if landmarks.ndim == 2:
+        landmarks = landmarks[np.newaxis]
+    return normalize_landmarks(landmarks)[:, 1:, :].reshape(len(landmarks), -1)
+
+
+class GestureModel:
+    """Softmax classifier over normalized landmark features"""
+
+    def __init__(self, labels, mean, std, weights, bias, min_confidence=0.5):
+        """
+        Args:
+            labels: Class names; column k of weights scores labels[k]
+            mean, std: (D,) feature standardization
+            weights: (D, K) weight matrix
+            bias: (K,) bias vector
+            min_confidence: Predictions below this probability become no gesture
+        """
+        self.labels = tuple(labels)
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.std = np.asarray(std, dtype=np.float32)
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.min_confidence = float(min_confidence)
+
+        # Fold standardization into the weights: ((x - mean) / std) @ W + b == x @ W' + b'
+        self._folded_weights = self.weights / self.std[:, np.newaxis]
+        self._folded_bias = self.bias - (self.mean / self.std) @ self.weights
+
+        # Map classes to gesture_classifier codes so the model is a drop-in
+        # replacement for classify_codes (unknown labels and NONE -> NO_GESTURE)
+        self._class_codes = np.array(
+            [GESTURE_LABELS.index(label) if label in GESTURE_LABELS else NO_GESTURE for label in self.labels]
+            + [NO_GESTURE], dtype=np.int8)
+        self._label_names = np.array(
+            [None if label == NONE_LABEL else label for label in self.labels] + [None], dtype=object)
+
+    def predict_proba(self, landmarks):
+        """(N, 21, 3) landmarks -> (N, K) class probabilities"""
+        logits = landmark_features(landmarks) @ self._folded_weights + self._folded_bias
+        logits -= logits.max(axis=1, keepdims=True)
+        np.exp(logits, out=logits)
+        logits /= logits.sum(axis=1, keepdims=True)
+        return logits
+
+    def predict_indices(self, landmarks):
+        """Class index per hand, or K (one past the last class) below min_confidence"""
+        proba = self.predict_proba(landmarks)
+        best = proba.argmax(axis=1)
+        best[proba[np.arange(len(best)), best] < self.min_confidence] = len(self.labels)
+        return best
+
+    def predict_labels_with_confidence(self, landmarks):
+        """predict_labels plus the winning class probability per hand"""
+        proba = self.predict_proba(landmarks)
+        best = proba.argmax(axis=1)
+        confidence = proba[np.arange(len(best)), best]
+        best[confidence < self.min_confidence] = len(self.labels)
+        return self._label_names[best].tolist(), confidence.tolist()
+
+    def predict_codes(self, landmarks):
+        """Same contract as gesture_classifier.classify_codes"""
+        return self._class_codes[self.predict_indices(landmarks)]
+
+    def predict_labels(self, landmarks):
+        """Same contract as gesture_classifier.classify_batch: a label (or None) per hand"""
+        return self._label_names[self.predict_indices(landmarks)].tolist()
+
+    def save(self, path):
+        np.savez(path, version=MODEL_FORMAT_VERSION, labels=np.array(self.labels),
+                 mean=self.mean, std=self.std, weights=self.weights, bias=self.bias,
+                 min_confidence=self.min_confidence)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            version = int(data['version'])
+            if version != MODEL_FORMAT_VERSION:
+                raise ValueError(f"{path}: unsupported model version {version} (expected {MODEL_FORMAT_VERSION})")
+            return cls(data['labels'].tolist(), data['mean'], data['std'], data['weights'],
+                       data['bias'], float(data['min_confidence']))
+
+    @classmethod
+    def fit(cls, landmarks, labels, epochs=200, learning_rate=0.1, l2=1e-4, batch_size=4096,
+            min_confidence=0.5, seed=0):
+        """
+        Train with mini-batch gradient descent on the softmax cross-entropy
+
+        Args:
+            landmarks: (N, 21, 3) training landmarks (raw image coordinates)
+            labels: N label strings ('NONE' for negative samples)
+        """
+        classes = sorted(set(labels))
+        class_index = {label: k for k, label in enumerate(classes)}
+        y = np.fromiter((class_index[label] for label in labels), dtype=np.int64, count=len(labels))
+
+        x = landmark_features(landmarks)
+        mean = x.mean(axis=0)
+        std = x.std(axis=0) + 1e-6
+        x = (x - mean) / std
+
+        rng = np.random.default_rng(seed)
+        weights = np.zeros((x.shape[1], len(classes)), dtype=np.float32)
+        bias = np.zeros(len(classes), dtype=np.float32)
+
+        for _ in range(epochs):
+            order = rng.permutation(len(x))
+            for start in range(0, len(x), batch_size):
+                batch = order[start:start + batch_size]
+                xb = x[batch]
+                logits = xb @ weights + bias
+                logits -= logits.max(axis=1, keepdims=True)
+                proba = np.exp(logits)
+                proba /= proba.sum(axis=1, keepdims=True)
+                proba[np.arange(len(batch)), y[batch]] -= 1.0
+                proba /= len(batch)
+                weights -= learning_rate * (xb.T @ proba + l2 * weights)
+                bias -= learning_rate * proba.sum(axis=0)
+
+        return cls(classes, mean, std, weights, bias, min_confidence)
+
+
+def load_training_data(paths):
+    """Load labelled samples from CSV files and/or sample store directories"""
+    from evaluate_gestures import iter_sources
+
+    labels = []
+    chunks = []
+    for chunk_labels, landmarks in iter_sources(paths):
+        labels.extend(chunk_labels)
+        chunks.append(np.asarray(landmarks, dtype=np.float32))
+    if not chunks:
+        raise ValueError("No training samples found")
+    return labels, np.concatenate(chunks)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Train the learned gesture classifier')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    p = subparsers.add_parser('train', help='Fit a model on labelled landmark CSVs / sample stores')
+    p.add_argument('paths', nargs='+', help='Labelled landmark CSV files or sample store directories')
+    p.add_argument('--output', default=DEFAULT_MODEL_PATH, help=f'Model file (default: {DEFAULT_MODEL_PATH})')
+    p.add_argument('--epochs', type=int, default=200, help='Training epochs (default: 200)')
+    p.add_argument('--learning-rate', type=float, default=0.1, help='Learning rate (default: 0.1)')
+    p.add_argument('--min-confidence', type=float, default=0.5,
+                   help='Probability below which a prediction counts as no gesture (default: 0.5)')
+    p.add_argument('--holdout', type=float, default=0.2,
+                   help='Fraction of samples held out for evaluation (default: 0.2)')
+
+    args = parser.parse_args()
+
+    from evaluate_gestures import evaluate_chunks
+
+    labels, landmarks = load_training_data(args.paths)
+    counts = Counter(labels)
+    print(f"Loaded {len(labels)} samples: " + ", ".join(f"{k}={counts[k]}" for k in sorted(counts)))
+    if len(counts) < 2:
+        print("WARNING: only one label in the training data - the model can only predict that "
+              "label (or no gesture). Collect NONE and other gesture samples too.")
+
+    rng = np.random.default_rng(0)
+    order = rng.permutation(len(labels))
+    n_holdout = int(len(labels) * args.holdout)
+    test_idx, train_idx = order[:n_holdout], order[n_holdout:]
+
+    start = time.perf_counter()
+    model = GestureModel.fit(landmarks[train_idx], [labels[i] for i in train_idx],
+                             epochs=args.epochs, learning_rate=args.learning_rate,
+                             min_confidence=args.min_confidence)
+    print(f"Trained on {len(train_idx)} samples in {time.perf_counter() - start:.2f}s")
+
+    if n_holdout:
+        report = evaluate_chunks([([labels[i] for i in test_idx], landmarks[test_idx])],
+                                 classify=model.predict_codes)
+        print(f"Holdout ({n_holdout} samples):")
+        report.print_report()
+
+    model.save(args.output)
+    print(f"Model saved to: {args.output} ({os.path.getsize(args.output)} bytes)")
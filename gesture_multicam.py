@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Multi-Camera Gesture Detection
+Runs hand landmark detection for several cameras on a pool of worker
+processes, sidestepping the GIL, and merges every camera's gesture events
+into one stream tagged with the camera id and capture timestamp
+
+The parent process captures each camera on its own thread straight into a
+shared-memory ring buffer, so frames reach the workers without pickling.
+Each ring slot is guarded by a sequence number (a seqlock): a worker copies
+the newest slot and discards the copy if the capture thread overwrote it
+meanwhile. Workers only ever take the newest frame, so a slow worker drops
+frames instead of falling behind.
+
+Usage:
+    python3 gesture_multicam.py /dev/elp_1 /dev/elp_2 /dev/elp_3
+    python3 gesture_multicam.py /dev/elp_1 /dev/elp_2 --workers 1 --debounce --sink tcp://127.0.0.1:5005
+"""
+
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Ring header layout (float64): [latest_seq, frames_processed, then (seq, capture_time) per slot]
+_LATEST = 0
+_PROCESSED = 1
+_SLOTS_OFFSET = 2
+
+
+class SharedFrameRing:
+    """
+    Fixed-size ring of frames in shared memory, one writer and any number of readers
+
+    Create it in the capture process with create=True and attach to it by
+    name in the workers.
+    """
+
+    def __init__(self, name=None, shape=None, slots=4, create=False):
+        """
+        Args:
+            name: Shared memory block name (required when attaching)
+            shape: Frame shape, e.g. (1080, 1920, 3); frames are uint8
+            slots: Number of frames the ring holds
+            create: Allocate a new block instead of attaching to an existing one
+        """
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.frame_bytes = int(np.prod(self.shape))
+        header_bytes = (_SLOTS_OFFSET + 2 * slots) * 8
+        size = header_bytes + slots * self.frame_bytes
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+        self.name = self.shm.name
+        self._owner = create
+
+        self.header = np.ndarray((_SLOTS_OFFSET + 2 * slots,), dtype=np.float64, buffer=self.shm.buf)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=self.shm.buf,
+                                 offset=header_bytes)
+        if create:
+            self.header[:] = 0
+        self._seq = int(self.header[_LATEST])
+
+    def spec(self):
+        """Picklable arguments for attaching to this ring from another process"""
+        return {'name': self.name, 'shape': self.shape, 'slots': self.slots}
+
+    def begin_write(self):
+        """Return the frame buffer of the next slot, marked as being written"""
+        slot = (self._seq + 1) % self.slots
+        self.header[_SLOTS_OFFSET + 2 * slot] = -1
+        return self.frames[slot]
+
+    def end_write(self, capture_time):
+        """Publish the slot returned by begin_write"""
+        self._seq += 1
+        slot = self._seq % self.slots
+        base = _SLOTS_OFFSET + 2 * slot
+        self.header[base + 1] = capture_time
+        self.header[base] = self._seq
+        self.header[_LATEST] = self._seq
+
+    @property
+    def latest_seq(self):
+        return int(self.header[_LATEST])
+
+    def read_latest(self, out):
+        """
+        Copy the newest frame into out
+
+        Returns:
+            (seq, capture_time), or None if no frame is published yet or the
+            slot was overwritten during the copy
+        """
+        seq = int(self.header[_LATEST])
+        if seq <= 0:
+            return None
+        base = _SLOTS_OFFSET + 2 * (seq % self.slots)
+        if int(self.header[base]) != seq:
+            return None
+        capture_time = float(self.header[base + 1])
+        np.copyto(out, self.frames[seq % self.slots])
+        if int(self.header[base]) != seq:
+            return None
+        return seq, capture_time
+
+    def add_processed(self, count=1):
+        # Only the single worker serving this ring writes this field
+        self.header[_PROCESSED] += count
+
+    @property
+    def processed(self):
+        return int(self.header[_PROCESSED])
+
+    def close(self):
+        # Drop numpy views first; SharedMemory.close() fails while buffers are exported
+        del self.header, self.frames
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+def open_device(device):
+    """
+    Open exactly one camera: a numeric index or a device path / video file
+
+    Unlike HandGestureDetector.open_camera there is no fallback to other
+    devices, which would make several cameras silently share one device.
+    """
+    import cv2
+
+    if isinstance(device, str) and device.isdigit():
+        device = int(device)
+    elif isinstance(device, str) and os.path.islink(device):
+        target = os.path.realpath(device)
+        if target.startswith('/dev/video'):
+            device = int(target[len('/dev/video'):])
+    cap = cv2.VideoCapture(device)
+    if not cap.isOpened():
+        cap.release()
+        return None
+    return cap
+
+
+def _worker_main(worker_id, cameras, detector_options, debounce, results, ready, stop):
+    """
+    Worker process: one HandGestureDetector per assigned camera
+
+    Args:
+        cameras: List of (camera_id, ring spec) served by this worker
+        detector_options: HandGestureDetector keyword arguments
+        debounce: Passed to HandGestureDetector.configure_events
+        results: multiprocessing.Queue receiving event dicts
+        ready: multiprocessing.Event set by capture threads when any of this
+               worker's cameras has a new frame
+        stop: multiprocessing.Event that ends the worker
+    """
+    from gesture_sinks import CallbackSink
+    from test_hand_gestures import HandGestureDetector
+
+    served = []
+    try:
+        for camera_id, spec in cameras:
+            ring = SharedFrameRing(**spec)
+            detector = HandGestureDetector(camera_device=camera_id, **detector_options)
+
+            def forward(event, camera_id=camera_id):
+                event.camera = camera_id
+                results.put(event.to_dict())
+
+            detector.configure_events(CallbackSink(forward), debounce)
+            served.append((camera_id, ring, detector, np.empty(ring.shape, dtype=np.uint8), [0]))
+        results.put({'kind': 'ready', 'worker': worker_id})
+
+        while not stop.is_set():
+            if not ready.wait(0.1):
+                continue
+            # Clear before scanning so a frame published during the scan sets it again
+            ready.clear()
+            for camera_id, ring, detector, frame, last_seq in served:
+                if ring.latest_seq == last_seq[0]:
+                    continue
+                read = ring.read_latest(frame)
+                if read is None:
+                    # Torn read: try again on the next wake-up
+                    ready.set()
+                    continue
+                last_seq[0], capture_time = read
+                _, detection_result = detector.process_frame(frame, timestamp_ms=capture_time * 1000)
+                detector.emit_detection(detection_result, last_seq[0], timestamp=capture_time)
+                ring.add_processed()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for camera_id, ring, detector, _, _ in served:
+            detector.flush_events()
+            detector.hand_landmarker.close()
+            ring.close()
+        results.put({'kind': 'stopped', 'worker': worker_id})
+
+
+class MultiCameraRunner:
+    """Capture threads + shared-memory rings + landmarker worker processes"""
+
+    def __init__(self, camera_devices, workers=None, detector_options=None, debounce=None, ring_slots=4,
+                 start_method='spawn'):
+        """
+        Args:
+            camera_devices: Camera device paths/indices (or video files); each
+                            device string doubles as its camera id in events
+            workers: Number of worker processes (default: one per camera,
+                     capped at the CPU count); cameras are assigned round-robin
+            detector_options: HandGestureDetector keyword arguments for every camera
+            debounce: Debounce setting for HandGestureDetector.configure_events
+            ring_slots: Frames per camera ring buffer
+            start_method: multiprocessing start method ('spawn' avoids forking
+                          MediaPipe's threads)
+        """
+        self.camera_devices = [str(device) for device in camera_devices]
+        self.workers = max(1, min(workers or os.cpu_count() or 1, len(self.camera_devices)))
+        self.detector_options = dict(detector_options or {})
+        self.debounce = debounce
+        self.ring_slots = ring_slots
+        self._ctx = multiprocessing.get_context(start_method)
+
+        self.results = self._ctx.Queue()
+        self._stop = self._ctx.Event()
+        self._capture_stop = threading.Event()
+        self._ready = []
+        self._caps = []
+        self._rings = []
+        self._processes = []
+        self._threads = []
+        self.frames_captured = {}
+        self.frames_processed = {}
+
+    def start(self, startup_timeout=60.0):
+        """Open every camera, allocate the rings and start workers and capture threads"""
+        for device in self.camera_devices:
+            cap = open_device(device)
+            if cap is None:
+                self.close()
+                raise RuntimeError(f"Could not open camera: {device}")
+            ret, frame = cap.read()
+            if not ret:
+                cap.release()
+                self.close()
+                raise RuntimeError(f"Could not read a frame from camera: {device}")
+            self._caps.append(cap)
+            self._rings.append(SharedFrameRing(shape=frame.shape, slots=self.ring_slots, create=True))
+            self.frames_captured[device] = 0
+
+        assignments = [[] for _ in range(self.workers)]
+        for index, (device, ring) in enumerate(zip(self.camera_devices, self._rings)):
+            assignments[index % self.workers].append((device, ring.spec()))
+
+        for worker_id, cameras in enumerate(assignments):
+            ready = self._ctx.Event()
+            self._ready.append(ready)
+            process = self._ctx.Process(
+                target=_worker_main, name=f'gesture-worker-{worker_id}', daemon=True,
+                args=(worker_id, cameras, self.detector_options, self.debounce, self.results, ready, self._stop))
+            process.start()
+            self._processes.append(process)
+
+        # Loading MediaPipe in a fresh process takes a while; start capturing
+        # only once every landmarker is ready so no frames are wasted
+        waiting = self.workers
+        deadline = time.monotonic() + startup_timeout
+        while waiting:
+            try:
+                message = self.results.get(timeout=0.5)
+            except queue.Empty:
+                if time.monotonic() > deadline or not all(p.is_alive() for p in self._processes):
+                    self.close()
+                    raise RuntimeError("Gesture workers failed to start")
+                continue
+            if message['kind'] == 'ready':
+                waiting -= 1
+
+        for index, device in enumerate(self.camera_devices):
+            thread = threading.Thread(target=self._capture_loop, name=f'gesture-capture-{device}', daemon=True,
+                                      args=(device, self._caps[index], self._rings[index],
+                                            self._ready[index % self.workers]))
+            thread.start()
+            self._threads.append(thread)
+
+    def _capture_loop(self, device, cap, ring, ready):
+        while not self._capture_stop.is_set():
+            buffer = ring.begin_write()
+            # Decode straight into shared memory when the driver honours the output buffer
+            ret, frame = cap.read(buffer)
+            capture_time = time.time()
+            if not ret:
+                print(f"Camera {device}: failed to read frame")
+                break
+            if frame is not buffer:
+                np.copyto(buffer, frame)
+            ring.end_write(capture_time)
+            self.frames_captured[device] += 1
+            ready.set()
+
+    def events(self, timeout=0.5):
+        """
+        Yield merged GestureEvents from all cameras until every capture thread has stopped
+
+        Also returns when interrupted; call close() afterwards.
+        """
+        from gesture_sinks import GestureEvent
+
+        while True:
+            try:
+                message = self.results.get(timeout=timeout)
+            except queue.Empty:
+                if not any(thread.is_alive() for thread in self._threads):
+                    return
+                if not any(process.is_alive() for process in self._processes):
+                    print("All gesture workers exited")
+                    return
+                continue
+            if message['kind'] in ('ready', 'stopped'):
+                continue
+            yield GestureEvent(**message)
+
+    def drain(self, timeout=0.1):
+        """After close(): yield events still queued, such as the end events workers flush on shutdown"""
+        from gesture_sinks import GestureEvent
+
+        while True:
+            try:
+                message = self.results.get(timeout=timeout)
+            except queue.Empty:
+                return
+            if message['kind'] not in ('ready', 'stopped'):
+                yield GestureEvent(**message)
+
+    def stats(self):
+        """Per-camera captured/processed frame counts"""
+        for device, ring in zip(self.camera_devices, self._rings):
+            self.frames_processed[device] = ring.processed
+        return {device: {'captured': self.frames_captured.get(device, 0),
+                         'processed': self.frames_processed.get(device, 0)}
+                for device in self.camera_devices}
+
+    def close(self, timeout=5.0):
+        """Stop capture and workers and release cameras and shared memory"""
+        self._capture_stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._stop.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self.stats()
+        for cap in self._caps:
+            cap.release()
+        for ring in self._rings:
+            ring.close()
+        self._threads, self._processes, self._caps, self._rings = [], [], [], []
+
+
+if __name__ == "__main__":
+    import argparse
+    import contextlib
+
+    parser = argparse.ArgumentParser(description='Hand gesture detection on several cameras')
+    parser.add_argument('cameras', nargs='+', help='Camera device paths or indices (or video files)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes (default: one per camera, at most one per core)')
+    parser.add_argument('--running-mode', default='video', choices=['image', 'video', 'live_stream'],
+                        help='Landmarker running mode (default: video)')
+    parser.add_argument('--inference-size', default=None,
+                        help='Downscale frames to fit WIDTHxHEIGHT before detection (e.g. 640x360)')
+    parser.add_argument('--classifier', default='rules', choices=['rules', 'model'],
+                        help='Gesture classifier (default: rules)')
+    parser.add_argument('--model', default=None, help='Learned model file for --classifier model')
+    parser.add_argument('--num-hands', type=int, default=1, help='Maximum hands per camera (default: 1)')
+    parser.add_argument('--debounce', action='store_true',
+                        help='Send debounced start/hold/end events instead of every label change')
+    parser.add_argument('--sink', default='stdout',
+                        help='Event sink: stdout (JSON lines), none or tcp://HOST:PORT (default: stdout)')
+
+    args = parser.parse_args()
+
+    from gesture_sinks import create_sink
+
+    sink = create_sink(args.sink)
+    options = {'running_mode': args.running_mode, 'classifier': args.classifier, 'model_path': args.model,
+               'num_hands': args.num_hands}
+    if args.inference_size:
+        from test_hand_gestures import parse_size
+        options['inference_size'] = parse_size(args.inference_size)
+
+    # stdout carries the event stream, so status messages go to stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        runner = MultiCameraRunner(args.cameras, workers=args.workers, detector_options=options,
+                                   debounce=args.debounce or None)
+        runner.start()
+        print(f"Running {len(args.cameras)} cameras on {runner.workers} worker process(es)")
+        try:
+            for event in runner.events():
+                sink.emit(event)
+        except KeyboardInterrupt:
+            print("\nInterrupted by user")
+        finally:
+            runner.close()
+            # Workers flush held gestures on shutdown; pass those end events on too
+            for event in runner.drain():
+                sink.emit(event)
+            sink.close()
+            for device, counts in runner.stats().items():
+                print(f"{device}: captured={counts['captured']} processed={counts['processed']}")
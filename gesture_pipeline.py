@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Threaded capture/inference pipeline for HandGestureDetector
+Capture, inference and rendering run as separate stages connected by bounded
+queues. Frames are never queued behind a slow stage: the capture stage keeps
+only the newest frame (latest frame wins), and stale frames are dropped and
+counted, so end-to-end gesture latency stays bounded under load.
+"""
+
+import queue
+import threading
+import time
+
+
+class LatestFrameSlot:
+    """
+    Single-slot buffer between capture and inference
+
+    Putting a new frame replaces any frame the consumer has not picked up yet;
+    each replaced frame is counted in `dropped`.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self.dropped = 0
+
+    def put(self, item):
+        """Store item, returning True if an unconsumed frame was replaced"""
+        with self._cond:
+            replaced = self._item is not None
+            if replaced:
+                self.dropped += 1
+            self._item = item
+            self._cond.notify()
+            return replaced
+
+    def get(self, timeout=None):
+        """Return the newest item, or None if nothing arrived within timeout"""
+        with self._cond:
+            if self._item is None:
+                self._cond.wait(timeout)
+            item, self._item = self._item, None
+            return item
+
+
+def put_drop_oldest(q, item):
+    """
+    Put item on a bounded queue, discarding the oldest entry when full
+
+    Returns:
+        Number of entries discarded (0 or 1)
+    """
+    dropped = 0
+    while True:
+        try:
+            q.put_nowait(item)
+            return dropped
+        except queue.Full:
+            try:
+                q.get_nowait()
+                dropped += 1
+            except queue.Empty:
+                pass
+
+
+class PipelineResult:
+    """Output of the inference stage for one frame"""
+
+    __slots__ = ('frame_id', 'capture_time', 'frame', 'detection_result')
+
+    def __init__(self, frame_id, capture_time, frame, detection_result):
+        self.frame_id = frame_id
+        self.capture_time = capture_time
+        self.frame = frame
+        self.detection_result = detection_result
+
+    @property
+    def age(self):
+        """Seconds since the frame was captured"""
+        return time.monotonic() - self.capture_time
+
+
+class FramePipeline:
+    """
+    Capture thread -> latest-frame slot -> inference thread -> bounded result queue
+
+    The render/event stage (usually the main thread, since cv2.imshow must run
+    there on most platforms) pulls results with get_result(). If a worker
+    thread raises, the pipeline stops and get_result()/is_running() re-raise
+    the exception on the caller's thread.
+    """
+
+    def __init__(self, detector, cap, result_queue_size=2, max_frame_age=0.5):
+        """
+        Args:
+            detector: HandGestureDetector providing process_frame()
+            cap: Opened cv2.VideoCapture
+            result_queue_size: Capacity of the inference -> render queue
+            max_frame_age: Frames older than this many seconds when inference
+                           picks them up are dropped as stale
+        """
+        self.detector = detector
+        self.cap = cap
+        self.metrics = getattr(detector, 'metrics', None)
+        self.max_frame_age = max_frame_age
+
+        self._slot = LatestFrameSlot()
+        self._results = queue.Queue(maxsize=result_queue_size)
+        self._stop = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+
+        self.frames_captured = 0
+        self.frames_processed = 0
+        self.dropped_stale = 0
+        self.dropped_render = 0
+        self.capture_failed = False
+        # First exception raised by a worker thread
+        self.error = None
+
+    def start(self):
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._run_stage, args=(self._capture_loop,), name='gesture-capture',
+                             daemon=True),
+            threading.Thread(target=self._run_stage, args=(self._inference_loop,), name='gesture-inference',
+                             daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout=2.0):
+        """
+        Signal the worker threads to stop and wait for them
+
+        Returns:
+            True if every thread has exited; threads still running after
+            timeout are kept, so stop() can be called again
+        """
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        return not self._threads
+
+    def is_running(self):
+        """False once stopped; raises the worker thread's exception if one failed"""
+        self._raise_error()
+        return not self._stop.is_set()
+
+    def get_result(self, timeout=None):
+        """
+        Return the next PipelineResult, or None on timeout
+
+        Results finished before a worker thread failed are still returned;
+        after that the worker's exception is raised.
+        """
+        try:
+            return self._results.get(timeout=timeout)
+        except queue.Empty:
+            self._raise_error()
+            return None
+
+    def _raise_error(self):
+        if self.error is not None:
+            raise self.error
+
+    def _run_stage(self, loop):
+        """Run a worker loop; an exception stops the pipeline instead of silently killing the thread"""
+        try:
+            loop()
+        except Exception as e:
+            with self._lock:
+                if self.error is None:
+                    self.error = e
+            self._stop.set()
+
+    def stats(self):
+        """Snapshot of pipeline counters"""
+        with self._lock:
+            return {
+                'frames_captured': self.frames_captured,
+                'frames_processed': self.frames_processed,
+                'dropped_capture': self._slot.dropped,
+                'dropped_stale': self.dropped_stale,
+                'dropped_render': self.dropped_render,
+                'result_queue_depth': self._results.qsize(),
+            }
+
+    def _capture_loop(self):
+        frame_id = 0
+        metrics = self.metrics
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            ret, frame = self.cap.read()
+            if not ret:
+                self.capture_failed = True
+                self._stop.set()
+                break
+            frame_id += 1
+            with self._lock:
+                self.frames_captured += 1
+            replaced = self._slot.put((frame_id, time.monotonic(), frame))
+            if metrics is not None:
+                metrics.inc('frames_captured_total')
+                metrics.observe('capture', time.perf_counter() - start)
+                if replaced:
+                    metrics.inc('frames_dropped_total', reason='overwritten')
+
+    def _inference_loop(self):
+        while not self._stop.is_set():
+            item = self._slot.get(timeout=0.1)
+            if item is None:
+                continue
+            frame_id, capture_time, frame = item
+
+            if time.monotonic() - capture_time > self.max_frame_age:
+                with self._lock:
+                    self.dropped_stale += 1
+                if self.metrics is not None:
+                    self.metrics.inc('frames_dropped_total', reason='stale')
+                continue
+
+            frame, detection_result = self.detector.process_frame(frame)
+            result = PipelineResult(frame_id, capture_time, frame, detection_result)
+            dropped = put_drop_oldest(self._results, result)
+            with self._lock:
+                self.frames_processed += 1
+                self.dropped_render += dropped
+            if dropped and self.metrics is not None:
+                self.metrics.inc('frames_dropped_total', dropped, reason='render_queue')
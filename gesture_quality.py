@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Adaptive Quality Controller
+Keeps per-frame gesture latency inside a budget when the host gets busy (for
+example encoding the stream on the same machine) by stepping through quality
+tiers instead of letting latency grow
+
+Each tier sets the inference resolution, how many frames are skipped between
+inferences, the landmarker confidence thresholds and whether the GUI overlay
+is drawn. The controller averages per-frame latency over a window of frames:
+a window over budget steps one tier down; windows with clear headroom step
+back up. An upgrade that goes straight back over budget doubles the number of
+good windows the next upgrade needs, so a host that sits right at the edge
+does not flip between two tiers every second.
+
+Tier changes and the reasons for them are kept in `decisions`, returned by
+stats() and, with metrics on, exported as gauges and counters.
+
+Usage:
+    python3 test_hand_gestures.py --latency-budget 40
+    python3 benchmark_gestures.py quality --video clip.mp4 --budget-ms 40
+"""
+
+import time
+from collections import deque, namedtuple
+
+QualityTier = namedtuple('QualityTier', [
+    'name',
+    'inference_size',  # (width, height) box to fit, or None for the detector's own setting
+    'frame_skip',  # Run inference on one frame out of this many
+    'detection_confidence',
+    'presence_confidence',
+    'tracking_confidence',
+    'overlay',  # Draw skeletons and labels on the GUI preview
+])
+
+# Best first. Lower presence/tracking thresholds let VIDEO and LIVE_STREAM
+# modes keep tracking a hand instead of re-running palm detection.
+DEFAULT_TIERS = (
+    QualityTier('full', None, 1, 0.7, 0.5, 0.5, True),
+    QualityTier('balanced', (960, 540), 1, 0.7, 0.5, 0.5, True),
+    QualityTier('fast', (640, 360), 1, 0.7, 0.4, 0.4, False),
+    QualityTier('low', (480, 270), 2, 0.7, 0.3, 0.3, False),
+    QualityTier('minimal', (320, 180), 3, 0.7, 0.3, 0.3, False),
+)
+
+# Limit on the doubling of good windows an upgrade needs
+MAX_RECOVER_WINDOWS = 64
+
+
+class QualityController:
+    """Steps HandGestureDetector through quality tiers to hold a latency budget"""
+
+    def __init__(self, budget_ms=40.0, tiers=DEFAULT_TIERS, window=30, headroom=0.7, recover_windows=3,
+                 settle_frames=5, metrics=None, max_decisions=100):
+        """
+        Args:
+            budget_ms: Target mean per-frame latency in milliseconds
+            tiers: QualityTiers from best to cheapest
+            window: Frames averaged per decision
+            headroom: Step up only while the window mean is below this
+                      fraction of the budget
+            recover_windows: Consecutive windows with headroom before stepping up
+            settle_frames: Frames ignored after a change (a new landmarker's
+                           first inference is slow)
+            metrics: gesture_metrics.Metrics to export the tier and decisions to
+            max_decisions: Decisions kept in the log
+        """
+        if not tiers:
+            raise ValueError("QualityController needs at least one tier")
+        self.budget = budget_ms / 1000
+        self.tiers = tuple(tiers)
+        self.window = window
+        self.headroom = headroom
+        self.recover_windows = recover_windows
+        self.settle_frames = settle_frames
+        self.metrics = metrics
+
+        self.tier_index = 0
+        self.decisions = deque(maxlen=max_decisions)
+        self.upgrades = 0
+        self.downgrades = 0
+        self.last_mean = None
+
+        self._frames = 0
+        self._settle = 0
+        self._sum = 0.0
+        self._count = 0
+        self._good_windows = 0
+        self._required_windows = recover_windows
+        # True for the first window after an upgrade
+        self._probation = False
+        self._export()
+
+    @property
+    def tier(self):
+        return self.tiers[self.tier_index]
+
+    def should_detect(self):
+        """True if this frame gets inference under the current tier's frame skip"""
+        self._frames += 1
+        return self._frames % self.tier.frame_skip == 0
+
+    def observe(self, seconds, now=None):
+        """
+        Record one frame's latency, changing tier at the end of a window if needed
+
+        Returns:
+            The new QualityTier if the tier changed, otherwise None
+        """
+        if self._settle:
+            self._settle -= 1
+            return None
+        self._sum += seconds
+        self._count += 1
+        if self._count < self.window:
+            return None
+
+        mean = self._sum / self._count
+        self.last_mean = mean
+        self._sum = 0.0
+        self._count = 0
+        self._export()
+        now = time.time() if now is None else now
+
+        if mean > self.budget:
+            self._good_windows = 0
+            if self._probation:
+                # The better tier does not fit: wait longer before trying it again
+                self._required_windows = min(self._required_windows * 2, MAX_RECOVER_WINDOWS)
+            self._probation = False
+            if self.tier_index + 1 < len(self.tiers):
+                return self._change(self.tier_index + 1, mean, now)
+            return None
+
+        if self._probation:
+            self._probation = False
+            self._required_windows = self.recover_windows
+        if mean < self.budget * self.headroom and self.tier_index > 0:
+            self._good_windows += 1
+            if self._good_windows >= self._required_windows:
+                self._good_windows = 0
+                self._probation = True
+                return self._change(self.tier_index - 1, mean, now)
+        else:
+            self._good_windows = 0
+        return None
+
+    def _change(self, index, mean, now):
+        previous = self.tier
+        direction = 'down' if index > self.tier_index else 'up'
+        self.tier_index = index
+        self._settle = self.settle_frames
+        if direction == 'down':
+            self.downgrades += 1
+            reason = f"mean {mean * 1000:.1f} ms over {self.budget * 1000:g} ms budget"
+        else:
+            self.upgrades += 1
+            reason = f"mean {mean * 1000:.1f} ms below {self.budget * self.headroom * 1000:.1f} ms headroom"
+        self.decisions.append({
+            'time': now,
+            'from': previous.name,
+            'to': self.tier.name,
+            'direction': direction,
+            'mean_ms': round(mean * 1000, 2),
+            'reason': reason,
+        })
+        if self.metrics is not None:
+            self.metrics.inc('quality_changes_total', direction=direction)
+        self._export()
+        print(f"Quality: {previous.name} -> {self.tier.name} ({reason})")
+        return self.tier
+
+    def _export(self):
+        if self.metrics is None:
+            return
+        self.metrics.set('quality_tier', self.tier_index)
+        self.metrics.set('latency_budget_seconds', self.budget)
+        if self.last_mean is not None:
+            self.metrics.set('quality_window_latency_seconds', self.last_mean)
+
+    def stats(self):
+        return {
+            'tier': self.tier.name,
+            'tier_index': self.tier_index,
+            'budget_ms': self.budget * 1000,
+            'window_mean_ms': round(self.last_mean * 1000, 2) if self.last_mean is not None else None,
+            'downgrades': self.downgrades,
+            'upgrades': self.upgrades,
+            'recover_windows': self._required_windows,
+            'decisions': list(self.decisions),
+        }
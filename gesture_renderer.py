@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Overlay Renderer
+Draws the hand skeleton and gesture labels for the GUI preview at a fixed,
+small cost per displayed frame
+
+The skeleton topology is precomputed as index arrays, so all hands in a frame
+are drawn with two cv2.polylines calls (bones, then joints as zero-length
+segments with round caps) instead of 21 circles and 23 lines per hand.
+Drawing happens on a downscaled preview kept in a reusable buffer rather
+than on the full capture frame, and the preview is refreshed at display_fps
+no matter how fast frames are captured or inferred.
+
+Usage:
+    python3 test_hand_gestures.py --preview-width 960 --display-fps 30
+    python3 benchmark_gestures.py render
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+# Bones as polylines: one chain per finger starting at the wrist, plus the
+# palm across the finger bases (the same 23 connections as before). The palm
+# repeats its last joint so every chain has the same length and all of them
+# fit in one array.
+SKELETON_CHAINS = np.array([
+    [0, 1, 2, 3, 4],  # Thumb
+    [0, 5, 6, 7, 8],  # Index
+    [0, 9, 10, 11, 12],  # Middle
+    [0, 13, 14, 15, 16],  # Ring
+    [0, 17, 18, 19, 20],  # Pinky
+    [5, 9, 13, 17, 17],  # Palm
+])
+# Every joint as a zero-length segment, so one polylines call draws all the dots
+JOINT_SEGMENTS = np.repeat(np.arange(21)[:, np.newaxis], 2, axis=1)
+
+BONE_COLOR = (255, 0, 0)
+JOINT_COLOR = (0, 255, 0)
+TEXT_COLOR = (0, 255, 0)
+
+# Sizes at 1920 px wide; scaled with the image being drawn on
+REFERENCE_WIDTH = 1920
+JOINT_DIAMETER = 10
+BONE_THICKNESS = 2
+TEXT_SCALE = 1.0
+
+# Fraction of the refresh interval a frame may arrive early and still be shown
+EARLY_TOLERANCE = 0.25
+
+
+def draw_hands(image, landmarks, gestures, track_ids=None):
+    """
+    Draw skeletons and gesture labels for all hands
+
+    Labels are stacked in the top-left corner, one line per hand with a
+    gesture, prefixed with the hand's track ID when track_ids is given.
+
+    Args:
+        image: BGR image to draw on (modified in place)
+        landmarks: (N, 21, 3) array in normalized image coordinates
+        gestures: Gesture name (or None) per hand
+        track_ids: Track ID per hand (optional)
+    """
+    h, w = image.shape[:2]
+    scale = w / REFERENCE_WIDTH
+    if len(landmarks):
+        points = np.empty((len(landmarks), 21, 2), dtype=np.int32)
+        np.multiply(landmarks[:, :, :2], (w, h), out=points, casting='unsafe')
+
+        bones = points[:, SKELETON_CHAINS].reshape(-1, SKELETON_CHAINS.shape[1], 2)
+        cv2.polylines(image, bones, False, BONE_COLOR, max(1, round(BONE_THICKNESS * scale)))
+        joints = points[:, JOINT_SEGMENTS].reshape(-1, 2, 2)
+        cv2.polylines(image, joints, False, JOINT_COLOR, max(2, round(JOINT_DIAMETER * scale)))
+
+    text_scale = max(0.5, TEXT_SCALE * scale)
+    line = 0
+    for hand, gesture in enumerate(gestures):
+        if gesture:
+            line += 1
+            label = f"GESTURE: {gesture}" if track_ids is None else f"#{track_ids[hand]} GESTURE: {gesture}"
+            cv2.putText(image, label, (10, round(30 * text_scale) * line),
+                        cv2.FONT_HERSHEY_SIMPLEX, text_scale, TEXT_COLOR, max(1, round(2 * text_scale)))
+
+
+class OverlayRenderer:
+    """Throttled, downscaled preview with hand overlays"""
+
+    def __init__(self, preview_width=960, display_fps=30.0, mirror=True):
+        """
+        Args:
+            preview_width: Width the preview is downscaled to (None: full resolution)
+            display_fps: Maximum preview refreshes per second (None: every frame)
+            mirror: Flip the preview horizontally (selfie view); landmarks
+                    must already be mirrored to match
+        """
+        self.preview_width = preview_width
+        self.display_interval = 1.0 / display_fps if display_fps else 0.0
+        self.mirror = mirror
+
+        self._scaled = None
+        self._preview = None
+        self._next_refresh = float('-inf')
+        self.refreshes = 0
+        self.skipped = 0
+
+    def due(self, now=None):
+        """True if the preview should be refreshed for this frame (and counts it)"""
+        now = time.monotonic() if now is None else now
+        # Refreshes follow a fixed schedule rather than "interval since the last
+        # one", so a frame arriving a hair early (camera jitter, or capture at an
+        # exact multiple of display_fps) does not halve the refresh rate
+        if now < self._next_refresh - self.display_interval * EARLY_TOLERANCE:
+            self.skipped += 1
+            return False
+        # After a stall, restart the schedule instead of catching up with a burst
+        self._next_refresh = max(self._next_refresh, now - self.display_interval) + self.display_interval
+        self.refreshes += 1
+        return True
+
+    def _buffer(self, name, shape):
+        buffer = getattr(self, name)
+        if buffer is None or buffer.shape != shape:
+            buffer = np.empty(shape, dtype=np.uint8)
+            setattr(self, name, buffer)
+        return buffer
+
+    def preview(self, frame):
+        """
+        Downscaled (and mirrored) copy of frame in a reusable buffer
+
+        The returned image is only valid until the next call. At full
+        resolution without mirroring it is frame itself, as with
+        HandGestureDetector.display_frame.
+        """
+        h, w = frame.shape[:2]
+        image = frame
+        if self.preview_width and self.preview_width < w:
+            size = (self.preview_width, round(h * self.preview_width / w))
+            image = cv2.resize(frame, size, dst=self._buffer('_scaled', (size[1], size[0], 3)),
+                               interpolation=cv2.INTER_LINEAR)
+        if self.mirror:
+            image = cv2.flip(image, 1, dst=self._buffer('_preview', image.shape))
+        return image
+
+    def render(self, frame, landmarks, gestures):
+        """Preview of frame with hands drawn on it"""
+        image = self.preview(frame)
+        draw_hands(image, landmarks, gestures)
+        return image
+
+    def stats(self):
+        return {'refreshes': self.refreshes, 'skipped': self.skipped}
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Inference Scheduler
+Decides per frame whether HandGestureDetector runs the landmarker, so an
+always-on rig that nobody is gesturing at does not pay for full-rate
+inference on every 1080p frame
+
+While a hand has been seen recently the scheduler is ACTIVE and lets every
+frame through (or caps inference at active_fps). After idle_after seconds
+without a hand it goes IDLE and only runs inference every idle_interval
+seconds - the worst-case time to first detection - unless a cheap motion
+check (mean absolute difference of a tiny grayscale thumbnail) sees something
+move, which wakes it up immediately.
+
+Usage:
+    python3 test_hand_gestures.py --scheduler --idle-interval 0.5
+    python3 benchmark_gestures.py idle --seconds 10
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+ACTIVE = 'active'
+IDLE = 'idle'
+
+
+class InferenceScheduler:
+    """Motion- and presence-gated inference rate control"""
+
+    def __init__(self, idle_after=1.0, idle_interval=0.5, active_fps=None, motion_threshold=6.0,
+                 motion_width=64, motion_hold=0.5):
+        """
+        Args:
+            idle_after: Seconds without a hand before inference backs off
+            idle_interval: Seconds between inferences while idle (the longest a
+                           hand that appears without motion waits to be detected)
+            active_fps: Cap on inferences per second while active (None: every frame)
+            motion_threshold: Mean absolute grey-level difference (0-255) of
+                              the thumbnail that counts as motion
+            motion_width: Thumbnail width for the motion check
+            motion_hold: Seconds to keep running full rate after motion stops
+        """
+        self.idle_after = idle_after
+        self.idle_interval = idle_interval
+        self.active_interval = 1.0 / active_fps if active_fps else 0.0
+        self.motion_threshold = motion_threshold
+        self.motion_width = motion_width
+        self.motion_hold = motion_hold
+
+        self._small = None
+        self._thumbnail = None
+        self._previous = None
+        self._diff = None
+        self._last_hand = float('-inf')
+        self._last_motion = float('-inf')
+        self._last_detect = float('-inf')
+
+        self.frames = 0
+        self.detections = 0
+        self.motion_wakeups = 0
+
+    @property
+    def state(self):
+        return ACTIVE if self._active(time.monotonic()) else IDLE
+
+    def _active(self, now):
+        return now - self._last_hand < self.idle_after or now - self._last_motion < self.motion_hold
+
+    def motion(self, frame):
+        """Mean absolute difference between this frame's thumbnail and the previous one"""
+        h, w = frame.shape[:2]
+        size = (self.motion_width, max(1, h * self.motion_width // w))
+        if self._thumbnail is None or self._thumbnail.shape != (size[1], size[0]):
+            self._small = np.empty((size[1], size[0], 3), dtype=np.uint8)
+            self._thumbnail = np.empty((size[1], size[0]), dtype=np.uint8)
+            self._diff = np.empty_like(self._thumbnail)
+            self._previous = None
+        # Nearest-neighbour sampling reads only the sampled pixels of the frame
+        cv2.resize(frame, size, dst=self._small, interpolation=cv2.INTER_NEAREST)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._thumbnail)
+        if self._previous is None:
+            self._previous = self._thumbnail.copy()
+            return 0.0
+        cv2.absdiff(self._thumbnail, self._previous, dst=self._diff)
+        self._previous, self._thumbnail = self._thumbnail, self._previous
+        return float(cv2.mean(self._diff)[0])
+
+    def should_detect(self, frame, now=None):
+        """
+        Decide whether to run inference on this frame
+
+        Args:
+            frame: BGR frame (only a thumbnail is read)
+            now: time.monotonic() timestamp (default: now)
+        """
+        now = time.monotonic() if now is None else now
+        self.frames += 1
+        was_active = self._active(now)
+        if self.motion(frame) >= self.motion_threshold:
+            if not was_active:
+                self.motion_wakeups += 1
+            self._last_motion = now
+
+        interval = self.active_interval if self._active(now) else self.idle_interval
+        if now - self._last_detect < interval:
+            return False
+        self._last_detect = now
+        self.detections += 1
+        return True
+
+    def update(self, hand_found, now=None):
+        """Report whether the last inference found a hand"""
+        if hand_found:
+            self._last_hand = time.monotonic() if now is None else now
+
+    def stats(self):
+        return {
+            'state': self.state,
+            'frames': self.frames,
+            'detections': self.detections,
+            'skipped': self.frames - self.detections,
+            'motion_wakeups': self.motion_wakeups,
+        }
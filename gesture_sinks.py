@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Gesture Event Sinks
+Destinations for gesture events emitted by HandGestureDetector in headless mode
+
+A sink is any object with emit(event) and close(). Sinks run on the detector
+thread, so they must not block: the queue and socket sinks drop events
+rather than stall detection.
+
+Usage:
+    python3 test_hand_gestures.py --headless --sink stdout
+    python3 test_hand_gestures.py --headless --sink tcp://127.0.0.1:5005
+"""
+
+import json
+import queue
+import socket
+import sys
+import threading
+import time
+
+from gesture_pipeline import put_drop_oldest
+
+
+class GestureEvent:
+    """A change in the detected gesture"""
+
+    __slots__ = ('kind', 'gesture', 'timestamp', 'frame_index', 'hand_index', 'track_id', 'duration', 'camera')
+
+    def __init__(self, gesture, timestamp, frame_index, hand_index=0, kind='change', duration=None,
+                 camera=None, track_id=None):
+        """
+        Args:
+            gesture: Gesture name, or None when the previous gesture ended
+            timestamp: Time the frame was processed, in seconds
+            frame_index: Frame counter of the detector loop
+            hand_index: Index of the hand in the detection result
+            kind: 'change' for raw per-frame changes, or 'start'/'hold'/'end'
+                  from gesture_debounce.GestureDebouncer
+            duration: Seconds since the gesture started (debounced events only)
+            camera: Camera id when events from several cameras share a stream
+            track_id: Stable ID of the hand across frames (gesture_tracking.HandTracker)
+        """
+        self.kind = kind
+        self.gesture = gesture
+        self.timestamp = timestamp
+        self.frame_index = frame_index
+        self.hand_index = hand_index
+        self.track_id = track_id
+        self.duration = duration
+        self.camera = camera
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), separators=(',', ':'))
+
+    def __repr__(self):
+        return f"GestureEvent({self.to_dict()})"
+
+
+class GestureSink:
+    """Base class for event sinks"""
+
+    def emit(self, event):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class CallbackSink(GestureSink):
+    """Call a function with every event"""
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def emit(self, event):
+        self.callback(event)
+
+
+class QueueSink(GestureSink):
+    """
+    Put events on a queue.Queue for another thread to consume
+
+    When the queue is bounded and full, the oldest event is discarded so the
+    detector never waits on a slow consumer.
+    """
+
+    def __init__(self, event_queue=None, maxsize=256):
+        self.queue = event_queue if event_queue is not None else queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def emit(self, event):
+        self.dropped += put_drop_oldest(self.queue, event)
+
+
+class AsyncQueueSink(GestureSink):
+    """
+    Hand events from a detector thread to an asyncio.Queue on an event loop
+
+    The queue should be bounded: when it is full the oldest event is dropped
+    (counted in `dropped`), so a slow async consumer never makes memory grow.
+    """
+
+    def __init__(self, loop, event_queue):
+        self.loop = loop
+        self.queue = event_queue
+        self.dropped = 0
+
+    def emit(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # Event loop already closed
+            self.dropped += 1
+
+    def _put(self, event):
+        # Runs on the event loop thread
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+
+class JsonLinesSink(GestureSink):
+    """Write one JSON object per line to a file-like object (default: stdout)"""
+
+    def __init__(self, stream=None):
+        self.stream = stream if stream is not None else sys.stdout
+
+    def emit(self, event):
+        self.stream.write(event.to_json() + "\n")
+        self.stream.flush()
+
+
+class SocketSink(GestureSink):
+    """
+    Send JSON lines to a TCP listener
+
+    emit() only queues the event: connecting and sending happen on a sender
+    thread, so an unreachable or slow listener never stalls detection. The
+    queue is bounded and drops its oldest event when full. The sender connects
+    lazily and reconnects at most every retry_interval seconds; events that
+    arrive while it is disconnected, or cannot be sent, are dropped. All drops
+    are counted in `dropped`.
+    """
+
+    # Tells the sender thread to exit
+    _STOP = object()
+
+    def __init__(self, host, port, retry_interval=2.0, timeout=0.5, max_pending=256):
+        self.address = (host, port)
+        self.retry_interval = retry_interval
+        self.timeout = timeout
+        self.dropped = 0
+        # Drops are counted on both the emitting and the sender thread
+        self._dropped_lock = threading.Lock()
+        self._sock = None
+        self._next_attempt = 0.0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._send_loop, name='gesture-socket-sink', daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        now = time.monotonic()
+        if now < self._next_attempt:
+            return None
+        try:
+            self._sock = socket.create_connection(self.address, timeout=self.timeout)
+            self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError as e:
+            self._next_attempt = now + self.retry_interval
+            print(f"WARNING: Gesture sink could not connect to {self.address[0]}:{self.address[1]}: {e}")
+            self._sock = None
+        return self._sock
+
+    def emit(self, event):
+        self._count_dropped(put_drop_oldest(self._queue, event))
+
+    def _count_dropped(self, count):
+        if count:
+            with self._dropped_lock:
+                self.dropped += count
+
+    def _send_loop(self):
+        while True:
+            event = self._queue.get()
+            if event is self._STOP:
+                break
+            sock = self._sock or self._connect()
+            if sock is None:
+                self._count_dropped(1)
+                continue
+            try:
+                sock.sendall((event.to_json() + "\n").encode())
+            except OSError:
+                self._count_dropped(1)
+                self._disconnect()
+                self._next_attempt = time.monotonic() + self.retry_interval
+
+    def _disconnect(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+    def close(self, timeout=2.0):
+        """Send what is queued (for up to timeout seconds), then disconnect"""
+        if self._thread.is_alive():
+            self._count_dropped(put_drop_oldest(self._queue, self._STOP))
+            self._thread.join(timeout)
+        if not self._thread.is_alive():
+            self._disconnect()
+
+
+def create_sink(spec):
+    """
+    Build a sink from a command-line spec
+
+    Args:
+        spec: 'stdout', 'none' or 'tcp://HOST:PORT'
+    """
+    if spec == 'stdout':
+        return JsonLinesSink()
+    if spec == 'none':
+        return CallbackSink(lambda event: None)
+    if spec.startswith('tcp://'):
+        host, _, port = spec[len('tcp://'):].rpartition(':')
+        return SocketSink(host or '127.0.0.1', int(port))
+    raise ValueError(f"Unknown sink: {spec} (expected stdout, none or tcp://HOST:PORT)")
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Detector Soak Test
+Drives the detector loop with synthetic or recorded frames for a long time
+and fails if memory grows or per-frame latency drifts, so leaks and slow
+degradation show up before a multi-hour stream does
+
+Targets (no camera or window needed, so it runs headless on a CPU-only box):
+    headless  process_frame + emit_detection (tracking, debounced events)
+    gui       process_frame + render_detection on the downscaled preview
+    trainer   ThumbsUpTrainer.render_frame with burst capture into a temp file
+
+Every --sample-interval seconds it records RSS, memory traced by
+tracemalloc, GC collections per generation, the number of GC-tracked objects
+and per-frame latency (mean, p95). Samples taken during --warmup are shown
+but not checked. The checks compare the median of the last quarter of the
+samples with the first quarter, which keeps one slow sample or a GC pause
+from failing a run:
+
+    rss_growth_mb      RSS growth
+    traced_growth_mb   Python allocation growth (tracemalloc)
+    object_growth      GC-tracked object count growth
+    latency_drift_pct  Mean per-frame latency change
+
+At the end the allocation sites that grew most since the warm-up are listed.
+The exit status is 1 if any check fails.
+
+Usage:
+    python3 gesture_soak.py --minutes 180
+    python3 gesture_soak.py --minutes 5 --target trainer --json soak.json
+    python3 gesture_soak.py --minutes 60 --video clip.mp4 --fps 30
+"""
+
+import contextlib
+import gc
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = ('headless', 'gui', 'trainer')
+
+
+def rss_bytes():
+    """Resident set size of this process (peak RSS where /proc is not available)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class LoopingVideo:
+    """Recorded clip as an endless cv2.VideoCapture-like source (reopened at the end)"""
+
+    def __init__(self, path):
+        import cv2
+
+        self.path = path
+        self._cv2 = cv2
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise FileNotFoundError(f"Could not open video: {path}")
+
+    def read(self, image=None):
+        ret, frame = self.cap.read(image)
+        if not ret:
+            self.cap.release()
+            self.cap = self._cv2.VideoCapture(self.path)
+            ret, frame = self.cap.read(image)
+        return ret, frame
+
+    def release(self):
+        self.cap.release()
+
+
+def make_target(args):
+    """
+    Build the loop under test
+
+    Returns:
+        (step, close): step(frame, frame_index) handles one frame; close()
+        releases the landmarker and any output files
+    """
+    from gesture_sinks import CallbackSink
+
+    if args.target == 'trainer':
+        from train_thumbs_up import ThumbsUpTrainer
+
+        output_dir = tempfile.TemporaryDirectory(prefix='gesture-soak-')
+        trainer = ThumbsUpTrainer(output_file=os.path.join(output_dir.name, 'soak.csv'),
+                                  running_mode=args.running_mode, inference_size=args.inference_size,
+                                  landmarker_path=args.landmarker_model, offline=args.offline or None,
+                                  num_hands=args.num_hands)
+        trainer.burst = True
+
+        def step(frame, frame_index):
+            trainer.render_frame(frame)
+
+        def close():
+            trainer.detector.hand_landmarker.close()
+            trainer.writer.close()
+            output_dir.cleanup()
+
+        return step, close
+
+    from test_hand_gestures import HandGestureDetector
+
+    detector = HandGestureDetector(running_mode=args.running_mode, inference_size=args.inference_size,
+                                   num_hands=args.num_hands, landmarker_path=args.landmarker_model,
+                                   offline=args.offline or None)
+    if args.target == 'headless':
+        detector.configure_events(CallbackSink(lambda event: None), debounce=True)
+
+        def step(frame, frame_index):
+            frame, detection_result = detector.process_frame(frame)
+            detector.emit_detection(detection_result, frame_index)
+    else:
+        from gesture_renderer import OverlayRenderer
+
+        renderer = detector.renderer = OverlayRenderer(args.preview_width, mirror=detector.mirror)
+        last_gesture = [None]
+
+        def step(frame, frame_index):
+            # _show_frame without the window
+            frame, detection_result = detector.process_frame(frame)
+            preview = renderer.preview(frame) if renderer.due() else None
+            last_gesture[0] = detector.render_detection(preview, detection_result, frame_index, last_gesture[0])
+
+    def close():
+        detector.hand_landmarker.close()
+
+    return step, close
+
+
+def gc_collections():
+    """Collections so far per generation"""
+    return [stats['collections'] for stats in gc.get_stats()]
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run_soak(args, report=sys.stdout):
+    """
+    Run the target for args.minutes and sample it
+
+    Args:
+        report: Stream for progress lines (the target's own output is discarded)
+
+    Returns:
+        (samples, top_allocations)
+    """
+    if args.video:
+        source = LoopingVideo(args.video)
+    else:
+        from benchmark_gestures import SyntheticFrames
+        source = SyntheticFrames(*args.synthetic_size)
+
+    if args.tracemalloc:
+        tracemalloc.start()
+    step, close = make_target(args)
+
+    samples = []
+    baseline = None
+    latencies = []
+    frame = None
+    frame_index = 0
+    start = time.perf_counter()
+    end = start + args.minutes * 60
+    next_sample = start + args.sample_interval
+    warmup_end = start + args.warmup
+
+    print(f"{'elapsed_s':>9} {'frames':>8} {'rss_mb':>8} {'traced_mb':>9} {'objects':>8} "
+          f"{'gc0/gc1/gc2':>15} {'mean_ms':>8} {'p95_ms':>8}", file=report)
+    devnull = open(os.devnull, 'w')
+    try:
+        # Landmark printing of the GUI and trainer loops would swamp the report
+        with contextlib.redirect_stdout(devnull):
+            while True:
+                ret, frame = source.read(frame)
+                if not ret:
+                    raise RuntimeError("Frame source failed")
+                frame_start = time.perf_counter()
+                step(frame, frame_index)
+                now = time.perf_counter()
+                latencies.append(now - frame_start)
+                frame_index += 1
+                if args.fps:
+                    # Pace like a camera delivering args.fps frames per second
+                    delay = start + frame_index / args.fps - now
+                    if delay > 0:
+                        time.sleep(delay)
+
+                if now >= next_sample or now >= end:
+                    if baseline is None and now >= warmup_end and args.tracemalloc:
+                        baseline = tracemalloc.take_snapshot()
+                    sample = {
+                        'elapsed_s': round(now - start, 1),
+                        'frames': frame_index,
+                        'warmup': now < warmup_end,
+                        'rss_mb': round(rss_bytes() / 2**20, 2),
+                        'traced_mb': round(tracemalloc.get_traced_memory()[0] / 2**20, 3) if args.tracemalloc else None,
+                        'objects': len(gc.get_objects()),
+                        'gc_collections': gc_collections(),
+                        'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+                        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+                    }
+                    samples.append(sample)
+                    latencies = []
+                    traced = f"{sample['traced_mb']:9.3f}" if args.tracemalloc else f"{'-':>9}"
+                    collections = '/'.join(str(count) for count in sample['gc_collections'])
+                    print(f"{sample['elapsed_s']:9.1f} {frame_index:8d} {sample['rss_mb']:8.1f} {traced} "
+                          f"{sample['objects']:8d} {collections:>15} {sample['mean_ms']:8.2f} "
+                          f"{sample['p95_ms']:8.2f}{' (warm-up)' if sample['warmup'] else ''}",
+                          file=report, flush=True)
+                    next_sample = now + args.sample_interval
+                    if now >= end:
+                        break
+    finally:
+        devnull.close()
+        source.release()
+        close()
+
+    top = []
+    if args.tracemalloc:
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        if baseline is not None:
+            # Leave out the tracer and this harness's own sample records
+            ignore = (tracemalloc.Filter(False, tracemalloc.__file__),
+                      tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+                      tracemalloc.Filter(False, __file__))
+            for stat in snapshot.filter_traces(ignore).compare_to(baseline.filter_traces(ignore), 'lineno'):
+                if stat.size_diff <= 0:
+                    continue
+                frame_info = stat.traceback[0]
+                top.append({'location': f"{frame_info.filename}:{frame_info.lineno}",
+                            'size_diff_kb': round(stat.size_diff / 1024, 1), 'count_diff': stat.count_diff})
+                if len(top) >= args.top:
+                    break
+    return samples, top
+
+
+def quarter_change(values):
+    """Median of the last quarter of values minus the median of the first quarter"""
+    n = max(1, len(values) // 4)
+    first = statistics.median(values[:n])
+    return first, statistics.median(values[-n:]) - first
+
+
+def evaluate(samples, args):
+    """
+    Check samples taken after the warm-up against the growth and drift limits
+
+    Returns:
+        List of {'check', 'value', 'limit', 'passed'}
+    """
+    steady = [sample for sample in samples if not sample['warmup']]
+    if len(steady) < 2:
+        raise ValueError(f"Only {len(steady)} samples after the warm-up; run longer "
+                         f"or lower --warmup/--sample-interval")
+
+    checks = []
+
+    def check(name, value, limit):
+        checks.append({'check': name, 'value': round(value, 3), 'limit': limit, 'passed': value <= limit})
+
+    check('rss_growth_mb', quarter_change([sample['rss_mb'] for sample in steady])[1], args.max_rss_growth)
+    if args.tracemalloc:
+        check('traced_growth_mb', quarter_change([sample['traced_mb'] for sample in steady])[1],
+              args.max_traced_growth)
+    check('object_growth', quarter_change([sample['objects'] for sample in steady])[1], args.max_object_growth)
+    first, change = quarter_change([sample['mean_ms'] for sample in steady])
+    check('latency_drift_pct', change / first * 100 if first else 0.0, args.max_latency_drift)
+    return checks
+
+
+if __name__ == "__main__":
+    import argparse
+    from test_hand_gestures import parse_size
+
+    parser = argparse.ArgumentParser(description='Soak-test the detector loop for memory growth and latency drift')
+    parser.add_argument('--target', default='headless', choices=TARGETS,
+                        help='Loop to drive: headless events, GUI rendering or the trainer (default: headless)')
+    parser.add_argument('--minutes', type=float, default=10.0, help='Run length (default: 10)')
+    parser.add_argument('--video', help='Loop this recorded clip instead of synthetic frames')
+    parser.add_argument('--synthetic-size', type=parse_size, default=(1920, 1080),
+                        help='Synthetic frame size WIDTHxHEIGHT (default: 1920x1080)')
+    parser.add_argument('--fps', type=float, default=0.0,
+                        help='Pace frames like a camera at this rate (default: 0, as fast as possible)')
+    parser.add_argument('--sample-interval', type=float, default=10.0, help='Seconds between samples (default: 10)')
+    parser.add_argument('--warmup', type=float, default=30.0,
+                        help='Seconds before samples are checked (default: 30)')
+    parser.add_argument('--running-mode', default='video', choices=['image', 'video', 'live_stream'],
+                        help='Landmarker running mode (default: video)')
+    parser.add_argument('--inference-size', type=parse_size, default=None,
+                        help='Downscale frames to fit WIDTHxHEIGHT before detection')
+    parser.add_argument('--num-hands', type=int, default=1, help='Maximum hands to detect (default: 1)')
+    parser.add_argument('--preview-width', type=int, default=960, help='GUI target preview width (default: 960)')
+    parser.add_argument('--landmarker-model', default=None, help='hand_landmarker.task to use')
+    parser.add_argument('--offline', action='store_true', help='Fail instead of downloading the landmarker model')
+    parser.add_argument('--no-tracemalloc', dest='tracemalloc', action='store_false',
+                        help='Skip allocation tracing (it slows every frame down)')
+    parser.add_argument('--top', type=int, default=10, help='Allocation sites to list (default: 10)')
+    parser.add_argument('--max-rss-growth', type=float, default=32.0, help='RSS growth limit in MB (default: 32)')
+    parser.add_argument('--max-traced-growth', type=float, default=8.0,
+                        help='tracemalloc growth limit in MB (default: 8)')
+    parser.add_argument('--max-object-growth', type=int, default=5000,
+                        help='GC-tracked object growth limit (default: 5000)')
+    parser.add_argument('--max-latency-drift', type=float, default=25.0,
+                        help='Mean per-frame latency drift limit in percent (default: 25)')
+    parser.add_argument('--json', help='Write samples, top allocations and checks to this JSON file')
+
+    args = parser.parse_args()
+
+    print(f"Soak: {args.target} for {args.minutes:g} min, "
+          f"{'video ' + args.video if args.video else 'synthetic %dx%d' % args.synthetic_size} frames, "
+          f"sampling every {args.sample_interval:g}s after a {args.warmup:g}s warm-up\n")
+    samples, top = run_soak(args)
+
+    if top:
+        print("\nTop allocation growth since warm-up:")
+        for allocation in top:
+            print(f"  {allocation['size_diff_kb']:>10.1f} KiB {allocation['count_diff']:>+8d}  {allocation['location']}")
+
+    checks = evaluate(samples, args)
+    print("\nChecks:")
+    for result in checks:
+        print(f"  {result['check']:<18} {result['value']:>10g}  limit {result['limit']:<8g} "
+              f"{'PASS' if result['passed'] else 'FAIL'}")
+    passed = all(result['passed'] for result in checks)
+    print(f"\nSoak {'passed' if passed else 'FAILED'} ({samples[-1]['frames']} frames)")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'target': args.target, 'minutes': args.minutes, 'samples': samples,
+                       'top_allocations': top, 'checks': checks, 'passed': passed}, f, indent=2)
+        print(f"Results written to {args.json}")
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Hand Tracking
+Gives every hand a track ID that stays the same from frame to frame, so
+per-hand state (debouncers, printed gestures) and events follow a person
+rather than a position in the landmarker's result list, which can reorder
+whenever a hand is lost or a second one appears
+
+Association is by centroid: each hand's mean landmark position is matched
+greedily to the nearest live track within max_distance. With the handful of
+hands the landmarker returns this is a tiny distance matrix per frame.
+A track survives max_missed frames without a match, so a hand that drops
+out for a moment keeps its ID.
+"""
+
+import itertools
+
+import numpy as np
+
+
+class HandTracker:
+    """Centroid association of hands to stable track IDs"""
+
+    def __init__(self, max_distance=0.2, max_missed=10):
+        """
+        Args:
+            max_distance: Largest centroid movement between frames (normalized
+                          image units) still counted as the same hand
+            max_missed: Frames a track is kept without a matching hand
+        """
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+        self.reset()
+
+    def reset(self):
+        self._ids = itertools.count(1)
+        self._track_ids = []
+        self._centroids = np.empty((0, 2))
+        self._missed = []
+        self.ended = []
+
+    @property
+    def tracks(self):
+        """IDs of live tracks, including ones not matched on the last frame"""
+        return list(self._track_ids)
+
+    def update(self, landmarks):
+        """
+        Assign track IDs to one frame's hands
+
+        Args:
+            landmarks: (N, 21, 3) array
+
+        Returns:
+            List of N track IDs in the same order as landmarks. Tracks dropped
+            on this frame are listed in self.ended.
+        """
+        centroids = np.asarray(landmarks)[:, :, :2].mean(axis=1) if len(landmarks) else np.empty((0, 2))
+        count = len(centroids)
+        assigned = [None] * count
+        matched = [False] * len(self._track_ids)
+
+        if count and self._track_ids:
+            distances = np.linalg.norm(centroids[:, np.newaxis] - self._centroids[np.newaxis], axis=2)
+            # Greedy: closest pairs first; optimal for the few hands involved
+            for flat in np.argsort(distances, axis=None):
+                hand, track = divmod(int(flat), len(self._track_ids))
+                if distances[hand, track] > self.max_distance:
+                    break
+                if assigned[hand] is not None or matched[track]:
+                    continue
+                assigned[hand] = self._track_ids[track]
+                matched[track] = True
+
+        track_ids = []
+        track_centroids = []
+        missed = []
+        self.ended = []
+        for track, track_id in enumerate(self._track_ids):
+            if matched[track]:
+                continue
+            if self._missed[track] + 1 > self.max_missed:
+                self.ended.append(track_id)
+            else:
+                track_ids.append(track_id)
+                track_centroids.append(self._centroids[track])
+                missed.append(self._missed[track] + 1)
+        for hand in range(count):
+            if assigned[hand] is None:
+                assigned[hand] = next(self._ids)
+            track_ids.append(assigned[hand])
+            track_centroids.append(centroids[hand])
+            missed.append(0)
+
+        self._track_ids = track_ids
+        self._centroids = np.array(track_centroids).reshape(-1, 2)
+        self._missed = missed
+        return assigned
@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Landmark Session Recorder and Replayer
+Records the exact landmark stream of a live session - every frame's
+timestamp, (21, 3) float32 landmarks per hand, handedness and the label the
+classifier produced - into a compact chunked binary file, and replays it
+through the rule classifier, the original detect_gesture or a learned model
+without a camera or the landmarker. Hours of footage replay in seconds.
+
+File layout (little-endian):
+    header  b'GSTLMREC', uint16 version, uint32 n, n bytes of JSON metadata
+    chunk   b'CHNK', uint32 frames F, uint32 hands H, uint32 n, then
+            float64[F] timestamps, int64[F] frame indices, uint8[F] hands per frame,
+            float32[H, 21, 3] landmarks, int8[H] handedness (0 Left, 1 Right, -1 unknown),
+            int16[H] label codes into the chunk's label list (-1 for no gesture),
+            n bytes of JSON label list
+
+Chunks are self-contained and written whole, so a recording cut short by a
+crash loses at most the frames of its last chunk.
+
+Usage:
+    python3 test_hand_gestures.py --headless --record session.lmrec
+    python3 landmark_recorder.py info session.lmrec
+    python3 landmark_recorder.py replay session.lmrec --classifier legacy
+    python3 landmark_recorder.py replay session.lmrec --realtime --speed 2
+"""
+
+import json
+import os
+import struct
+import sys
+import time
+from collections import Counter, namedtuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from gesture_classifier import classify_batch, hands_to_array
+from gesture_dataset import DEFAULT_CHUNK_SIZE, NUM_LANDMARKS
+
+FILE_MAGIC = b'GSTLMREC'
+FORMAT_VERSION = 1
+FILE_HEADER = struct.Struct('<8sHI')
+CHUNK_MAGIC = b'CHNK'
+CHUNK_HEADER = struct.Struct('<4sIII')
+
+TIMESTAMP_DTYPE = np.dtype('<f8')
+FRAME_INDEX_DTYPE = np.dtype('<i8')
+HAND_COUNT_DTYPE = np.dtype('<u1')
+LANDMARK_DTYPE = np.dtype('<f4')
+HANDEDNESS_DTYPE = np.dtype('<i1')
+LABEL_DTYPE = np.dtype('<i2')
+
+HANDEDNESS_NAMES = ('Left', 'Right')
+UNKNOWN = -1
+
+# Stand-in for MediaPipe landmarks when replaying through detect_gesture
+Point = namedtuple('Point', 'x y z')
+
+
+class LandmarkRecorder:
+    """
+    Append-only writer for a landmark recording
+
+    Frames are buffered and written one chunk at a time, when chunk_frames
+    frames are pending or the oldest pending frame is flush_interval seconds
+    old. A chunk of 256 single-hand frames is about 70 KB.
+    """
+
+    def __init__(self, path, chunk_frames=256, flush_interval=1.0, metadata=None):
+        """
+        Args:
+            path: Recording file to create (overwritten if it exists)
+            chunk_frames: Frames per chunk
+            flush_interval: Maximum seconds a frame stays buffered in memory
+            metadata: JSON-serializable dict stored in the file header
+        """
+        self.path = path
+        self.chunk_frames = chunk_frames
+        self.flush_interval = flush_interval
+        self.frames = 0
+        self.hands = 0
+
+        metadata = dict(metadata or {}, created=time.time(), num_landmarks=NUM_LANDMARKS)
+        encoded = json.dumps(metadata).encode()
+        self._file = open(path, 'wb')
+        self._file.write(FILE_HEADER.pack(FILE_MAGIC, FORMAT_VERSION, len(encoded)))
+        self._file.write(encoded)
+        self._file.flush()
+        self._reset_chunk()
+
+    def _reset_chunk(self):
+        self._timestamps = []
+        self._frame_indices = []
+        self._hand_counts = []
+        self._landmarks = []
+        self._handedness = []
+        self._labels = []
+        self._chunk_started = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def append(self, timestamp, landmarks, handedness=None, labels=None, frame_index=None):
+        """
+        Record one frame
+
+        Args:
+            timestamp: Capture time in Unix seconds
+            landmarks: (N, 21, 3) array for the N hands in the frame (N may be 0)
+            handedness: N 'Left'/'Right' strings (None: unknown)
+            labels: N classifier labels (None entries for no gesture)
+            frame_index: Frame number in the session (default: running count)
+        """
+        landmarks = np.asarray(landmarks, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3)
+        count = len(landmarks)
+        handedness = list(handedness) if handedness is not None else [None] * count
+        labels = list(labels) if labels is not None else [None] * count
+        if len(handedness) != count or len(labels) != count:
+            raise ValueError(f"Expected {count} handedness values and labels, got "
+                             f"{len(handedness)} and {len(labels)}")
+
+        if self._chunk_started is None:
+            self._chunk_started = time.monotonic()
+        self._timestamps.append(timestamp)
+        self._frame_indices.append(self.frames if frame_index is None else frame_index)
+        self._hand_counts.append(count)
+        if count:
+            self._landmarks.append(landmarks)
+            self._handedness.extend(handedness)
+            self._labels.extend(labels)
+        self.frames += 1
+        self.hands += count
+
+        if len(self._timestamps) >= self.chunk_frames or \
+                time.monotonic() - self._chunk_started >= self.flush_interval:
+            self.flush()
+
+    def record(self, detection_result, labels, timestamp=None, frame_index=None, landmarks=None):
+        """
+        Record a HandLandmarkerResult and the labels classified from it
+
+        landmarks may pass the result's (N, 21, 3) array if it was already converted.
+        """
+        hands = detection_result.hand_landmarks
+        handedness = [categories[0].category_name if categories else None
+                      for categories in detection_result.handedness]
+        if len(handedness) != len(hands):
+            handedness = None
+        if landmarks is None:
+            landmarks = hands_to_array(hands)
+        self.append(time.time() if timestamp is None else timestamp, landmarks, handedness, labels, frame_index)
+
+    def flush(self):
+        """Write the pending frames as one chunk"""
+        frames = len(self._timestamps)
+        if not frames:
+            return
+        label_names = sorted({label for label in self._labels if label is not None})
+        label_index = {label: i for i, label in enumerate(label_names)}
+        encoded = json.dumps(label_names).encode()
+        landmarks = (np.concatenate(self._landmarks) if self._landmarks
+                     else np.empty((0, NUM_LANDMARKS, 3), dtype=np.float32))
+
+        parts = [
+            CHUNK_HEADER.pack(CHUNK_MAGIC, frames, len(landmarks), len(encoded)),
+            np.asarray(self._timestamps, dtype=TIMESTAMP_DTYPE).tobytes(),
+            np.asarray(self._frame_indices, dtype=FRAME_INDEX_DTYPE).tobytes(),
+            np.asarray(self._hand_counts, dtype=HAND_COUNT_DTYPE).tobytes(),
+            landmarks.astype(LANDMARK_DTYPE, copy=False).tobytes(),
+            np.array([HANDEDNESS_NAMES.index(h) if h in HANDEDNESS_NAMES else UNKNOWN
+                      for h in self._handedness], dtype=HANDEDNESS_DTYPE).tobytes(),
+            np.array([label_index[label] if label is not None else UNKNOWN
+                      for label in self._labels], dtype=LABEL_DTYPE).tobytes(),
+            encoded,
+        ]
+        # One write per chunk so a reader (or a crash) never sees half a chunk header
+        self._file.write(b''.join(parts))
+        self._file.flush()
+        self._reset_chunk()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+
+class LandmarkRecording:
+    """
+    A recording loaded into memory
+
+    Attributes:
+        metadata: Header metadata dict
+        timestamps: (F,) float64 capture times
+        frame_indices: (F,) int64 frame numbers
+        hand_offsets: (F + 1,) int64; hands of frame i are [hand_offsets[i], hand_offsets[i + 1])
+        landmarks: (H, 21, 3) float32
+        handedness: (H,) int8 indices into HANDEDNESS_NAMES, -1 when unknown
+        label_codes: (H,) int16 indices into label_names, -1 for no gesture
+        label_names: Label vocabulary of the whole recording
+    """
+
+    def __init__(self, metadata, timestamps, frame_indices, hand_counts, landmarks, handedness,
+                 label_codes, label_names):
+        self.metadata = metadata
+        self.timestamps = timestamps
+        self.frame_indices = frame_indices
+        self.hand_offsets = np.concatenate(([0], np.cumsum(hand_counts, dtype=np.int64)))
+        self.landmarks = landmarks
+        self.handedness = handedness
+        self.label_codes = label_codes
+        self.label_names = list(label_names)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def hands(self):
+        return len(self.landmarks)
+
+    @property
+    def duration(self):
+        return float(self.timestamps[-1] - self.timestamps[0]) if len(self) > 1 else 0.0
+
+    def labels(self, start=0, stop=None):
+        """Recorded labels (None for no gesture) of hands [start, stop)"""
+        names = np.array(self.label_names + [None], dtype=object)
+        return names[self.label_codes[start:stop]].tolist()
+
+    def handedness_names(self, start=0, stop=None):
+        names = np.array(list(HANDEDNESS_NAMES) + [None], dtype=object)
+        return names[self.handedness[start:stop]].tolist()
+
+    def frame(self, index):
+        """(timestamp, (n, 21, 3) landmarks, handedness, recorded labels) of one frame"""
+        start, stop = self.hand_offsets[index], self.hand_offsets[index + 1]
+        return (float(self.timestamps[index]), self.landmarks[start:stop],
+                self.handedness_names(start, stop), self.labels(start, stop))
+
+
+def load_recording(path):
+    """
+    Read a recording
+
+    A truncated last chunk (recorder killed mid-write) is ignored.
+
+    Raises:
+        ValueError: Not a landmark recording, or an unsupported version
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < FILE_HEADER.size:
+        raise ValueError(f"{path} is not a landmark recording")
+    magic, version, metadata_size = FILE_HEADER.unpack_from(data)
+    if magic != FILE_MAGIC:
+        raise ValueError(f"{path} is not a landmark recording")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported recording version {version}")
+    offset = FILE_HEADER.size
+    metadata = json.loads(data[offset:offset + metadata_size])
+    offset += metadata_size
+
+    dtypes = {
+        'timestamps': TIMESTAMP_DTYPE,
+        'frame_indices': FRAME_INDEX_DTYPE,
+        'hand_counts': HAND_COUNT_DTYPE,
+        'landmarks': LANDMARK_DTYPE,
+        'handedness': HANDEDNESS_DTYPE,
+        'label_codes': LABEL_DTYPE,
+    }
+    columns = {name: [] for name in dtypes}
+    label_names = []
+    label_index = {}
+    while offset + CHUNK_HEADER.size <= len(data):
+        magic, frames, hands, labels_size = CHUNK_HEADER.unpack_from(data, offset)
+        if magic != CHUNK_MAGIC:
+            raise ValueError(f"{path}: corrupt chunk at byte {offset}")
+        counts = {name: frames for name in ('timestamps', 'frame_indices', 'hand_counts')}
+        counts.update(landmarks=hands * NUM_LANDMARKS * 3, handedness=hands, label_codes=hands)
+        sizes = [(name, dtype, counts[name]) for name, dtype in dtypes.items()]
+        end = offset + CHUNK_HEADER.size + sum(dtype.itemsize * count for _, dtype, count in sizes) + labels_size
+        if end > len(data):
+            break
+        position = offset + CHUNK_HEADER.size
+        chunk = {}
+        for name, dtype, count in sizes:
+            chunk[name] = np.frombuffer(data, dtype=dtype, count=count, offset=position)
+            position += dtype.itemsize * count
+
+        # Map the chunk's label list onto the recording-wide vocabulary
+        remap = []
+        for label in json.loads(data[position:end]):
+            if label not in label_index:
+                label_index[label] = len(label_names)
+                label_names.append(label)
+            remap.append(label_index[label])
+        remap = np.array(remap + [UNKNOWN], dtype=LABEL_DTYPE)
+        chunk['label_codes'] = remap[chunk['label_codes']]
+        chunk['landmarks'] = chunk['landmarks'].reshape(hands, NUM_LANDMARKS, 3)
+        for name, values in chunk.items():
+            columns[name].append(values)
+        offset = end
+
+    merged = {name: np.concatenate(values) if values else np.empty(0, dtype=dtypes[name])
+              for name, values in columns.items()}
+    merged['landmarks'] = merged['landmarks'].reshape(-1, NUM_LANDMARKS, 3)
+    return LandmarkRecording(metadata, label_names=label_names, **merged)
+
+
+def legacy_classifier():
+    """Batch classifier wrapping the original per-hand HandGestureDetector.detect_gesture"""
+    from test_hand_gestures import HandGestureDetector
+
+    # The rules don't touch the landmarker, so skip building one
+    rules = HandGestureDetector.__new__(HandGestureDetector)
+
+    def classify(landmarks):
+        return [rules.detect_gesture([Point(*lm) for lm in hand]) for hand in landmarks.tolist()]
+    return classify
+
+
+def replay(recording, classify=classify_batch, realtime=False, speed=1.0, on_frame=None,
+           batch_size=DEFAULT_CHUNK_SIZE):
+    """
+    Feed a recording back through a classifier
+
+    Without realtime or on_frame, hands are classified in large batches, as
+    fast as the classifier allows. Otherwise frames are replayed one at a time
+    and on_frame(index, timestamp, labels) is called for each; with realtime
+    the original frame timing is reproduced (scaled by speed).
+
+    Args:
+        recording: LandmarkRecording
+        classify: Function mapping an (n, 21, 3) array to n labels (None for no gesture)
+        realtime: Sleep between frames to match the recorded timestamps
+        speed: Playback speed factor for realtime
+        on_frame: Per-frame callback
+        batch_size: Hands per classifier call in max-speed mode
+
+    Returns:
+        (labels per hand, seconds)
+    """
+    start = time.perf_counter()
+    if not realtime and on_frame is None:
+        labels = []
+        for offset in range(0, recording.hands, batch_size):
+            labels.extend(classify(recording.landmarks[offset:offset + batch_size]))
+        return labels, time.perf_counter() - start
+
+    labels = []
+    offsets = recording.hand_offsets
+    first = recording.timestamps[0] if len(recording) else 0.0
+    for index in range(len(recording)):
+        timestamp = float(recording.timestamps[index])
+        if realtime:
+            delay = (timestamp - first) / speed - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+        hands = recording.landmarks[offsets[index]:offsets[index + 1]]
+        frame_labels = list(classify(hands)) if len(hands) else []
+        labels.extend(frame_labels)
+        if on_frame is not None:
+            on_frame(index, timestamp, frame_labels)
+    return labels, time.perf_counter() - start
+
+
+def compare_labels(recorded, replayed):
+    """Counter of (recorded, replayed) label pairs that differ"""
+    return Counter((before, after) for before, after in zip(recorded, replayed) if before != after)
+
+
+def print_info(recording, path):
+    counts = Counter(recording.labels())
+    print(f"Recording: {path}")
+    print(f"Frames: {len(recording)}  Hands: {recording.hands}  Duration: {recording.duration:.1f}s")
+    if recording.metadata:
+        print(f"Metadata: {json.dumps(recording.metadata, sort_keys=True)}")
+    for label, count in sorted(counts.items(), key=lambda item: -item[1]):
+        print(f"  {label or 'NONE':12s} {count:8d}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Inspect and replay landmark recordings')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    p = subparsers.add_parser('info', help='Frames, hands, duration and recorded label counts')
+    p.add_argument('recording')
+
+    p = subparsers.add_parser('replay', help='Classify recorded landmarks again and diff against the recorded labels')
+    p.add_argument('recording')
+    p.add_argument('--classifier', default='rules', choices=['rules', 'legacy', 'model'],
+                   help='rules: vectorized classifier; legacy: detect_gesture; model: learned model (default: rules)')
+    p.add_argument('--model', default=None, help='Learned model file for --classifier model')
+    p.add_argument('--threshold', action='append', default=[], metavar='NAME=VALUE',
+                   help='Override a gesture_classifier threshold, e.g. FINGER_EXTENDED_THRESHOLD=0.06')
+    p.add_argument('--realtime', action='store_true', help='Reproduce the recorded frame timing')
+    p.add_argument('--speed', type=float, default=1.0, help='Realtime playback speed factor (default: 1.0)')
+    p.add_argument('--events', action='store_true', help='Print replayed label changes as they happen')
+    p.add_argument('--max-changed', type=int, default=None,
+                   help='Exit with status 1 if more hands than this change label')
+
+    args = parser.parse_args()
+
+    try:
+        recording = load_recording(args.recording)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    if args.command == 'info':
+        print_info(recording, args.recording)
+        sys.exit(0)
+
+    if args.threshold:
+        from evaluate_gestures import apply_threshold_overrides
+        apply_threshold_overrides(args.threshold)
+    if args.classifier == 'legacy':
+        classify = legacy_classifier()
+    elif args.classifier == 'model':
+        from gesture_model import DEFAULT_MODEL_PATH, GestureModel
+        classify = GestureModel.load(args.model or DEFAULT_MODEL_PATH).predict_labels
+    else:
+        classify = classify_batch
+
+    on_frame = None
+    if args.events:
+        previous = []
+
+        def on_frame(index, timestamp, labels):
+            global previous
+            if labels != previous:
+                print(f"frame {int(recording.frame_indices[index]):7d} "
+                      f"t={timestamp - recording.timestamps[0]:8.3f}s  {labels}")
+                previous = labels
+
+    labels, seconds = replay(recording, classify, realtime=args.realtime, speed=args.speed, on_frame=on_frame)
+    changed = compare_labels(recording.labels(), labels)
+
+    print(f"Replayed {len(recording)} frames ({recording.hands} hands, {recording.duration:.1f}s recorded) "
+          f"in {seconds:.3f}s: {len(recording) / max(seconds, 1e-9):,.0f} frames/sec")
+    print(f"Labels changed: {sum(changed.values())} of {recording.hands} hands")
+    for (before, after), count in changed.most_common():
+        print(f"  {before or 'NONE':>10s} -> {after or 'NONE':<10s} {count:8d}")
+
+    if args.max_changed is not None and sum(changed.values()) > args.max_changed:
+        print(f"FAIL: more than {args.max_changed} labels changed")
+        sys.exit(1)
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Hand Landmarker Model Resolver
+Finds hand_landmarker.task for HandGestureDetector without surprises at startup:
+local copies first, then a per-user cache directory, and only then a download
+(with a timeout, written atomically into the cache). In offline mode a
+missing model fails immediately instead of touching the network.
+
+Checksums: pass an expected SHA-256 (--sha256 or GESTURE_MODEL_SHA256) to pin
+the model. Without one, the hash of the first download is recorded next to
+the cached file and every later load is checked against it.
+
+Environment:
+    GESTURE_MODEL_CACHE   Cache directory (default: $XDG_CACHE_HOME/cv_hand_gestures)
+    GESTURE_OFFLINE=1     Never download
+    GESTURE_MODEL_SHA256  Expected SHA-256 of hand_landmarker.task
+
+Usage:
+    python3 landmarker_model.py fetch
+    python3 landmarker_model.py verify
+    python3 landmarker_model.py path --offline
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+import zipfile
+
+MODEL_NAME = 'hand_landmarker.task'
+MODEL_URL = ("https://storage.googleapis.com/mediapipe-models/hand_landmarker/"
+             "hand_landmarker/float16/1/hand_landmarker.task")
+DOWNLOAD_TIMEOUT = 30
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+
+
+def cache_dir():
+    """Directory the model is downloaded to"""
+    if os.environ.get('GESTURE_MODEL_CACHE'):
+        return os.environ['GESTURE_MODEL_CACHE']
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'cv_hand_gestures')
+
+
+def is_offline():
+    return os.environ.get('GESTURE_OFFLINE', '').lower() in ('1', 'true', 'yes')
+
+
+def candidate_paths():
+    """Local model locations, in lookup order"""
+    return [
+        os.path.join(SCRIPT_DIR, MODEL_NAME),
+        os.path.join(PROJECT_ROOT, 'models', MODEL_NAME),
+        os.path.join(cache_dir(), MODEL_NAME),
+    ]
+
+
+def sha256_file(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _recorded_checksum(path):
+    try:
+        with open(path + '.sha256') as f:
+            return f.read().split()[0]
+    except (OSError, IndexError):
+        return None
+
+
+def verify(path, expected_sha256=None):
+    """
+    Check that a model file is a complete .task bundle and matches the
+    expected or recorded SHA-256
+
+    Without a checksum only the structure is checked: .task files are zip
+    archives, so an empty or truncated copy has no readable end of archive.
+
+    Raises:
+        ValueError: The file is empty, truncated or does not match
+    """
+    if os.path.getsize(path) == 0:
+        problem = "is empty"
+    elif not zipfile.is_zipfile(path):
+        problem = "is truncated or not a MediaPipe .task bundle"
+    else:
+        problem = None
+    if problem:
+        raise ValueError(f"{path} {problem}; delete it and download a fresh copy with: "
+                         f"python3 landmarker_model.py fetch")
+    expected = expected_sha256 or os.environ.get('GESTURE_MODEL_SHA256') or _recorded_checksum(path)
+    if not expected:
+        return
+    actual = sha256_file(path)
+    if actual != expected.lower():
+        raise ValueError(f"{path}: SHA-256 mismatch (expected {expected}, got {actual}); "
+                         f"delete it to download a fresh copy")
+
+
+def download(destination, url=MODEL_URL, expected_sha256=None, timeout=DOWNLOAD_TIMEOUT):
+    """Download url to destination atomically and record its checksum"""
+    import urllib.request
+
+    directory = os.path.dirname(destination)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=MODEL_NAME + '.', suffix='.part')
+    try:
+        digest = hashlib.sha256()
+        with os.fdopen(fd, 'wb') as out, urllib.request.urlopen(url, timeout=timeout) as response:
+            for chunk in iter(lambda: response.read(1 << 20), b''):
+                digest.update(chunk)
+                out.write(chunk)
+        actual = digest.hexdigest()
+        expected = expected_sha256 or os.environ.get('GESTURE_MODEL_SHA256')
+        if expected and actual != expected.lower():
+            raise ValueError(f"Downloaded model SHA-256 mismatch (expected {expected}, got {actual})")
+        if not zipfile.is_zipfile(temp_path):
+            # Connection closed early: do not cache and record a partial file
+            raise ValueError(f"Downloaded model from {url} is incomplete")
+        os.replace(temp_path, destination)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    with open(destination + '.sha256', 'w') as f:
+        f.write(f"{actual}  {MODEL_NAME}\n")
+    return destination
+
+
+def resolve_model(path=None, offline=None, expected_sha256=None):
+    """
+    Return the path of a usable hand_landmarker.task
+
+    Args:
+        path: Explicit model file; used as-is (no lookup, no download)
+        offline: Never download (default: GESTURE_OFFLINE environment variable)
+        expected_sha256: Pin the model checksum
+
+    Raises:
+        FileNotFoundError: No local model and downloading is disabled or failed
+        ValueError: The model does not match its checksum
+    """
+    if path:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Model file not found: {path}")
+        verify(path, expected_sha256)
+        return path
+
+    for candidate in candidate_paths():
+        if os.path.exists(candidate):
+            verify(candidate, expected_sha256)
+            return candidate
+
+    cached = os.path.join(cache_dir(), MODEL_NAME)
+    if offline if offline is not None else is_offline():
+        raise FileNotFoundError(
+            f"{MODEL_NAME} not found and offline mode is on. Looked in: {', '.join(candidate_paths())}. "
+            f"Fetch it on a connected machine with: python3 landmarker_model.py fetch")
+
+    print(f"Model not found. Downloading {MODEL_NAME} to {cached} ...")
+    try:
+        download(cached, expected_sha256=expected_sha256)
+    except OSError as e:
+        print(f"ERROR: Could not download model: {e}")
+        print(f"Please manually download from: {MODEL_URL}")
+        print(f"Save it as: {cached}")
+        raise FileNotFoundError("Model file not found and could not be downloaded") from e
+    print(f"Downloaded model to: {cached}")
+    return cached
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Locate, download and verify hand_landmarker.task')
+    parser.add_argument('command', choices=['path', 'fetch', 'verify'],
+                        help='path: print the resolved model; fetch: download into the cache if missing; '
+                             'verify: check the resolved model checksum')
+    parser.add_argument('--model', default=None, help='Explicit model file')
+    parser.add_argument('--offline', action='store_true', help='Never download')
+    parser.add_argument('--sha256', default=None, help='Expected SHA-256 of the model')
+
+    args = parser.parse_args()
+
+    # fetch always may download; the other commands follow --offline / GESTURE_OFFLINE
+    offline = False if args.command == 'fetch' else (args.offline or None)
+    try:
+        resolved = resolve_model(args.model, offline=offline, expected_sha256=args.sha256)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    if args.command == 'verify':
+        print(f"{resolved}: {sha256_file(resolved)}")
+    else:
+        print(resolved)
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Binary Landmark Sample Store
+Append-only columnar storage for labelled hand landmark samples, with an
+in-memory batch buffer and a background flush thread so collecting samples
+never blocks the UI loop
+
+A store is a directory:
+    meta.json       format version and label vocabulary
+    landmarks.f32   float32 little-endian, 63 values (21 x, y, z) per sample
+    labels.u16      uint16 little-endian index into the label vocabulary
+    timestamps.f64  float64 little-endian capture time (Unix seconds, NaN if unknown)
+
+Columns are raw arrays, so they can be memory-mapped for reading. Samples
+can be imported from and exported to the training CSV layout without loss.
+
+Compacted datasets written by compact_dataset.py use the same layout, sorted
+by label, with a per-label index and statistics in meta.json and no
+timestamps column. They are read-only: SampleStore refuses to append to them.
+
+Usage:
+    python3 sample_store.py import thumbs_up_training_data.csv samples/
+    python3 sample_store.py export samples/ out.csv
+    python3 sample_store.py info samples/
+"""
+
+import csv
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from gesture_dataset import CSV_HEADER, DEFAULT_CHUNK_SIZE, NUM_LANDMARKS, iter_csv_chunks
+
+FORMAT_NAME = 'gesture-samples'
+FORMAT_VERSION = 1
+
+META_FILE = 'meta.json'
+LANDMARKS_FILE = 'landmarks.f32'
+LABELS_FILE = 'labels.u16'
+TIMESTAMPS_FILE = 'timestamps.f64'
+
+LANDMARK_DTYPE = np.dtype('<f4')
+LABEL_DTYPE = np.dtype('<u2')
+TIMESTAMP_DTYPE = np.dtype('<f8')
+VALUES_PER_SAMPLE = NUM_LANDMARKS * 3
+
+
+def _read_meta(path):
+    with open(os.path.join(path, META_FILE)) as f:
+        meta = json.load(f)
+    if meta.get('format') != FORMAT_NAME:
+        raise ValueError(f"{path} is not a sample store")
+    if meta.get('version') != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported sample store version {meta.get('version')}")
+    return meta
+
+
+def _write_meta(path, labels):
+    meta = {'format': FORMAT_NAME, 'version': FORMAT_VERSION,
+            'num_landmarks': NUM_LANDMARKS, 'labels': list(labels)}
+    tmp_path = os.path.join(path, META_FILE + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, os.path.join(path, META_FILE))
+
+
+def is_sample_store(path):
+    return os.path.isfile(os.path.join(path, META_FILE))
+
+
+class SampleArrays:
+    """
+    Read-only view of a sample store
+
+    Attributes:
+        landmarks: (N, 21, 3) float32 array (memory-mapped unless loaded with mmap=False)
+        label_codes: (N,) uint16 array of indices into label_names
+        label_names: Label vocabulary
+        timestamps: (N,) float64 array
+        normalized: Landmarks are wrist-relative and scale-invariant
+                    (gesture_dataset.normalize_landmarks), not image coordinates
+        index: {label: {'offset', 'count'}} for label-sorted (compacted)
+               datasets, otherwise None
+    """
+
+    def __init__(self, landmarks, label_codes, label_names, timestamps, normalized=False, index=None):
+        self.landmarks = landmarks
+        self.label_codes = label_codes
+        self.label_names = list(label_names)
+        self.timestamps = timestamps
+        self.normalized = normalized
+        self.index = index
+
+    def __len__(self):
+        return len(self.label_codes)
+
+    def labels(self, start=0, stop=None):
+        """Label strings for samples [start, stop)"""
+        names = np.array(self.label_names, dtype=object)
+        return names[self.label_codes[start:stop]].tolist() if self.label_names else []
+
+    def select(self, label):
+        """
+        (n, 21, 3) landmarks of one label: a slice of the memory map when the
+        dataset is indexed, otherwise a copy selected by a label scan
+        """
+        if self.index is not None:
+            entry = self.index.get(label)
+            if entry is None:
+                return self.landmarks[:0]
+            return self.landmarks[entry['offset']:entry['offset'] + entry['count']]
+        if label not in self.label_names:
+            return self.landmarks[:0]
+        return self.landmarks[np.asarray(self.label_codes) == self.label_names.index(label)]
+
+    def iter_chunks(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Yield (labels, (n, 21, 3) landmarks) chunks, same shape as gesture_dataset.iter_csv_chunks"""
+        for start in range(0, len(self), chunk_size):
+            stop = min(start + chunk_size, len(self))
+            yield self.labels(start, stop), self.landmarks[start:stop]
+
+
+def load(path, mmap=True):
+    """
+    Open a sample store for reading
+
+    Only fully written samples are visible: if the writer is still running (or
+    crashed mid-flush) the shortest column decides the sample count. A store
+    without a timestamps column (a compacted dataset) reads as NaN timestamps.
+    """
+    meta = _read_meta(path)
+    has_timestamps = os.path.exists(os.path.join(path, TIMESTAMPS_FILE))
+    sizes = [
+        os.path.getsize(os.path.join(path, LANDMARKS_FILE)) // (LANDMARK_DTYPE.itemsize * VALUES_PER_SAMPLE),
+        os.path.getsize(os.path.join(path, LABELS_FILE)) // LABEL_DTYPE.itemsize,
+    ]
+    if has_timestamps:
+        sizes.append(os.path.getsize(os.path.join(path, TIMESTAMPS_FILE)) // TIMESTAMP_DTYPE.itemsize)
+    count = min(sizes)
+
+    def column(name, dtype, shape):
+        file_path = os.path.join(path, name)
+        if count == 0:
+            return np.empty(shape, dtype=dtype)
+        if mmap:
+            return np.memmap(file_path, dtype=dtype, mode='r', shape=shape)
+        return np.fromfile(file_path, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+
+    return SampleArrays(
+        column(LANDMARKS_FILE, LANDMARK_DTYPE, (count, NUM_LANDMARKS, 3)),
+        column(LABELS_FILE, LABEL_DTYPE, (count,)),
+        meta['labels'],
+        column(TIMESTAMPS_FILE, TIMESTAMP_DTYPE, (count,)) if has_timestamps else np.full(count, np.nan),
+        normalized=meta.get('normalized', False),
+        index=meta.get('index'),
+    )
+
+
+class SampleStore:
+    """
+    Buffered append-only writer for a sample store directory
+
+    append() only copies the sample into an in-memory batch; a background
+    thread writes batches when batch_size samples are pending or every
+    flush_interval seconds. Call close() (or use as a context manager) to
+    write the remaining samples.
+
+    If a background write fails, its batch is lost: the error is kept and
+    raised by the next append() and by close(), and nothing more is written.
+    """
+
+    def __init__(self, path, batch_size=256, flush_interval=1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        os.makedirs(path, exist_ok=True)
+        if is_sample_store(path):
+            meta = _read_meta(path)
+            if meta.get('index') is not None:
+                raise ValueError(f"{path} is a compacted dataset and cannot be appended to; "
+                                 f"collect into a new store and compact both")
+            self._label_names = meta['labels']
+            self.count = len(load(path))
+            # Drop any partially written trailing sample so new rows stay aligned
+            for name, row_bytes in ((LANDMARKS_FILE, LANDMARK_DTYPE.itemsize * VALUES_PER_SAMPLE),
+                                    (LABELS_FILE, LABEL_DTYPE.itemsize),
+                                    (TIMESTAMPS_FILE, TIMESTAMP_DTYPE.itemsize)):
+                with open(os.path.join(path, name), 'r+b') as f:
+                    f.truncate(self.count * row_bytes)
+        else:
+            self._label_names = []
+            _write_meta(path, self._label_names)
+            self.count = 0
+        self._label_codes = {name: i for i, name in enumerate(self._label_names)}
+        self._meta_dirty = False
+
+        self._files = {
+            LANDMARKS_FILE: open(os.path.join(path, LANDMARKS_FILE), 'ab'),
+            LABELS_FILE: open(os.path.join(path, LABELS_FILE), 'ab'),
+            TIMESTAMPS_FILE: open(os.path.join(path, TIMESTAMPS_FILE), 'ab'),
+        }
+
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        # First exception raised by a background flush
+        self._error = None
+        self._pending_landmarks = []
+        self._pending_labels = []
+        self._pending_timestamps = []
+        self._pending_count = 0
+
+        self._thread = threading.Thread(target=self._flush_loop, name='sample-store-flush', daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def append(self, landmarks, label, timestamp=None):
+        """
+        Queue one sample for writing
+
+        Args:
+            landmarks: (21, 3) array or 21 landmark objects with .x/.y/.z
+            label: Gesture label string
+            timestamp: Capture time in Unix seconds (default: now)
+
+        Returns:
+            Total number of samples in the store, including pending ones
+        """
+        if not isinstance(landmarks, np.ndarray):
+            landmarks = [(lm.x, lm.y, lm.z) for lm in landmarks]
+        landmarks = np.asarray(landmarks, dtype=LANDMARK_DTYPE).reshape(NUM_LANDMARKS, 3)
+        return self.append_batch(landmarks[np.newaxis], [label],
+                                 [time.time() if timestamp is None else timestamp])
+
+    def append_batch(self, landmarks, labels, timestamps=None):
+        """Queue an (n, 21, 3) batch of samples with n labels (and optional n timestamps)"""
+        landmarks = np.asarray(landmarks, dtype=LANDMARK_DTYPE).reshape(-1, NUM_LANDMARKS, 3)
+        if len(labels) != len(landmarks):
+            raise ValueError(f"Got {len(labels)} labels for {len(landmarks)} samples")
+        if timestamps is None:
+            timestamps = np.full(len(labels), time.time())
+
+        with self._lock:
+            if self._error is not None:
+                raise self._error
+            if self._closed:
+                raise ValueError("Sample store is closed")
+            codes = np.empty(len(labels), dtype=LABEL_DTYPE)
+            for i, label in enumerate(labels):
+                code = self._label_codes.get(label)
+                if code is None:
+                    if len(self._label_names) > np.iinfo(LABEL_DTYPE).max:
+                        raise ValueError("Too many distinct labels for sample store")
+                    code = self._label_codes[label] = len(self._label_names)
+                    self._label_names.append(label)
+                    self._meta_dirty = True
+                codes[i] = code
+
+            self._pending_landmarks.append(landmarks)
+            self._pending_labels.append(codes)
+            self._pending_timestamps.append(np.asarray(timestamps, dtype=TIMESTAMP_DTYPE))
+            self.count += len(landmarks)
+            self._pending_count += len(landmarks)
+            pending = self._pending_count
+            count = self.count
+
+        if pending >= self.batch_size:
+            self._wake.set()
+        return count
+
+    def flush(self):
+        """Write all pending samples now (on the calling thread)"""
+        with self._write_lock:
+            with self._lock:
+                landmarks, self._pending_landmarks = self._pending_landmarks, []
+                labels, self._pending_labels = self._pending_labels, []
+                timestamps, self._pending_timestamps = self._pending_timestamps, []
+                self._pending_count = 0
+                label_names = list(self._label_names) if self._meta_dirty else None
+                self._meta_dirty = False
+
+            if not labels:
+                return
+            # Vocabulary first, so a reader never sees a code without its label
+            if label_names is not None:
+                _write_meta(self.path, label_names)
+            self._files[LANDMARKS_FILE].write(np.concatenate(landmarks).tobytes())
+            self._files[LABELS_FILE].write(np.concatenate(labels).tobytes())
+            self._files[TIMESTAMPS_FILE].write(np.concatenate(timestamps).tobytes())
+            for f in self._files.values():
+                f.flush()
+
+    def close(self):
+        """
+        Stop the flush thread and write any remaining samples
+
+        Raises:
+            The exception of a failed background flush, after closing the files
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._wake.set()
+        self._thread.join()
+        try:
+            if self._error is None:
+                self.flush()
+        finally:
+            for f in self._files.values():
+                f.close()
+        if self._error is not None:
+            raise self._error
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"ERROR: Sample store flush failed: {e}")
+                # A batch may be half written: stop writing and report it to the writer
+                with self._lock:
+                    self._error = e
+                return
+
+
+def import_csv(csv_path, store_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Append every row of a training CSV to a sample store
+
+    CSV values are float32 landmarks printed as decimals, so the conversion is
+    exact. The CSV has no timestamps; imported samples get NaN.
+
+    Returns:
+        Number of samples imported
+    """
+    imported = 0
+    with SampleStore(store_path, batch_size=chunk_size) as store:
+        for labels, landmarks in iter_csv_chunks(csv_path, chunk_size):
+            store.append_batch(landmarks, labels, np.full(len(labels), np.nan))
+            imported += len(labels)
+    return imported
+
+
+def export_csv(store_path, csv_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Write a sample store out in the training CSV layout (timestamps are dropped)
+
+    Values are written with the shortest repr that round-trips the float32
+    value, so importing the CSV again gives identical landmarks.
+
+    Returns:
+        Number of samples exported
+    """
+    arrays = load(store_path)
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        for labels, landmarks in arrays.iter_chunks(chunk_size):
+            # str() of a NumPy float32 is its shortest round-tripping repr
+            # ('0.1', not float64's '0.10000000149011612')
+            for label, values in zip(labels, landmarks.reshape(len(labels), VALUES_PER_SAMPLE)):
+                writer.writerow([label] + [str(value) for value in values])
+    return len(arrays)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Manage binary landmark sample stores')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    p = subparsers.add_parser('import', help='Append a training CSV to a sample store')
+    p.add_argument('csv', help='Training CSV file')
+    p.add_argument('store', help='Sample store directory (created if missing)')
+
+    p = subparsers.add_parser('export', help='Write a sample store as a training CSV')
+    p.add_argument('store', help='Sample store directory')
+    p.add_argument('csv', help='Output CSV file')
+
+    p = subparsers.add_parser('info', help='Show sample counts per label')
+    p.add_argument('store', help='Sample store directory')
+
+    args = parser.parse_args()
+
+    if args.command == 'import':
+        count = import_csv(args.csv, args.store)
+        print(f"Imported {count} samples from {args.csv} into {args.store}")
+    elif args.command == 'export':
+        count = export_csv(args.store, args.csv)
+        print(f"Exported {count} samples from {args.store} to {args.csv}")
+    else:
+        arrays = load(args.store)
+        print(f"{args.store}: {len(arrays)} samples")
+        codes, counts = np.unique(np.asarray(arrays.label_codes), return_counts=True)
+        for code, count in zip(codes, counts):
+            print(f"  {arrays.label_names[code]:>12}: {count}")
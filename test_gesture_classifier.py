@@ -0,0 +1,95 @@
+"""
+Equivalence of the vectorized classifier (gesture_classifier) with the scalar
+HandGestureDetector.detect_gesture rules
+
+Run with: python3 -m pytest test_gesture_classifier.py
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pytest
+
+from gesture_classifier import GESTURE_LABELS, classify_batch, classify_landmarks
+from test_hand_gestures import HandGestureDetector
+
+Point = namedtuple('Point', 'x y z')
+
+FINGER_TIPS = (8, 12, 16, 20)
+FINGER_PIPS = (6, 10, 14, 18)
+
+# Which of index, middle, ring, pinky are extended, and whether the thumb points up
+POSES = {
+    'STOP': ((True, True, True, True), False),
+    '3': ((True, True, True, False), False),
+    '2': ((True, True, False, False), False),
+    '1': ((True, False, False, False), False),
+    'THUMBS_UP': ((False, False, False, False), True),
+    None: ((False, False, False, False), False),
+}
+
+
+def make_hand(extended, thumb_up):
+    """Upright (21, 3) hand: wrist at the bottom, PIP joints in the middle"""
+    hand = np.zeros((21, 3), dtype=np.float32)
+    hand[:, 0] = np.linspace(0.3, 0.7, 21)
+    hand[:, 1] = 0.6
+    hand[0] = (0.5, 0.9, 0.0)
+    for tip, pip, is_extended in zip(FINGER_TIPS, FINGER_PIPS, extended):
+        hand[pip, 1] = 0.5
+        hand[tip, 1] = 0.3 if is_extended else 0.6
+    # Thumb MCP, IP and tip
+    hand[2] = (0.35, 0.6, 0.0)
+    hand[3] = (0.35, 0.5, 0.0)
+    hand[4] = (0.36, 0.3, 0.0) if thumb_up else (0.65, 0.95, 0.0)
+    return hand
+
+
+def detect_gesture(hand):
+    # The rules don't touch the landmarker, so skip building one
+    detector = HandGestureDetector.__new__(HandGestureDetector)
+    return detector.detect_gesture([Point(*lm) for lm in hand.tolist()])
+
+
+def assert_equivalent(hands):
+    expected = [detect_gesture(hand) for hand in hands]
+    assert classify_batch(hands) == expected
+    return expected
+
+
+@pytest.mark.parametrize('label', list(POSES), ids=str)
+def test_hand_built_pose(label):
+    hand = make_hand(*POSES[label])
+    assert detect_gesture(hand) == label
+    assert classify_batch(hand[np.newaxis]) == [label]
+    assert classify_landmarks(hand) == label
+
+
+def test_random_hands():
+    hands = np.random.default_rng(0).random((2000, 21, 3), dtype=np.float32)
+    assert_equivalent(hands)
+
+
+def test_jittered_poses_cover_every_label():
+    rng = np.random.default_rng(1)
+    base = np.stack([make_hand(*pose) for pose in POSES.values()])
+    picks = base[rng.integers(0, len(base), 3000)]
+    hands = (picks + rng.normal(0, 0.04, picks.shape)).astype(np.float32)
+    expected = assert_equivalent(hands)
+    assert set(expected) == set(GESTURE_LABELS) | {None}
+
+
+def test_threshold_boundaries():
+    # Finger tips exactly on the extended/closed thresholds and the thumb on its score thresholds
+    hands = []
+    for offset in (-0.05, -0.03, 0.0, 0.03, 0.05):
+        for thumb_y in (0.48, 0.5, 0.59, 0.92):
+            hand = make_hand((True, True, False, False), True)
+            hand[list(FINGER_TIPS), 1] = hand[list(FINGER_PIPS), 1] + offset
+            hand[4, 1] = thumb_y
+            hands.append(hand)
+    assert_equivalent(np.stack(hands))
+
+
+def test_empty_batch():
+    assert classify_batch(np.zeros((0, 21, 3), dtype=np.float32)) == []
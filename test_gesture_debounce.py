@@ -0,0 +1,76 @@
+"""
+Replay test for gesture_debounce: a fixed, flickery label sequence must turn
+into a short, predictable stream of start/hold/end events
+
+Run with: python3 -m pytest test_gesture_debounce.py
+"""
+
+from gesture_debounce import GestureDebouncer, replay
+
+# 8 fps keeps every timestamp (frame / 8) exact in binary
+FPS = 8.0
+
+SESSION = (
+    # 0-6: STOP flickers in; its 5th frame within the window (6) starts it
+    ['STOP', None, 'STOP', 'STOP', '1', 'STOP', 'STOP']
+    # 7-22: single-frame dropouts while held never reach exit_frames
+    + ['STOP', None, 'STOP', '1', 'STOP', 'STOP', None, 'STOP'] * 2
+    # 23-26: hand lowered; the 3rd missing frame (25) ends STOP
+    + [None] * 4
+    # 27-38: '2' fills 5 window frames at 31, after the 0.5 s cooldown (29)
+    + ['2'] * 12
+)
+
+
+def run(**settings):
+    options = dict(window=8, enter_frames=5, exit_frames=3, cooldown=0.5, hold_interval=1.0)
+    options.update(settings)
+    raw_changes, events, _ = replay(SESSION, GestureDebouncer(**options), fps=FPS)
+    return raw_changes, [(event.kind, event.gesture, event.frame_index) for event in events]
+
+
+def test_replay_events():
+    raw_changes, events = run()
+    assert events == [
+        ('start', 'STOP', 6),
+        ('hold', 'STOP', 14),
+        ('hold', 'STOP', 22),
+        ('end', 'STOP', 25),
+        ('start', '2', 31),
+        # Ended by replay's flush one frame after the last label
+        ('end', '2', 39),
+    ]
+    assert len(events) < raw_changes
+
+
+def test_event_durations():
+    _, events, _ = replay(SESSION, GestureDebouncer(window=8, enter_frames=5, exit_frames=3, cooldown=0.5),
+                          fps=FPS)
+    assert [event.duration for event in events if event.kind != 'start'] == [1.0, 2.0, 19 / FPS, 1.0]
+
+
+def test_exit_frames_delay_the_end():
+    _, events = run(exit_frames=5)
+    # The '2' frames also count as missing STOP frames
+    assert ('end', 'STOP', 27) in events
+    assert ('end', 'STOP', 25) not in events
+
+
+def test_cooldown_delays_the_next_start():
+    _, events = run(cooldown=1.0)
+    assert ('start', '2', 33) in events
+
+    _, events = run(cooldown=2.0)
+    assert [kind for kind, gesture, _ in events] == ['start', 'hold', 'hold', 'end']
+
+
+def test_no_hold_events():
+    _, events = run(hold_interval=None)
+    assert [kind for kind, _, _ in events] == ['start', 'end', 'start', 'end']
+
+
+def test_low_confidence_frames_do_not_start_a_gesture():
+    session = [('STOP', 0.5)] * 20
+    raw_changes, events, _ = replay(session, GestureDebouncer(), fps=FPS)
+    assert raw_changes == 1
+    assert events == []
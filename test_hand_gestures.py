@@ -7,76 +7,215 @@ Prints landmarks and detected gestures (Thumbs Up, Stop, 1, 2, 3)
 This is a LOCAL TEST ONLY - not integrated with OBS yet
 """
 
-import cv2
-import mediapipe as mp
-from mediapipe.tasks import python
-from mediapipe.tasks.python import vision
-from mediapipe import ImageFormat
 import sys
 import os
+import threading
+import time
 import numpy as np
 
+from camera_discovery import candidate_devices, discover_camera
+from gesture_classifier import classify_batch, hands_to_array
+from gesture_debounce import GestureDebouncer
+from gesture_sinks import GestureEvent, JsonLinesSink
+from gesture_tracking import HandTracker
+from landmarker_model import resolve_model
+
 # Add project root to path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
+# OpenCV and MediaPipe take most of a second to import, so they are loaded
+# by load_backends() when the first detector is built; tooling that only
+# needs detect_gesture or the constants below never pays for them
+cv2 = None
+mp = None
+python = None
+vision = None
+ImageFormat = None
+
+# Landmarker running modes selectable from the command line (vision.RunningMode names)
+# IMAGE runs palm detection on every frame; VIDEO and LIVE_STREAM track the hand
+# between frames and only re-run palm detection when tracking is lost
+RUNNING_MODES = {
+    'image': 'IMAGE',
+    'video': 'VIDEO',
+    'live_stream': 'LIVE_STREAM',
+}
+
+WINDOW_NAME = 'Hand Gesture Detection - Camera 1'
+
+# Landmarker (detection, presence, tracking) minimum confidences
+DEFAULT_CONFIDENCE = (0.7, 0.5, 0.5)
+
+# Handedness labels swap when landmarks are mirrored instead of the pixels
+MIRRORED_HANDEDNESS = {'Left': 'Right', 'Right': 'Left'}
+
+def load_backends():
+    """Import OpenCV and MediaPipe into this module's globals (idempotent)"""
+    global cv2, mp, python, vision, ImageFormat
+    if vision is None:
+        import cv2 as _cv2
+        import mediapipe as _mp
+        from mediapipe.tasks import python as _python
+        from mediapipe.tasks.python import vision as _vision
+        from mediapipe import ImageFormat as _ImageFormat
+        cv2, mp, python, ImageFormat = _cv2, _mp, _python, _ImageFormat
+        vision = _vision
+
+
+def parse_size(value):
+    """Parse a WIDTHxHEIGHT string such as '640x360' into a (width, height) tuple"""
+    try:
+        width, height = (int(part) for part in value.lower().split('x'))
+    except ValueError:
+        raise ValueError(f"Expected WIDTHxHEIGHT, got: {value}")
+    return width, height
+
 class HandGestureDetector:
-    def __init__(self, camera_device='/dev/elp_1'):
+    # Smallest ROI crop as a fraction of the shorter frame side, so a distant
+    # hand still gets enough context for the landmark model
+    ROI_MIN_FRACTION = 0.25
+    
+    def __init__(self, camera_device='/dev/elp_1', running_mode='image',
+                 inference_size=None, roi=False, roi_margin=0.3,
+                 classifier='rules', model_path=None, metrics=None, mirror=True, scheduler=None,
+                 landmarker_path=None, offline=None, warmup=False, num_hands=1, quality=None):
         """
         Initialize hand gesture detector
         
         Args:
             camera_device: Path to camera device or numeric index (default: /dev/elp_1)
                           Use 0 for default laptop camera on macOS/Windows
+            running_mode: Landmarker running mode: 'image' (detect every frame),
+                          'video' (detect_for_video with tracking) or
+                          'live_stream' (detect_async with a result callback)
+            inference_size: (width, height) box the frame is downscaled to fit
+                            before detection (default: full capture resolution)
+            roi: Crop detection to the previous frame's hand bounding box,
+                 falling back to a full-frame search when the hand is lost
+            roi_margin: Margin added around the hand box on each side, as a
+                        fraction of the box size
+            classifier: 'rules' (hand-tuned detect_gesture thresholds) or 'model'
+                        (learned classifier trained with gesture_model.py)
+            model_path: Model file for classifier='model' (default: gesture_model.npz
+                        next to this script)
+            metrics: gesture_metrics.Metrics to record counters and stage
+                     latencies into (default: None, no instrumentation)
+            mirror: Report landmarks as seen in a mirror (selfie view). Frames
+                    are not flipped for detection; landmark x is mirrored after
+                    inference and only the display image is flipped
+            scheduler: gesture_scheduler.InferenceScheduler that decides which
+                       frames run inference (default: None, every frame); on
+                       skipped frames process_frame returns the previous result
+            landmarker_path: hand_landmarker.task to use (default: resolved by
+                             landmarker_model.resolve_model from local copies
+                             and the model cache, downloading if needed)
+            offline: Fail instead of downloading a missing landmarker model
+                     (default: GESTURE_OFFLINE environment variable)
+            warmup: Run one inference on a blank frame so the first camera
+                    frame does not pay for lazy graph initialisation
+            num_hands: Maximum number of hands the landmarker detects; every
+                       hand gets a stable track ID and its own gesture events
+            quality: gesture_quality.QualityController that steps inference
+                     size, frame skip, landmarker confidences and the overlay
+                     down to hold a latency budget (default: None, fixed quality)
         """
+        if running_mode not in RUNNING_MODES:
+            raise ValueError(f"Unknown running mode: {running_mode} (expected one of {', '.join(RUNNING_MODES)})")
+        if roi and running_mode != 'image':
+            # The landmarker's own tracking works in input-image coordinates,
+            # which shift every time the crop moves
+            raise ValueError("ROI mode requires running_mode='image'")
+        self.running_mode = running_mode
+        self.inference_size = tuple(inference_size) if inference_size else None
+        self._base_inference_size = self.inference_size
+        self.roi = roi
+        self.roi_margin = roi_margin
+        self._roi_box = None
+        self.metrics = metrics
+        self.mirror = mirror
+        self.scheduler = scheduler
+        
+        # Quality tier last applied to the landmarker and preprocessing, and
+        # whether the GUI overlay is drawn
+        self.quality = quality
+        self._quality_tier = None
+        self.overlay = True
+        
+        # Reusable pixel buffers (grown on demand) so preprocessing and
+        # display mirroring do not allocate a new frame every time
+        self._resize_buffer = np.empty(0, dtype=np.uint8)
+        self._rgb_buffer = np.empty(0, dtype=np.uint8)
+        self._display_buffer = np.empty(0, dtype=np.uint8)
+        
+        # Per-loop gesture state: last printed gesture (GUI), printed gesture
+        # per track and (hand index, gesture) per track already reported to
+        # the sink (headless)
+        self.sink = None
+        self._last_gesture = None
+        self._printed_gestures = {}
+        self._hand_gestures = {}
+        self._debounce = None
+        self._debouncers = {}
+        # False when pipeline worker threads outlived stop(); run() then
+        # leaves the camera and landmarker open
+        self._workers_stopped = True
+        self.num_hands = num_hands
+        self.tracker = HandTracker()
+        
+        # Landmark array of the last result, shared by classification,
+        # tracking, drawing and recording
+        self._array_result = None
+        self._array = None
+        
+        # landmark_recorder.LandmarkRecorder that classified frames are appended to
+        self.recorder = None
+        
+        # gesture_renderer.OverlayRenderer for the GUI preview (set by run)
+        self.renderer = None
+        
+        # Learned classifier is loaded once here and reused for every frame
+        self.classifier = classifier
+        self.gesture_model = None
+        if classifier == 'model':
+            from gesture_model import DEFAULT_MODEL_PATH, GestureModel
+            model_path = model_path or DEFAULT_MODEL_PATH
+            if not os.path.exists(model_path):
+                raise FileNotFoundError(f"Gesture model not found: {model_path} "
+                                        f"(train one with: python3 gesture_model.py train <data.csv>)")
+            self.gesture_model = GestureModel.load(model_path)
+            print(f"Loaded gesture model: {model_path} (labels: {', '.join(self.gesture_model.labels)})")
+        elif classifier != 'rules':
+            raise ValueError(f"Unknown classifier: {classifier} (expected 'rules' or 'model')")
+        
         # Convert string "0" to integer 0 for easier handling
         if isinstance(camera_device, str) and camera_device.isdigit():
             self.camera_device = int(camera_device)
         else:
             self.camera_device = camera_device
         
-        # MediaPipe 0.10.x uses tasks-based API
-        # Try to find model in script directory first (for local use), then project root
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        model_path = None
+        # Local copy, model cache or (unless offline) a one-time download
+        landmarker_path = resolve_model(landmarker_path, offline=offline)
+        load_backends()
         
-        # Check in script directory (for local standalone use)
-        local_model = os.path.join(script_dir, 'hand_landmarker.task')
-        if os.path.exists(local_model):
-            model_path = local_model
-        else:
-            # Check in project models directory
-            project_model = os.path.join(project_root, 'models', 'hand_landmarker.task')
-            if os.path.exists(project_model):
-                model_path = project_model
-            else:
-                # Try to download it to script directory
-                print("Model not found. Downloading hand_landmarker.task...")
-                import urllib.request
-                model_url = "https://storage.googleapis.com/mediapipe-models/hand_landmarker/hand_landmarker/float16/1/hand_landmarker.task"
-                try:
-                    os.makedirs(script_dir, exist_ok=True)
-                    urllib.request.urlretrieve(model_url, local_model)
-                    model_path = local_model
-                    print(f"Downloaded model to: {local_model}")
-                except Exception as e:
-                    print(f"ERROR: Could not download model: {e}")
-                    print(f"Please manually download from: {model_url}")
-                    print(f"Save it as: {local_model}")
-                    raise FileNotFoundError(f"Model file not found and could not be downloaded")
-        
-        if not model_path or not os.path.exists(model_path):
-            raise FileNotFoundError(f"Model file not found: {model_path}")
-        
-        base_options = python.BaseOptions(model_asset_path=model_path)
-        options = vision.HandLandmarkerOptions(
-            base_options=base_options,
-            num_hands=1,
-            min_hand_detection_confidence=0.7,
-            min_hand_presence_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
-        self.hand_landmarker = vision.HandLandmarker.create_from_options(options)
+        # Timestamps for VIDEO/LIVE_STREAM modes must increase monotonically
+        self._last_timestamp_ms = -1
+        self._start_time = time.monotonic()
+        
+        # Latest result delivered by the LIVE_STREAM callback
+        self._async_lock = threading.Lock()
+        self._async_result = vision.HandLandmarkerResult(handedness=[], hand_landmarks=[], hand_world_landmarks=[])
+        
+        # Result handed out again for frames the scheduler skips
+        self._last_result = vision.HandLandmarkerResult(handedness=[], hand_landmarks=[], hand_world_landmarks=[])
+        
+        self._landmarker_path = landmarker_path
+        self.confidence = DEFAULT_CONFIDENCE
+        self.hand_landmarker = self._create_landmarker(self.confidence)
+        if quality is not None:
+            self.apply_quality(quality.tier)
+        if warmup:
+            self.warm_up()
         
         # Hand landmark indices (MediaPipe uses 21 landmarks)
         # https://google.github.io/mediapipe/solutions/hands.html
@@ -88,6 +227,64 @@ class HandGestureDetector:
             'PINKY_MCP', 'PINKY_PIP', 'PINKY_DIP', 'PINKY_TIP'
         ]
     
+    def _create_landmarker(self, confidence):
+        """
+        HandLandmarker for this detector's model, running mode and hand count
+        
+        Args:
+            confidence: (detection, presence, tracking) minimum confidences
+        """
+        detection, presence, tracking = confidence
+        base_options = python.BaseOptions(model_asset_path=self._landmarker_path)
+        options = vision.HandLandmarkerOptions(
+            base_options=base_options,
+            running_mode=getattr(vision.RunningMode, RUNNING_MODES[self.running_mode]),
+            num_hands=self.num_hands,
+            min_hand_detection_confidence=detection,
+            min_hand_presence_confidence=presence,
+            min_tracking_confidence=tracking,
+            result_callback=self._on_async_result if self.running_mode == 'live_stream' else None
+        )
+        return vision.HandLandmarker.create_from_options(options)
+    
+    def apply_quality(self, tier):
+        """
+        Switch to a gesture_quality.QualityTier
+        
+        The tier's inference size only ever shrinks the configured one. New
+        confidence thresholds need a new landmarker, so call this from the
+        thread that runs detection.
+        """
+        size = tier.inference_size
+        base = self._base_inference_size
+        if size is None or (base is not None and base[0] * base[1] <= size[0] * size[1]):
+            size = base
+        self.inference_size = size
+        
+        confidence = (tier.detection_confidence, tier.presence_confidence, tier.tracking_confidence)
+        if confidence != self.confidence:
+            self.hand_landmarker.close()
+            self.hand_landmarker = self._create_landmarker(confidence)
+            self.confidence = confidence
+        self.overlay = tier.overlay
+        self._quality_tier = tier
+    
+    def warm_up(self):
+        """
+        Run one inference on a blank frame
+        
+        MediaPipe initialises parts of the graph on the first detect call;
+        doing it here keeps that spike off the first camera frame.
+        
+        Returns:
+            Seconds the warm-up inference took
+        """
+        width, height = self.inference_size or (640, 480)
+        start = time.perf_counter()
+        blank = np.zeros((height, width, 3), dtype=np.uint8)
+        self.detect(mp.Image(image_format=ImageFormat.SRGB, data=blank))
+        return time.perf_counter() - start
+    
     def calculate_distance(self, point1, point2):
         """Calculate Euclidean distance between two 3D points"""
         return ((point1.x - point2.x)**2 + (point1.y - point2.y)**2 + (point1.z - point2.z)**2)**0.5
@@ -220,9 +417,56 @@ class HandGestureDetector:
         
         return None
     
-    def print_landmarks_new(self, landmarks_list, hand_landmarks):
-        """Print all hand landmarks in a readable format (MediaPipe 0.10.x format)"""
-        if not hand_landmarks:
+    def hands_array(self, detection_result):
+        """(N, 21, 3) landmark array of a detection result, converted once per result"""
+        if detection_result is not self._array_result:
+            self._array = hands_to_array(detection_result.hand_landmarks)
+            self._array_result = detection_result
+        return self._array
+    
+    def classify_hands(self, hands, with_confidence=False):
+        """
+        Classify all hands from a detection result in one batch
+        
+        Args:
+            hands: List of per-hand landmark lists (HandLandmarkerResult.hand_landmarks)
+                   or an (N, 21, 3) array
+            with_confidence: Also return a confidence per hand (the learned
+                             model's probability; always 1.0 for the rules)
+        
+        Returns:
+            List of gesture names (or None) in the same order as hands, or
+            (gestures, confidences) with with_confidence=True
+        """
+        metrics = self.metrics
+        if metrics is not None:
+            start = time.perf_counter()
+        
+        landmarks = hands if isinstance(hands, np.ndarray) else hands_to_array(hands)
+        if self.gesture_model is not None:
+            gestures, confidences = self.gesture_model.predict_labels_with_confidence(landmarks)
+        else:
+            gestures = classify_batch(landmarks)
+            confidences = [1.0] * len(gestures)
+        
+        if metrics is not None:
+            metrics.observe('classify', time.perf_counter() - start)
+            for gesture in gestures:
+                if gesture:
+                    metrics.inc('gestures_total', gesture=gesture)
+        if with_confidence:
+            return gestures, confidences
+        return gestures
+    
+    def print_landmarks_new(self, landmarks_list, gesture):
+        """
+        Print all hand landmarks in a readable format (MediaPipe 0.10.x format)
+        
+        Args:
+            landmarks_list: Landmarks of one hand
+            gesture: Gesture already classified for this hand, or None
+        """
+        if not landmarks_list:
             return
         
         print("\n" + "="*80)
@@ -233,8 +477,6 @@ class HandGestureDetector:
             name = self.LANDMARK_NAMES[idx] if idx < len(self.LANDMARK_NAMES) else f"LANDMARK_{idx}"
             print(f"{name:20s} | X: {landmark.x:7.4f} | Y: {landmark.y:7.4f} | Z: {landmark.z:7.4f}")
         
-        # Detect and print gesture
-        gesture = self.detect_gesture(landmarks_list)
         if gesture:
             print(f"\n>>> DETECTED GESTURE: {gesture} <<<")
         else:
@@ -242,184 +484,597 @@ class HandGestureDetector:
         
         print("="*80 + "\n")
     
-    def run(self):
-        """Main loop: capture from camera and detect hand gestures"""
-        print(f"Starting hand gesture detection on {self.camera_device}")
-        print("Press 'q' to quit")
-        print("Gestures to test: Thumbs Up, Stop, 1, 2, 3\n")
-        
-        # Try to open camera device
-        # Cross-platform support: try device path, then try as index, then try default (0)
-        cap = None
-        devices_to_try = []
+    def open_camera(self, properties=(1920, 1080, 30)):
+        """
+        Open the configured camera, falling back to common device paths/indices
         
-        # Add the specified device first
-        devices_to_try.append(self.camera_device)
+        Uses camera_discovery: the device cached by the last successful start
+        is opened directly, otherwise all candidates are probed concurrently.
         
-        # On Linux, try common video device paths
-        if sys.platform == 'linux':
-            devices_to_try.extend(['/dev/video0', '/dev/video2', '/dev/video1'])
+        Args:
+            properties: (width, height, fps) to request from the camera
         
-        # Also try as numeric index (for macOS/Windows or if path doesn't work)
-        try:
-            # Try to extract number from device path
-            if 'video' in self.camera_device or 'elp' in self.camera_device.lower():
-                import re
-                numbers = re.findall(r'\d+', self.camera_device)
-                if numbers:
-                    devices_to_try.append(int(numbers[0]))
-        except:
-            pass
-        
-        # Always try default camera (index 0) as fallback
-        devices_to_try.append(0)
-        
-        for device in devices_to_try:
-            try:
-                # Try as integer index first (works on all platforms)
-                if isinstance(device, int):
-                    cap = cv2.VideoCapture(device)
-                # Try as device path (Linux)
-                elif isinstance(device, str) and os.path.exists(device):
-                    # If it's a symlink, try to resolve
-                    if os.path.islink(device):
-                        device_path = os.readlink(device)
-                        if 'video' in device_path:
-                            device_index = int(device_path.replace('video', ''))
-                            cap = cv2.VideoCapture(device_index)
-                        else:
-                            continue
-                    elif 'video' in device:
-                        # Extract video device number
-                        try:
-                            device_index = int(device.replace('/dev/video', '').replace('/dev/elp_', ''))
-                            cap = cv2.VideoCapture(device_index)
-                        except:
-                            # Try direct path
-                            cap = cv2.VideoCapture(device)
-                    else:
-                        cap = cv2.VideoCapture(device)
-                else:
-                    continue
-                
-                if cap and cap.isOpened():
-                    # Test if we can actually read a frame
-                    ret, test_frame = cap.read()
-                    if ret and test_frame is not None:
-                        device_name = f"index {device}" if isinstance(device, int) else device
-                        print(f"Opened camera: {device_name}")
-                        break
-                    else:
-                        if cap:
-                            cap.release()
-                        cap = None
-            except Exception as e:
-                if cap:
-                    cap.release()
-                    cap = None
-                continue
-        
-        if not cap or not cap.isOpened():
+        Returns:
+            Opened cv2.VideoCapture, or None if no device could be opened
+        """
+        cap, info = discover_camera(self.camera_device, properties)
+        if cap is None:
             print("ERROR: Could not open camera device")
-            print(f"Tried: {devices_to_try}")
+            print(f"Tried: {candidate_devices(self.camera_device)}")
             print("\nTip: On macOS/Windows, try: python3 test_hand_gestures.py --camera 0")
+            return None
+        
+        device = info['device']
+        device_name = f"index {device}" if isinstance(device, int) else device
+        print(f"Opened camera: {device_name} ({info['width']}x{info['height']}"
+              f"{' @ %g fps' % info['fps'] if info['fps'] else ''}{', cached' if info['cached'] else ''})")
+        return cap
+    
+    def _on_async_result(self, result, output_image, timestamp_ms):
+        """LIVE_STREAM result callback (runs on a MediaPipe thread)"""
+        # Mirror here, once per result: detect() may hand out the same result for several frames
+        if self.mirror:
+            self._mirror_result(result)
+        with self._async_lock:
+            self._async_result = result
+    
+    def _next_timestamp_ms(self, timestamp_ms=None):
+        """Return a strictly increasing timestamp for detect_for_video/detect_async"""
+        if timestamp_ms is None:
+            timestamp_ms = int((time.monotonic() - self._start_time) * 1000)
+        timestamp_ms = max(int(timestamp_ms), self._last_timestamp_ms + 1)
+        self._last_timestamp_ms = timestamp_ms
+        return timestamp_ms
+    
+    def detect(self, mp_image, timestamp_ms=None):
+        """
+        Run the landmarker in the configured running mode
+        
+        In 'live_stream' mode the frame is submitted asynchronously and the most
+        recent completed result is returned, which may belong to an earlier frame.
+        
+        Args:
+            mp_image: mp.Image in SRGB format
+            timestamp_ms: Frame timestamp for video/live_stream modes (default: monotonic clock)
+        """
+        if self.running_mode == 'video':
+            return self.hand_landmarker.detect_for_video(mp_image, self._next_timestamp_ms(timestamp_ms))
+        if self.running_mode == 'live_stream':
+            self.hand_landmarker.detect_async(mp_image, self._next_timestamp_ms(timestamp_ms))
+            with self._async_lock:
+                return self._async_result
+        return self.hand_landmarker.detect(mp_image)
+    
+    def _buffer(self, name, shape):
+        """Contiguous uint8 array of shape backed by the reusable flat buffer self.<name>"""
+        size = shape[0] * shape[1] * shape[2]
+        buffer = getattr(self, name)
+        if buffer.size < size:
+            buffer = np.empty(size, dtype=np.uint8)
+            setattr(self, name, buffer)
+        return buffer[:size].reshape(shape)
+    
+    def _resize_for_inference(self, image):
+        """Downscale image to fit inside inference_size (never upscales) into a reusable buffer"""
+        if not self.inference_size:
+            return image
+        h, w = image.shape[:2]
+        scale = min(self.inference_size[0] / w, self.inference_size[1] / h)
+        if scale >= 1.0:
+            return image
+        size = (max(1, int(w * scale)), max(1, int(h * scale)))
+        dst = self._buffer('_resize_buffer', (size[1], size[0], image.shape[2]))
+        return cv2.resize(image, size, dst=dst, interpolation=cv2.INTER_AREA)
+    
+    def preprocess(self, frame, box=None):
+        """
+        Crop, downscale and convert a BGR frame to the RGB array the landmarker needs
+        
+        Writes into reusable buffers: the result is only valid until the next
+        call (mp.Image copies it, so this is safe for all running modes).
+        
+        Args:
+            frame: BGR frame
+            box: (x0, y0, x1, y1) pixel region (default: whole frame)
+        """
+        if box is not None:
+            x0, y0, x1, y1 = box
+            frame = frame[y0:y1, x0:x1]
+        region = self._resize_for_inference(frame)
+        return cv2.cvtColor(region, cv2.COLOR_BGR2RGB, dst=self._buffer('_rgb_buffer', region.shape))
+    
+    def _mirror_result(self, detection_result):
+        """Mirror a result horizontally in place, as if detection had run on a flipped frame"""
+        for hand_landmarks in detection_result.hand_landmarks:
+            for landmark in hand_landmarks:
+                landmark.x = 1.0 - landmark.x
+        for hand_world_landmarks in detection_result.hand_world_landmarks:
+            for landmark in hand_world_landmarks:
+                landmark.x = -landmark.x
+        for categories in detection_result.handedness:
+            for category in categories:
+                category.category_name = MIRRORED_HANDEDNESS.get(category.category_name, category.category_name)
+                category.display_name = MIRRORED_HANDEDNESS.get(category.display_name, category.display_name)
+    
+    def display_frame(self, frame):
+        """
+        Frame to draw overlays on and show: with mirroring on, a flipped copy in
+        a reusable buffer (valid until the next call), otherwise frame itself
+        """
+        if not self.mirror:
+            return frame
+        return cv2.flip(frame, 1, dst=self._buffer('_display_buffer', frame.shape))
+    
+    def _detect_region(self, frame, box, timestamp_ms=None):
+        """
+        Run detection on the (x0, y0, x1, y1) pixel region of frame
+        
+        Landmarks are mapped back to normalized full-frame coordinates.
+        """
+        metrics = self.metrics
+        if metrics is not None:
+            start = time.perf_counter()
+        
+        h, w = frame.shape[:2]
+        x0, y0, x1, y1 = box
+        
+        # Crop, downscale and convert BGR to RGB (MediaPipe requires RGB)
+        rgb_frame = self.preprocess(frame, box)
+        
+        # Convert to MediaPipe Image format
+        mp_image = mp.Image(image_format=ImageFormat.SRGB, data=rgb_frame)
+        
+        if metrics is not None:
+            detect_start = time.perf_counter()
+            metrics.observe('preprocess', detect_start - start)
+        
+        # Process frame with MediaPipe 0.10.x API
+        detection_result = self.detect(mp_image, timestamp_ms)
+        
+        if metrics is not None:
+            metrics.observe('detect', time.perf_counter() - detect_start)
+        
+        if box != (0, 0, w, h):
+            scale_x = (x1 - x0) / w
+            scale_y = (y1 - y0) / h
+            for hand_landmarks in detection_result.hand_landmarks:
+                for landmark in hand_landmarks:
+                    landmark.x = x0 / w + landmark.x * scale_x
+                    landmark.y = y0 / h + landmark.y * scale_y
+                    # z uses roughly the same scale as x
+                    landmark.z = landmark.z * scale_x
+        return detection_result
+    
+    def _roi_from_result(self, detection_result, w, h):
+        """Square pixel box around all detected hands plus margin, or None if no hand"""
+        if not detection_result.hand_landmarks:
+            return None
+        xs = [lm.x for hand in detection_result.hand_landmarks for lm in hand]
+        ys = [lm.y for hand in detection_result.hand_landmarks for lm in hand]
+        cx = (min(xs) + max(xs)) / 2 * w
+        cy = (min(ys) + max(ys)) / 2 * h
+        size = max((max(xs) - min(xs)) * w, (max(ys) - min(ys)) * h) * (1 + 2 * self.roi_margin)
+        size = max(size, self.ROI_MIN_FRACTION * min(w, h))
+        half = size / 2
+        return (int(max(0, cx - half)), int(max(0, cy - half)),
+                int(min(w, cx + half)), int(min(h, cy + half)))
+    
+    def process_frame(self, frame, timestamp_ms=None):
+        """
+        Run hand landmark detection on a camera frame
+        
+        Detection runs at inference_size and, in ROI mode, only on the region
+        around the previous frame's hand. Landmarks are always normalized to
+        the full frame and, with mirror on, mirrored horizontally; draw them on
+        display_frame(frame).
+        
+        Args:
+            frame: BGR frame as returned by cv2.VideoCapture.read() (not modified)
+            timestamp_ms: Frame timestamp for video/live_stream modes (default: monotonic clock)
+        
+        Returns:
+            Tuple of (frame, MediaPipe HandLandmarkerResult)
+        """
+        quality = self.quality
+        if quality is not None:
+            if quality.tier is not self._quality_tier:
+                self.apply_quality(quality.tier)
+            if not quality.should_detect():
+                if self.metrics is not None:
+                    self.metrics.inc('quality_skipped_frames_total')
+                return frame, self._last_result
+        
+        scheduler = self.scheduler
+        if scheduler is not None and not scheduler.should_detect(frame):
+            if self.metrics is not None:
+                self.metrics.inc('frames_skipped_total')
+            return frame, self._last_result
+        
+        h, w = frame.shape[:2]
+        full_box = (0, 0, w, h)
+        
+        box = self._roi_box if self.roi and self._roi_box else full_box
+        detection_result = self._detect_region(frame, box, timestamp_ms)
+        
+        if self.roi:
+            if box != full_box and not detection_result.hand_landmarks:
+                # Hand left the crop - search the whole frame again
+                detection_result = self._detect_region(frame, full_box, timestamp_ms)
+            # The ROI box is tracked in unmirrored frame coordinates
+            self._roi_box = self._roi_from_result(detection_result, w, h)
+        
+        # LIVE_STREAM results are mirrored in the result callback
+        if self.mirror and self.running_mode != 'live_stream':
+            self._mirror_result(detection_result)
+        
+        self._last_result = detection_result
+        if scheduler is not None:
+            scheduler.update(bool(detection_result.hand_landmarks))
+        
+        if self.metrics is not None:
+            self.metrics.inc('frames_processed_total')
+            self.metrics.inc('hands_detected_total', len(detection_result.hand_landmarks))
+        return frame, detection_result
+    
+    def draw_hands(self, frame, hands, gestures, track_ids=None):
+        """
+        Draw landmarks, connections and gesture label for each hand onto frame
+        
+        Args:
+            frame: BGR frame to draw on (modified in place)
+            hands: List of per-hand landmark lists in normalized frame coordinates,
+                   or an (N, 21, 3) array
+            gestures: Gesture name (or None) per hand
+            track_ids: Track ID per hand, shown next to its label
+        """
+        from gesture_renderer import draw_hands
+        draw_hands(frame, hands if isinstance(hands, np.ndarray) else hands_to_array(hands), gestures, track_ids)
+    
+    def track_hands(self, detection_result):
+        """
+        Stable track IDs for the hands of a detection result
+        
+        Returns:
+            (track IDs in hand order, IDs of tracks that ended on this frame)
+        """
+        track_ids = self.tracker.update(self.hands_array(detection_result))
+        return track_ids, self.tracker.ended
+    
+    def render_detection(self, frame, detection_result, frame_count, last_gesture):
+        """
+        Draw landmarks and gesture label on frame, printing landmarks when the gesture changes
+        
+        Args:
+            frame: Image to draw on, or None to classify and print without drawing
+        
+        Returns:
+            The gesture to remember as last_gesture for the next frame
+        """
+        track_ids, ended = self.track_hands(detection_result)
+        for track_id in ended:
+            self._printed_gestures.pop(track_id, None)
+        
+        if detection_result.hand_landmarks:
+            # Classify every hand in the frame in one vectorized call
+            hands = self.hands_array(detection_result)
+            gestures = self.classify_hands(hands)
+            self.record_detection(detection_result, gestures, frame_count)
+            if frame is not None:
+                self.draw_hands(frame, hands, gestures, track_ids)
+            
+            printed = self._printed_gestures
+            for hand_landmarks, gesture, track_id in zip(detection_result.hand_landmarks, gestures, track_ids):
+                # Print landmarks and gesture (only when this hand's gesture changes or every 30 frames)
+                if gesture != printed.get(track_id, last_gesture) or frame_count % 30 == 0:
+                    self.print_landmarks_new(hand_landmarks, gesture)
+                    printed[track_id] = gesture
+                    last_gesture = gesture
+        else:
+            self.record_detection(detection_result, [], frame_count)
+            # No hand detected
+            if frame_count % 60 == 0:
+                print("No hand detected in frame")
+        
+        return last_gesture
+    
+    def record_detection(self, detection_result, gestures, frame_count, timestamp=None):
+        """Append a classified frame to self.recorder, if recording"""
+        if self.recorder is not None:
+            self.recorder.record(detection_result, gestures, timestamp, frame_count,
+                                 landmarks=self.hands_array(detection_result))
+    
+    def emit_detection(self, detection_result, frame_count, timestamp=None):
+        """
+        Headless counterpart of render_detection: classify hands and send
+        gesture events to self.sink. No drawing and no printing.
+        
+        Events are per track (see track_hands), so two people keep separate
+        gesture streams however the landmarker orders their hands. Without
+        debouncing, one 'change' event is sent per track whose gesture differs
+        from the previous frame (gesture None when a gesture ends or the hand
+        is lost). With debouncing, each track's labels go through its own
+        GestureDebouncer and only its start/hold/end events are sent; a
+        track's held gesture ends when the track does.
+        """
+        hands = self.hands_array(detection_result)
+        timestamp = time.time() if timestamp is None else timestamp
+        track_ids, ended = self.track_hands(detection_result)
+        
+        if self._debounce is not None:
+            gestures, confidences = self.classify_hands(hands, with_confidence=True) if len(hands) else ([], [])
+            self.record_detection(detection_result, gestures, frame_count, timestamp)
+            debouncers = self._debouncers
+            for hand_index, track_id in enumerate(track_ids):
+                debouncer = debouncers.get(track_id)
+                if debouncer is None:
+                    debouncer = debouncers[track_id] = GestureDebouncer(hand_index=hand_index, track_id=track_id,
+                                                                        **self._debounce)
+                debouncer.hand_index = hand_index
+                event = debouncer.update(gestures[hand_index], confidences[hand_index], timestamp, frame_count)
+                if event is not None:
+                    self.sink.emit(event)
+            # Tracks not seen on this frame count as "no gesture"; ended tracks end their gesture
+            present = set(track_ids)
+            for track_id in list(debouncers):
+                if track_id in present:
+                    continue
+                if track_id in ended:
+                    event = debouncers.pop(track_id).flush(timestamp, frame_count)
+                else:
+                    event = debouncers[track_id].update(None, 1.0, timestamp, frame_count)
+                if event is not None:
+                    self.sink.emit(event)
             return
         
-        # Set camera properties
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1920)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 1080)
-        cap.set(cv2.CAP_PROP_FPS, 30)
+        gestures = self.classify_hands(hands) if len(hands) else []
+        self.record_detection(detection_result, gestures, frame_count, timestamp)
+        current = {track_id: (hand_index, gesture)
+                   for hand_index, (track_id, gesture) in enumerate(zip(track_ids, gestures))}
+        previous = self._hand_gestures
+        self._hand_gestures = current
+        if current == previous:
+            return
+        
+        for track_id, (hand_index, gesture) in current.items():
+            before = previous.get(track_id, (None, None))[1]
+            if gesture != before:
+                self.sink.emit(GestureEvent(gesture, timestamp, frame_count, hand_index, track_id=track_id))
+        for track_id, (hand_index, before) in previous.items():
+            if track_id not in current and before is not None:
+                # Hand lost: its gesture ended
+                self.sink.emit(GestureEvent(None, timestamp, frame_count, hand_index, track_id=track_id))
+    
+    def configure_events(self, sink, debounce=None):
+        """
+        Set where emit_detection sends gesture events and reset its state
+        
+        Args:
+            sink: gesture_sinks.GestureSink
+            debounce: None for raw per-frame changes, True for default
+                      debouncing or a dict of GestureDebouncer keyword arguments
+        """
+        self.sink = sink
+        self._hand_gestures = {}
+        self._debounce = ({} if debounce is True else dict(debounce)) if debounce else None
+        self._debouncers = {}
+        self.tracker.reset()
+    
+    def flush_events(self, timestamp=None):
+        """Send end events for gestures still held by the debouncers"""
+        timestamp = time.time() if timestamp is None else timestamp
+        for debouncer in self._debouncers.values():
+            event = debouncer.flush(timestamp)
+            if event is not None:
+                self.sink.emit(event)
+    
+    def gestures(self, max_pending=32, debounce=None):
+        """
+        Async iterator of GestureEvents for asyncio applications
+        
+            async with detector.gestures() as events:
+                async for event in events:
+                    ...
+        
+        Capture and inference run on background threads; see gesture_async.py.
+        Closing or cancelling the stream releases the camera and closes the landmarker.
+        
+        Args:
+            max_pending: Events buffered for a slow consumer before the oldest are dropped
+            debounce: As for configure_events
+        """
+        from gesture_async import GestureStream
+        return GestureStream(self, max_pending=max_pending, debounce=debounce)
+    
+    def _show_frame(self, frame, detection_result, frame_count):
+        """
+        GUI frame handler: classify and print every frame, draw and display
+        the preview when the renderer is due (overlays only while the quality
+        tier allows them); returns False when 'q' is pressed
+        """
+        renderer = self.renderer
+        if not renderer.due():
+            self._last_gesture = self.render_detection(None, detection_result, frame_count, self._last_gesture)
+            return True
+        preview = renderer.preview(frame)
+        self._last_gesture = self.render_detection(preview if self.overlay else None, detection_result,
+                                                   frame_count, self._last_gesture)
+        cv2.imshow(WINDOW_NAME, preview)
+        return (cv2.waitKey(1) & 0xFF) != ord('q')
+    
+    def _emit_frame(self, frame, detection_result, frame_count):
+        """Headless frame handler; runs until the camera fails or the process is interrupted"""
+        self.emit_detection(detection_result, frame_count)
+        return True
+    
+    def run(self, pipelined=False, headless=False, sink=None, debounce=None, recorder=None,
+            preview_width=960, display_fps=30.0):
+        """
+        Main loop: capture from camera and detect hand gestures
+        
+        Args:
+            pipelined: Run capture, inference and rendering on separate threads,
+                       dropping stale frames instead of queueing them
+            headless: Skip overlays, landmark printing and the preview window;
+                      gesture changes go to sink as GestureEvents instead
+            sink: gesture_sinks.GestureSink for headless mode
+                  (default: JSON lines on stdout)
+            debounce: Send debounced start/hold/end events instead of raw
+                      per-frame changes in headless mode: True for the default
+                      settings or a dict of GestureDebouncer keyword arguments
+            recorder: landmark_recorder.LandmarkRecorder to record every
+                      classified frame into (closed when the loop ends)
+            preview_width: GUI preview width; frames are downscaled to it
+                           before drawing (None: full resolution)
+            display_fps: Maximum GUI preview refresh rate, independent of the
+                         capture and inference rate (None: every frame)
+        """
+        self.recorder = recorder
+        if headless:
+            self.configure_events(sink if sink is not None else JsonLinesSink(), debounce)
+            handle_frame, stage = self._emit_frame, 'emit'
+        else:
+            print(f"Starting hand gesture detection on {self.camera_device}")
+            print("Press 'q' to quit")
+            print("Gestures to test: Thumbs Up, Stop, 1, 2, 3\n")
+            from gesture_renderer import OverlayRenderer
+            self.renderer = OverlayRenderer(preview_width, display_fps, mirror=self.mirror)
+            self._last_gesture = None
+            self._printed_gestures = {}
+            self.tracker.reset()
+            handle_frame, stage = self._show_frame, 'render'
+        
+        # Opened inside the try so the sink, recorder and landmarker are
+        # closed even when no camera can be opened
+        cap = None
+        self._workers_stopped = True
+        try:
+            # Requests 1920x1080 @ 30 fps
+            cap = self.open_camera()
+            if cap is None:
+                return
+            if pipelined:
+                self._run_pipelined(cap, handle_frame, stage)
+            else:
+                self._run_serial(cap, handle_frame, stage)
+        except KeyboardInterrupt:
+            print("\nInterrupted by user")
+        finally:
+            if cap is not None and self._workers_stopped:
+                cap.release()
+            if headless:
+                # End gestures still held so consumers see a matching end event
+                self.flush_events()
+                self.sink.close()
+            else:
+                cv2.destroyAllWindows()
+                stats = self.renderer.stats()
+                print(f"\nDisplay: refreshes={stats['refreshes']} skipped={stats['skipped']}")
+            if self._workers_stopped:
+                self.hand_landmarker.close()
+            if self.recorder is not None:
+                self.recorder.close()
+                print(f"\nRecorded {self.recorder.frames} frames to {self.recorder.path}")
+            if self.scheduler is not None:
+                stats = self.scheduler.stats()
+                print(f"\nScheduler: frames={stats['frames']} detections={stats['detections']} "
+                      f"skipped={stats['skipped']} motion_wakeups={stats['motion_wakeups']}")
+            if self.quality is not None:
+                stats = self.quality.stats()
+                print(f"\nQuality: tier={stats['tier']} budget={stats['budget_ms']:g}ms "
+                      f"downgrades={stats['downgrades']} upgrades={stats['upgrades']}")
+            print("\nHand gesture detection stopped")
+    
+    def _run_serial(self, cap, handle_frame, stage):
+        """Capture, detect and handle every frame on the calling thread"""
+        frame_count = 0
+        metrics = self.metrics
+        quality = self.quality
+        frame = None
+        
+        while True:
+            if metrics is not None:
+                frame_start = time.perf_counter()
+            
+            # Decode into the previous frame's array; nothing holds on to it
+            # once handle_frame returns
+            ret, frame = cap.read(frame)
+            if not ret:
+                print("Failed to read frame from camera")
+                break
+            
+            frame_count += 1
+            if metrics is not None:
+                metrics.inc('frames_captured_total')
+                metrics.observe('capture', time.perf_counter() - frame_start)
+            if quality is not None:
+                # Processing time only; waiting for the camera is not latency we can shed
+                process_start = time.perf_counter()
+            
+            frame, detection_result = self.process_frame(frame)
+            
+            if metrics is not None:
+                handle_start = time.perf_counter()
+            
+            keep_running = handle_frame(frame, detection_result, frame_count)
+            
+            if metrics is not None:
+                now = time.perf_counter()
+                metrics.observe(stage, now - handle_start)
+                metrics.observe('frame', now - frame_start)
+            if quality is not None:
+                quality.observe(time.perf_counter() - process_start)
+            
+            if not keep_running:
+                break
+    
+    def _run_pipelined(self, cap, handle_frame, stage):
+        """Handle results from a FramePipeline; capture and inference run on worker threads"""
+        from gesture_pipeline import FramePipeline
+        
+        # Keep the driver queue short so the capture thread always sees fresh frames
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        
+        pipeline = FramePipeline(self, cap)
+        pipeline.start()
         
         frame_count = 0
-        last_gesture = None
         
         try:
             while True:
-                ret, frame = cap.read()
-                if not ret:
-                    print("Failed to read frame from camera")
-                    break
+                result = pipeline.get_result(timeout=0.5)
+                if result is None:
+                    if not pipeline.is_running():
+                        print("Failed to read frame from camera")
+                        break
+                    continue
                 
                 frame_count += 1
+                if self.metrics is not None:
+                    handle_start = time.perf_counter()
                 
-                # Flip frame horizontally for mirror effect
-                frame = cv2.flip(frame, 1)
-                
-                # Convert BGR to RGB (MediaPipe requires RGB)
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
-                # Convert to MediaPipe Image format
-                mp_image = mp.Image(image_format=ImageFormat.SRGB, data=rgb_frame)
+                keep_running = handle_frame(result.frame, result.detection_result, frame_count)
                 
-                # Process frame with MediaPipe 0.10.x API
-                detection_result = self.hand_landmarker.detect(mp_image)
+                if self.metrics is not None:
+                    self.metrics.observe(stage, time.perf_counter() - handle_start)
+                    # Capture-to-output latency, including time spent queued
+                    self.metrics.observe('frame', result.age)
+                if self.quality is not None:
+                    self.quality.observe(result.age)
                 
-                # Draw hand landmarks on frame
-                if detection_result.hand_landmarks:
-                    for hand_landmarks in detection_result.hand_landmarks:
-                        # Convert MediaPipe landmarks to drawing format
-                        # MediaPipe 0.10.x returns normalized coordinates
-                        h, w, _ = frame.shape
-                        landmark_points = []
-                        for landmark in hand_landmarks:
-                            x = int(landmark.x * w)
-                            y = int(landmark.y * h)
-                            landmark_points.append((x, y))
-                            # Draw landmark point
-                            cv2.circle(frame, (x, y), 5, (0, 255, 0), -1)
-                        
-                        # Draw connections (simplified - draw key connections)
-                        connections = [
-                            (0, 1), (1, 2), (2, 3), (3, 4),  # Thumb
-                            (0, 5), (5, 6), (6, 7), (7, 8),  # Index
-                            (0, 9), (9, 10), (10, 11), (11, 12),  # Middle
-                            (0, 13), (13, 14), (14, 15), (15, 16),  # Ring
-                            (0, 17), (17, 18), (18, 19), (19, 20),  # Pinky
-                            (5, 9), (9, 13), (13, 17)  # Base connections
-                        ]
-                        for start_idx, end_idx in connections:
-                            if start_idx < len(landmark_points) and end_idx < len(landmark_points):
-                                cv2.line(frame, landmark_points[start_idx], landmark_points[end_idx], (255, 0, 0), 2)
-                        
-                        # Detect gesture (convert to old format for compatibility)
-                        # Create a simple landmark-like object
-                        class Landmark:
-                            def __init__(self, x, y, z):
-                                self.x = x
-                                self.y = y
-                                self.z = z
-                        
-                        landmarks_list = [Landmark(lm.x, lm.y, lm.z) for lm in hand_landmarks]
-                        gesture = self.detect_gesture(landmarks_list)
-                        
-                        # Print landmarks and gesture (only when gesture changes or every 30 frames)
-                        if gesture != last_gesture or frame_count % 30 == 0:
-                            self.print_landmarks_new(landmarks_list, hand_landmarks)
-                            last_gesture = gesture
-                        
-                        # Draw gesture text on frame
-                        if gesture:
-                            cv2.putText(frame, f"GESTURE: {gesture}", (10, 30),
-                                      cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-                else:
-                    # No hand detected
-                    if frame_count % 60 == 0:
-                        print("No hand detected in frame")
-                
-                # Display frame
-                cv2.imshow('Hand Gesture Detection - Camera 1', frame)
-                
-                # Check for quit
-                if cv2.waitKey(1) & 0xFF == ord('q'):
+                if not keep_running:
                     break
-                    
-        except KeyboardInterrupt:
-            print("\nInterrupted by user")
         finally:
-            cap.release()
-            cv2.destroyAllWindows()
-            self.hand_landmarker.close()
-            print("\nHand gesture detection stopped")
+            # run() must not release the camera or close the landmarker
+            # under a thread still stuck in cap.read() or process_frame()
+            self._workers_stopped = pipeline.stop()
+            if not self._workers_stopped:
+                print("WARNING: Pipeline threads did not stop; camera and landmarker left open")
+            stats = pipeline.stats()
+            print(f"\nPipeline: captured={stats['frames_captured']} "
+                  f"processed={stats['frames_processed']} "
+                  f"dropped_capture={stats['dropped_capture']} "
+                  f"dropped_stale={stats['dropped_stale']} "
+                  f"dropped_render={stats['dropped_render']}")
 
 if __name__ == "__main__":
     import argparse
@@ -427,8 +1082,109 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Test hand gesture detection on Camera 1')
     parser.add_argument('--camera', default='/dev/elp_1',
                        help='Camera device path or index (default: /dev/elp_1, use 0 for default laptop camera)')
+    parser.add_argument('--pipelined', action='store_true',
+                       help='Run capture and inference on separate threads, dropping stale frames')
+    parser.add_argument('--running-mode', default='image', choices=list(RUNNING_MODES),
+                       help='Landmarker running mode (default: image; video/live_stream reuse hand tracking)')
+    parser.add_argument('--inference-size', type=parse_size, default=None,
+                       help='Downscale frames to fit WIDTHxHEIGHT before detection (e.g. 640x360)')
+    parser.add_argument('--roi', action='store_true',
+                       help='Detect only around the previous hand position (image running mode only)')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                       help='Collect metrics and serve them on http://127.0.0.1:PORT/metrics')
+    parser.add_argument('--classifier', default='rules', choices=['rules', 'model'],
+                       help='Gesture classifier: hand-tuned rules or learned model (default: rules)')
+    parser.add_argument('--model', default=None,
+                       help='Learned model file for --classifier model (default: gesture_model.npz)')
+    parser.add_argument('--no-mirror', action='store_true',
+                       help='Report landmarks and show the preview unmirrored (default: mirrored selfie view)')
+    parser.add_argument('--scheduler', action='store_true',
+                       help='Back off inference while no hand is seen, waking up on motion')
+    parser.add_argument('--idle-after', type=float, default=1.0,
+                       help='Scheduler: seconds without a hand before backing off (default: 1.0)')
+    parser.add_argument('--idle-interval', type=float, default=0.5,
+                       help='Scheduler: seconds between inferences while idle, i.e. worst-case time '
+                            'to first detection without motion (default: 0.5)')
+    parser.add_argument('--active-fps', type=float, default=None,
+                       help='Scheduler: cap inferences per second while a hand is present (default: every frame)')
+    parser.add_argument('--motion-threshold', type=float, default=6.0,
+                       help='Scheduler: mean grey-level change (0-255) that counts as motion (default: 6)')
+    parser.add_argument('--landmarker-model', default=None,
+                       help='hand_landmarker.task to use (default: local copy or model cache)')
+    parser.add_argument('--offline', action='store_true',
+                       help='Fail fast if the landmarker model is missing instead of downloading it')
+    parser.add_argument('--warmup', action='store_true',
+                       help='Run one inference on a blank frame at startup')
+    parser.add_argument('--latency-budget', type=float, default=None, metavar='MS',
+                       help='Adapt inference size, frame skip, landmarker confidences and overlays '
+                            'to keep per-frame latency under MS milliseconds')
+    parser.add_argument('--num-hands', type=int, default=1,
+                       help='Maximum hands to detect; each gets a track ID and its own events (default: 1)')
+    parser.add_argument('--headless', action='store_true',
+                       help='No window, overlays or landmark printing; send gesture events to --sink')
+    parser.add_argument('--sink', default='stdout',
+                       help='Headless event sink: stdout (JSON lines), none or tcp://HOST:PORT (default: stdout)')
+    parser.add_argument('--debounce', action='store_true',
+                       help='Headless: send debounced start/hold/end events instead of every label change')
+    parser.add_argument('--enter-frames', type=int, default=5,
+                       help='Debounce: frames out of the last 8 a gesture needs to start (default: 5)')
+    parser.add_argument('--exit-frames', type=int, default=6,
+                       help='Debounce: consecutive frames without the gesture before it ends (default: 6)')
+    parser.add_argument('--cooldown', type=float, default=0.5,
+                       help='Debounce: seconds after a gesture ends before another may start (default: 0.5)')
+    parser.add_argument('--preview-width', type=int, default=960,
+                       help='GUI preview width; overlays are drawn on the downscaled preview (default: 960, 0: full size)')
+    parser.add_argument('--display-fps', type=float, default=30.0,
+                       help='Maximum GUI preview refresh rate, independent of inference (default: 30, 0: every frame)')
+    parser.add_argument('--record', default=None, metavar='PATH',
+                       help='Record landmarks, handedness and labels of every frame (replay with landmark_recorder.py)')
     
     args = parser.parse_args()
     
-    detector = HandGestureDetector(camera_device=args.camera)
-    detector.run()
+    sink = None
+    if args.headless:
+        from gesture_sinks import create_sink
+        sink = create_sink(args.sink)
+    
+    # In headless mode stdout carries the event stream, so status messages go to stderr
+    import contextlib
+    with contextlib.redirect_stdout(sys.stderr) if args.headless else contextlib.nullcontext():
+        metrics = None
+        if args.metrics_port is not None:
+            from gesture_metrics import Metrics, start_metrics_server
+            metrics = Metrics()
+            start_metrics_server(metrics, port=args.metrics_port)
+        
+        scheduler = None
+        if args.scheduler:
+            from gesture_scheduler import InferenceScheduler
+            scheduler = InferenceScheduler(idle_after=args.idle_after, idle_interval=args.idle_interval,
+                                           active_fps=args.active_fps, motion_threshold=args.motion_threshold)
+        
+        quality = None
+        if args.latency_budget:
+            from gesture_quality import QualityController
+            quality = QualityController(budget_ms=args.latency_budget, metrics=metrics)
+        
+        detector = HandGestureDetector(camera_device=args.camera, running_mode=args.running_mode,
+                                       inference_size=args.inference_size, roi=args.roi,
+                                       classifier=args.classifier, model_path=args.model,
+                                       metrics=metrics, mirror=not args.no_mirror, scheduler=scheduler,
+                                       landmarker_path=args.landmarker_model, offline=args.offline or None,
+                                       warmup=args.warmup, num_hands=args.num_hands, quality=quality)
+        debounce = None
+        if args.debounce:
+            debounce = {'enter_frames': args.enter_frames, 'exit_frames': args.exit_frames,
+                        'cooldown': args.cooldown}
+        recorder = None
+        if args.record:
+            from landmark_recorder import LandmarkRecorder
+            recorder = LandmarkRecorder(args.record, metadata={
+                'camera': str(args.camera), 'running_mode': args.running_mode,
+                'classifier': args.classifier, 'mirror': not args.no_mirror})
+        detector.run(pipelined=args.pipelined, headless=args.headless, sink=sink, debounce=debounce,
+                     recorder=recorder, preview_width=args.preview_width or None,
+                     display_fps=args.display_fps or None)
+        
+        if metrics is not None:
+            metrics.print_summary()
@@ -1,63 +1,236 @@
 #!/usr/bin/env python3
 """
-Training script for collecting thumbs up gesture data
-Captures hand landmarks when user presses SPACE, saves to CSV for analysis
+Training script for collecting gesture data
+Captures hand landmarks when user presses SPACE, saves to CSV (or a binary
+sample store, see sample_store.py) for analysis
+
+Any detect_gesture label can be collected (plus NONE for negatives). In
+burst mode every frame with a hand is captured for the selected label;
+near-identical poses are rejected by a NearDuplicateFilter so holding a pose
+does not fill the dataset with copies, and rows are written by a background
+thread so capturing never stalls the preview.
 """
 
 import cv2
-import mediapipe as mp
-from mediapipe.tasks import python
-from mediapipe.tasks.python import vision
-from mediapipe import ImageFormat
 import csv
 import os
+import queue
 import sys
+import threading
+import time
 import numpy as np
 from datetime import datetime
 
 # Import the detector to use same model
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from test_hand_gestures import HandGestureDetector
+from test_hand_gestures import HandGestureDetector, RUNNING_MODES, parse_size
+from gesture_classifier import GESTURE_LABELS, hands_to_array
+from gesture_dataset import CSV_HEADER, NearDuplicateFilter, iter_csv_chunks
+import sample_store
+from sample_store import SampleStore
+
+# Default output per storage format
+DEFAULT_OUTPUTS = {
+    'csv': 'thumbs_up_training_data.csv',
+    'binary': 'thumbs_up_training_data.samples',
+}
+
+# Label selection keys; NONE (no gesture) collects negatives
+LABEL_KEYS = {
+    ord('t'): 'THUMBS_UP',
+    ord('s'): 'STOP',
+    ord('1'): '1',
+    ord('2'): '2',
+    ord('3'): '3',
+    ord('n'): 'NONE',
+}
+TRAINING_LABELS = tuple(GESTURE_LABELS) + ('NONE',)
+
+class CsvSampleWriter:
+    """
+    Appends samples to a training CSV from a background thread
+
+    append() only queues the row; the writer thread keeps the file open and
+    writes whatever has queued up in one go. Same append/close interface as
+    SampleStore.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'a', newline='')
+        self._writer = csv.writer(self._file)
+        if new_file:
+            # Write header: 21 landmarks * 3 coordinates (x, y, z) = 63 columns + gesture label
+            self._writer.writerow(CSV_HEADER)
+            self._file.flush()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._write_loop, name='csv-sample-writer', daemon=True)
+        self._thread.start()
+    
+    def append(self, landmarks, label, timestamp=None):
+        """Queue one (21, 3) sample (the CSV layout has no timestamp column)"""
+        self._queue.put([label] + np.asarray(landmarks, dtype=np.float32).reshape(-1).tolist())
+    
+    def _write_loop(self):
+        while True:
+            rows = [self._queue.get()]
+            while True:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            done = rows[-1] is None
+            rows = [row for row in rows if row is not None]
+            try:
+                self._writer.writerows(rows)
+                self._file.flush()
+            except OSError as e:
+                print(f"ERROR: Writing {self.path} failed: {e}")
+            if done:
+                return
+    
+    def close(self):
+        """Write the queued rows and close the file"""
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
 
 class ThumbsUpTrainer:
-    def __init__(self, camera_device=0, output_file='thumbs_up_training_data.csv'):
-        self.detector = HandGestureDetector(camera_device=camera_device)
+    def __init__(self, camera_device=0, output_file='thumbs_up_training_data.csv', running_mode='image',
+                 inference_size=None, roi=False, output_format='csv', label='THUMBS_UP',
+                 dedupe_resolution=0.25, landmarker_path=None, offline=None, num_hands=1):
+        """
+        Args:
+            output_format: 'csv' appends rows to output_file; 'binary' writes to a
+                           buffered SampleStore directory. Both write in the background
+            label: Label captured samples get until another is selected
+            dedupe_resolution: NearDuplicateFilter grid size for rejecting
+                               near-identical samples (None or 0: keep everything)
+            landmarker_path, offline, num_hands: Passed to HandGestureDetector
+        """
+        if label not in TRAINING_LABELS:
+            raise ValueError(f"Unknown label: {label} (expected one of {', '.join(TRAINING_LABELS)})")
+        self.detector = HandGestureDetector(camera_device=camera_device, running_mode=running_mode,
+                                            inference_size=inference_size, roi=roi,
+                                            landmarker_path=landmarker_path, offline=offline,
+                                            num_hands=num_hands)
         self.output_file = output_file
+        self.label = label
+        self.burst = False
         self.samples_collected = 0
+        self.samples_rejected = 0
+        self.store = SampleStore(output_file) if output_format == 'binary' else None
+        self.writer = self.store if self.store is not None else CsvSampleWriter(output_file)
         
-        # Initialize CSV file with headers
-        if not os.path.exists(output_file):
-            with open(output_file, 'w', newline='') as f:
-                writer = csv.writer(f)
-                # Write header: 21 landmarks * 3 coordinates (x, y, z) = 63 columns + gesture label
-                header = ['gesture'] + [f'lm_{i}_{coord}' for i in range(21) for coord in ['x', 'y', 'z']]
-                writer.writerow(header)
+        self.dedupe = None
+        if dedupe_resolution:
+            self.dedupe = NearDuplicateFilter(dedupe_resolution)
+            self._seed_dedupe()
+    
+    def _seed_dedupe(self):
+        """Hash the samples already in the output so a resumed session does not re-add them"""
+        if self.store is not None:
+            chunks = sample_store.load(self.output_file).iter_chunks()
+        else:
+            chunks = iter_csv_chunks(self.output_file)
+        for labels, landmarks in chunks:
+            self.dedupe.add_batch(landmarks, labels)
+        if len(self.dedupe):
+            print(f"Duplicate filter seeded with {len(self.dedupe)} existing samples")
     
-    def save_sample(self, landmarks, gesture_label='THUMBS_UP'):
-        """Save a single sample to CSV"""
-        row = [gesture_label]
-        for lm in landmarks:
-            row.extend([lm.x, lm.y, lm.z])
+    def save_sample(self, landmarks, gesture_label=None, reject_duplicates=True):
+        """
+        Queue a single sample on the background writer, unless it is a near-duplicate
         
-        with open(self.output_file, 'a', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(row)
+        Args:
+            landmarks: (21, 3) array or 21 landmark objects with .x/.y/.z
+            gesture_label: Label to save (default: the selected label)
+            reject_duplicates: Drop near-duplicates (burst capture); with False
+                               the sample is always saved but still recorded
+                               in the filter (deliberate SPACE presses)
         
+        Returns:
+            Number of samples collected, or None if the sample was rejected
+        """
+        gesture_label = gesture_label or self.label
+        if not isinstance(landmarks, np.ndarray):
+            landmarks = hands_to_array([landmarks])[0]
+        if self.dedupe is not None and not self.dedupe.add(landmarks, gesture_label) and reject_duplicates:
+            self.samples_rejected += 1
+            return None
+        self.writer.append(landmarks, gesture_label, time.time())
         self.samples_collected += 1
         return self.samples_collected
     
+    def capture(self, detection_result, reject_duplicates=True):
+        """Save every hand in a detection result under the selected label"""
+        saved = []
+        for hand in hands_to_array(detection_result.hand_landmarks):
+            count = self.save_sample(hand, reject_duplicates=reject_duplicates)
+            if count is not None:
+                saved.append(count)
+        return saved
+    
+    def render_frame(self, frame):
+        """
+        Detect hands in a camera frame, burst-capture them and draw the training overlay
+        
+        Returns:
+            Tuple of (mirrored display frame with overlay, MediaPipe HandLandmarkerResult)
+        """
+        # Detect hands (in the detector's running mode); landmarks come back mirrored,
+        # so draw on the mirrored display frame
+        frame, detection_result = self.detector.process_frame(frame)
+        frame = self.detector.display_frame(frame)
+        
+        # Get frame dimensions (needed for drawing)
+        h, w, _ = frame.shape
+        
+        if self.burst and detection_result.hand_landmarks:
+            self.capture(detection_result)
+        
+        # Draw landmarks and detect gesture
+        if detection_result.hand_landmarks:
+            gestures = self.detector.classify_hands(detection_result.hand_landmarks)
+            for hand_landmarks, gesture in zip(detection_result.hand_landmarks, gestures):
+                for landmark in hand_landmarks:
+                    cv2.circle(frame, (int(landmark.x * w), int(landmark.y * h)), 5, (0, 255, 0), -1)
+                
+                # Draw gesture text
+                if gesture:
+                    cv2.putText(frame, f"GESTURE: {gesture}", (10, 30),
+                              cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+        
+        # Draw label, burst state and sample counts
+        status = f"Label: {self.label} | Samples: {self.samples_collected}"
+        if self.dedupe is not None:
+            status += f" | Duplicates: {self.samples_rejected}"
+        if self.burst:
+            status += " | BURST"
+        cv2.putText(frame, status, (10, 70),
+                  cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255) if self.burst else (255, 255, 255), 2)
+        
+        # Instructions
+        cv2.putText(frame, "SPACE: Capture | B: Burst | T/S/1/2/3/N: Label | Q: Quit | R: Reset",
+                  (10, h - 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+        
+        return frame, detection_result
+    
     def run(self):
         """Main training loop"""
         print("="*80)
-        print("THUMBS UP GESTURE TRAINING")
+        print("GESTURE TRAINING")
         print("="*80)
         print(f"Output file: {self.output_file}")
         print("\nInstructions:")
-        print("  - Show thumbs up gesture to camera")
+        print("  - Select a label: T = THUMBS_UP, S = STOP, 1/2/3, N = NONE (no gesture)")
+        print("  - Show the gesture to camera")
         print("  - Press SPACE to capture sample")
+        print("  - Press 'b' to start/stop burst capture (every frame, near-duplicates skipped)")
         print("  - Press 'q' to quit")
         print("  - Press 'r' to reset counter")
-        print(f"\nStarting collection...\n")
+        print(f"\nStarting collection of {self.label}...\n")
         
         cap = cv2.VideoCapture(self.detector.camera_device if isinstance(self.detector.camera_device, int) else 0)
         
@@ -78,53 +251,10 @@ class ThumbsUpTrainer:
                     break
                 
                 frame_count += 1
-                frame = cv2.flip(frame, 1)
-                
-                # Get frame dimensions (needed for drawing)
-                h, w, _ = frame.shape
-                
-                # Convert to RGB for MediaPipe
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                mp_image = mp.Image(image_format=ImageFormat.SRGB, data=rgb_frame)
-                
-                # Detect hands
-                detection_result = self.detector.hand_landmarker.detect(mp_image)
-                
-                # Draw landmarks and detect gesture
-                if detection_result.hand_landmarks:
-                    for hand_landmarks in detection_result.hand_landmarks:
-                        landmark_points = []
-                        
-                        for landmark in hand_landmarks:
-                            x = int(landmark.x * w)
-                            y = int(landmark.y * h)
-                            landmark_points.append((x, y))
-                            cv2.circle(frame, (x, y), 5, (0, 255, 0), -1)
-                        
-                        # Detect gesture
-                        class Landmark:
-                            def __init__(self, x, y, z):
-                                self.x = x
-                                self.y = y
-                                self.z = z
-                        
-                        landmarks_list = [Landmark(lm.x, lm.y, lm.z) for lm in hand_landmarks]
-                        gesture = self.detector.detect_gesture(landmarks_list)
-                        
-                        # Draw gesture text
-                        if gesture:
-                            cv2.putText(frame, f"GESTURE: {gesture}", (10, 30),
-                                      cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-                        
-                        # Draw sample count
-                        cv2.putText(frame, f"Samples: {self.samples_collected}", (10, 70),
-                                  cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
                 
-                # Instructions
-                cv2.putText(frame, "SPACE: Capture | Q: Quit | R: Reset", (10, h - 20),
-                          cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+                frame, detection_result = self.render_frame(frame)
                 
-                cv2.imshow('Thumbs Up Training', frame)
+                cv2.imshow('Gesture Training', frame)
                 
                 key = cv2.waitKey(1) & 0xFF
                 
@@ -132,20 +262,21 @@ class ThumbsUpTrainer:
                     break
                 elif key == ord(' '):  # SPACE to capture
                     if detection_result.hand_landmarks:
-                        for hand_landmarks in detection_result.hand_landmarks:
-                            class Landmark:
-                                def __init__(self, x, y, z):
-                                    self.x = x
-                                    self.y = y
-                                    self.z = z
-                            
-                            landmarks_list = [Landmark(lm.x, lm.y, lm.z) for lm in hand_landmarks]
-                            count = self.save_sample(landmarks_list, 'THUMBS_UP')
-                            print(f"Sample {count} saved!")
+                        # A deliberate capture is always saved; only burst mode drops near-duplicates
+                        for count in self.capture(detection_result, reject_duplicates=False):
+                            print(f"Sample {count} saved! ({self.label})")
                     else:
                         print("No hand detected - sample not saved")
+                elif key == ord('b'):
+                    self.burst = not self.burst
+                    print(f"Burst capture {'started' if self.burst else 'stopped'} ({self.label}, "
+                          f"{self.samples_collected} samples, {self.samples_rejected} duplicates)")
+                elif key in LABEL_KEYS:
+                    self.label = LABEL_KEYS[key]
+                    print(f"Label: {self.label}")
                 elif key == ord('r'):
                     self.samples_collected = 0
+                    self.samples_rejected = 0
                     print("Counter reset")
         
         except KeyboardInterrupt:
@@ -154,19 +285,40 @@ class ThumbsUpTrainer:
             cap.release()
             cv2.destroyAllWindows()
             self.detector.hand_landmarker.close()
-            print(f"\nTraining complete! Collected {self.samples_collected} samples")
+            self.writer.close()
+            print(f"\nTraining complete! Collected {self.samples_collected} samples "
+                  f"({self.samples_rejected} near-duplicates skipped)")
             print(f"Data saved to: {self.output_file}")
 
 if __name__ == "__main__":
     import argparse
     
-    parser = argparse.ArgumentParser(description='Collect thumbs up gesture training data')
+    parser = argparse.ArgumentParser(description='Collect gesture training data')
     parser.add_argument('--camera', default=0, type=int,
                        help='Camera device index (default: 0)')
-    parser.add_argument('--output', default='thumbs_up_training_data.csv',
-                       help='Output CSV file (default: thumbs_up_training_data.csv)')
+    parser.add_argument('--output', default=None,
+                       help='Output CSV file or sample store directory '
+                            '(default: thumbs_up_training_data.csv / thumbs_up_training_data.samples)')
+    parser.add_argument('--format', default='csv', choices=list(DEFAULT_OUTPUTS),
+                       help='Sample storage format (default: csv)')
+    parser.add_argument('--running-mode', default='image', choices=list(RUNNING_MODES),
+                       help='Landmarker running mode (default: image)')
+    parser.add_argument('--inference-size', type=parse_size, default=None,
+                       help='Downscale frames to fit WIDTHxHEIGHT before detection (e.g. 640x360)')
+    parser.add_argument('--roi', action='store_true',
+                       help='Detect only around the previous hand position (image running mode only)')
+    parser.add_argument('--label', default='THUMBS_UP', choices=list(TRAINING_LABELS),
+                       help='Label selected at startup (default: THUMBS_UP)')
+    parser.add_argument('--dedupe-resolution', type=float, default=0.25,
+                       help='Grid size (in wrist to middle finger MCP lengths) within which samples '
+                            'count as near-duplicates (default: 0.25, 0 keeps every sample)')
     
     args = parser.parse_args()
     
-    trainer = ThumbsUpTrainer(camera_device=args.camera, output_file=args.output)
+    trainer = ThumbsUpTrainer(camera_device=args.camera,
+                              output_file=args.output or DEFAULT_OUTPUTS[args.format],
+                              running_mode=args.running_mode,
+                              inference_size=args.inference_size, roi=args.roi,
+                              output_format=args.format, label=args.label,
+                              dedupe_resolution=args.dedupe_resolution)
     trainer.run()